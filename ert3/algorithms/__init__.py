@@ -1,5 +1,15 @@
 from ert3.algorithms._sensitivity import one_at_the_time
+from ert3.algorithms._sensitivity import saltelli
+from ert3.algorithms._sensitivity import saltelli_indices
+from ert3.algorithms._sampling import latin_hypercube
+from ert3.algorithms._sampling import sobol
+from ert3.algorithms._sampling import halton
 
 __all__ = [
     "one_at_the_time",
+    "saltelli",
+    "saltelli_indices",
+    "latin_hypercube",
+    "sobol",
+    "halton",
 ]
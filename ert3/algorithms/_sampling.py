@@ -0,0 +1,69 @@
+from typing import Dict, Mapping, Optional
+
+import numpy as np
+import scipy.stats.qmc
+
+from ert3.data import EnsembleRecord
+from ert3.stats import Distribution
+
+
+def _dimension(parameters: Mapping[str, Distribution]) -> int:
+    if len(parameters) == 0:
+        raise ValueError("Cannot sample a design of no variables")
+    return sum(len(dist.index) for dist in parameters.values())
+
+
+def _ppf_design(
+    parameters: Mapping[str, Distribution], unit_design: np.ndarray
+) -> Dict[str, EnsembleRecord]:
+    design = {}
+    start = 0
+    for group_name, dist in parameters.items():
+        stop = start + len(dist.index)
+        design[group_name] = dist.ppf_ensemble(unit_design[:, start:stop])
+        start = stop
+    return design
+
+
+def _design(
+    engine: scipy.stats.qmc.QMCEngine,
+    parameters: Mapping[str, Distribution],
+    ensemble_size: int,
+) -> Dict[str, EnsembleRecord]:
+    if ensemble_size <= 0:
+        raise ValueError("Cannot sample a design with no realizations")
+
+    # The design is drawn once for all variables as a (realizations x
+    # variables) matrix in the unit hypercube, which is then mapped column
+    # block by column block through the ppf of each parameter group.
+    return _ppf_design(parameters, engine.random(ensemble_size))
+
+
+def latin_hypercube(
+    parameters: Mapping[str, Distribution],
+    ensemble_size: int,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict[str, EnsembleRecord]:
+    engine = scipy.stats.qmc.LatinHypercube(d=_dimension(parameters), seed=rng)
+    return _design(engine, parameters, ensemble_size)
+
+
+def sobol(
+    parameters: Mapping[str, Distribution],
+    ensemble_size: int,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict[str, EnsembleRecord]:
+    # The sequence is scrambled, as the first point of the unscrambled
+    # sequence is the origin, which unbounded distributions map to -inf.
+    # Ensemble sizes that are powers of two give the best balance.
+    engine = scipy.stats.qmc.Sobol(d=_dimension(parameters), scramble=True, seed=rng)
+    return _design(engine, parameters, ensemble_size)
+
+
+def halton(
+    parameters: Mapping[str, Distribution],
+    ensemble_size: int,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict[str, EnsembleRecord]:
+    engine = scipy.stats.qmc.Halton(d=_dimension(parameters), scramble=True, seed=rng)
+    return _design(engine, parameters, ensemble_size)
@@ -1,18 +1,16 @@
-from typing import Set, MutableMapping, List, Dict
-
-from ert3.stats import Distribution
-from ert3.data import Record
+from typing import Dict, Mapping, Optional, Tuple
 
+import numpy as np
+import scipy.stats.qmc
 
-def _build_base_records(
-    groups: Set[str], parameters: MutableMapping[str, Distribution]
-) -> Dict[str, Record]:
-    return {group_name: parameters[group_name].ppf(0.5) for group_name in groups}
+from ert3.algorithms._sampling import _ppf_design
+from ert3.stats import Distribution
+from ert3.data import EnsembleRecord, RecordType
 
 
 def one_at_the_time(
-    parameters: MutableMapping[str, Distribution]
-) -> List[Dict[str, Record]]:
+    parameters: Mapping[str, Distribution]
+) -> Dict[str, EnsembleRecord]:
     if len(parameters) == 0:
         raise ValueError("Cannot study the sensitivity of no variables")
 
@@ -20,21 +18,88 @@ def one_at_the_time(
     # be explored as ppf(tail) and ppf(1-tail) as the two extremal values.
     tail = (1 - 0.99) / 2
 
-    evaluations = []
+    # Every variable gives two realizations, in which it takes its lower and
+    # upper extremal value while all other variables are at their median.
+    ensemble_size = 2 * sum(len(dist.index) for dist in parameters.values())
+
+    design = {}
+    offset = 0
     for group_name, dist in parameters.items():
-        lower = dist.ppf(tail)
-        upper = dist.ppf(1 - tail)
-        const_records = set(parameters.keys())
-        const_records.remove(group_name)
+        size = len(dist.index)
+        quantiles = np.repeat([[0.5], [tail], [1 - tail]], size, axis=1)
+        limits = dist.ppf_ensemble(quantiles)
+        median, lower, upper = limits.to_numpy()
+
+        values = np.tile(median, (ensemble_size, 1))
+        rows = offset + 2 * np.arange(size)
+        cols = np.arange(size)
+        values[rows, cols] = lower
+        values[rows + 1, cols] = upper
+        offset += 2 * size
+
+        index = None if limits.record_type == RecordType.LIST_FLOAT else dist.index
+        design[group_name] = EnsembleRecord.from_numpy(values, index=index)
+
+    return design
+
+
+def saltelli(
+    parameters: Mapping[str, Distribution],
+    sample_size: int,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict[str, EnsembleRecord]:
+    """Generate a Saltelli design for the estimation of first and total order
+    Sobol indices of all variables. The design consists of
+    sample_size * (variables + 2) realizations, laid out as the blocks A, B
+    and A_B^i for every variable i, where A_B^i is A with the i-th column taken
+    from B.
+    """
+    if len(parameters) == 0:
+        raise ValueError("Cannot study the sensitivity of no variables")
+    if sample_size <= 0:
+        raise ValueError("Cannot sample a design with no realizations")
+
+    num_variables = sum(len(dist.index) for dist in parameters.values())
+    engine = scipy.stats.qmc.Sobol(d=2 * num_variables, scramble=True, seed=rng)
+    base = engine.random(sample_size)
+    a_block, b_block = base[:, :num_variables], base[:, num_variables:]
+
+    ab_blocks = np.repeat(a_block[np.newaxis], num_variables, axis=0)
+    variables = np.arange(num_variables)
+    ab_blocks[variables, :, variables] = b_block.T
+    unit_design = np.concatenate(
+        [a_block, b_block, ab_blocks.reshape(-1, num_variables)]
+    )
+    return _ppf_design(parameters, unit_design)
 
-        for idx in dist.index:
-            for lim_val in (lower, upper):
-                records = _build_base_records(const_records, parameters)
 
-                rec_values = dist.ppf(0.5)
-                rec_values.data[idx] = lim_val.data[idx]  # type: ignore
-                records[group_name] = rec_values
+def saltelli_indices(
+    responses: np.ndarray, num_variables: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Estimate the first and total order Sobol indices from the responses to a
+    Saltelli design, given as a (realizations x response index) matrix. The
+    indices are returned as two (variables x response index) matrices. Response
+    indices without any variance get NaN indices.
+    """
+    if responses.ndim != 2 or responses.shape[0] % (num_variables + 2) != 0:
+        raise ValueError(
+            f"Expected responses of shape (n * {num_variables + 2}, m), "
+            f"got {responses.shape}"
+        )
+    sample_size = responses.shape[0] // (num_variables + 2)
 
-                evaluations.append(records)
+    f_a = responses[:sample_size]
+    f_b = responses[sample_size : 2 * sample_size]
+    f_ab = responses[2 * sample_size :].reshape(
+        num_variables, sample_size, responses.shape[1]
+    )
+    variance = np.var(responses[: 2 * sample_size], axis=0)
 
-    return evaluations
+    # Saltelli (2010) estimator for the first order and Jansen's estimator for
+    # the total order indices
+    with np.errstate(divide="ignore", invalid="ignore"):
+        first_order = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+        total_order = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / variance
+    first_order[:, variance == 0] = np.nan
+    total_order[:, variance == 0] = np.nan
+    return first_order, total_order
@@ -1,10 +1,16 @@
 from typing import Union
 
 from ert3.config._ensemble_config import load_ensemble_config, EnsembleConfig
-from ert3.config._stages_config import load_stages_config, StagesConfig, Function, Unix
+from ert3.config._stages_config import (
+    load_stages_config,
+    StagesConfig,
+    Function,
+    VectorizedFunction,
+    Unix,
+)
 from ert3.config._experiment_config import load_experiment_config, ExperimentConfig
 
-Step = Union[Function, Unix]
+Step = Union[Function, VectorizedFunction, Unix]
 
 __all__ = [
     "load_ensemble_config",
@@ -14,6 +20,7 @@ __all__ = [
     "Step",
     "Unix",
     "Function",
+    "VectorizedFunction",
     "load_experiment_config",
     "ExperimentConfig",
 ]
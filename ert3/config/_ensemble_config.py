@@ -21,7 +21,7 @@ class _EnsembleConfig(BaseModel):
 
 class ForwardModel(_EnsembleConfig):
     stage: str
-    driver: Literal["local", "pbs"] = "local"
+    driver: Literal["local", "pbs", "process_pool"] = "local"
 
 
 class Input(_EnsembleConfig):
@@ -29,10 +29,22 @@ class Input(_EnsembleConfig):
     record: str
 
 
+class Storage(_EnsembleConfig):
+    """Compression of the records transmitted between the steps and of the
+    responses sent to storage. Responses that are floating point matrices are
+    stored uncompressed, since the storage server reads them itself, and so
+    are the input records of the ensemble.
+    """
+
+    compression: Optional[Literal["zlib", "zstd", "lz4"]] = None
+    compression_level: Optional[int] = None
+
+
 class EnsembleConfig(_EnsembleConfig):
     forward_model: ForwardModel
     input: List[Input]
     size: Optional[int] = None
+    storage: Storage = Storage()
 
 
 def load_ensemble_config(config_dict: Dict[str, Any]) -> EnsembleConfig:
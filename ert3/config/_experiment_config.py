@@ -1,6 +1,12 @@
 import sys
 from typing import Optional, Dict, Any
-from pydantic import root_validator, BaseModel, ValidationError
+from pydantic import (
+    root_validator,
+    BaseModel,
+    NonNegativeInt,
+    PositiveInt,
+    ValidationError,
+)
 
 import ert3
 
@@ -10,6 +16,12 @@ else:
     from typing_extensions import Literal
 
 
+# Evaluation experiments sample their stochastic input records either
+# independently or, if an algorithm is given, jointly from a design
+_EVALUATION_ALGORITHMS = (None, "latin-hypercube", "sobol", "halton")
+_SENSITIVITY_ALGORITHMS = ("one-at-a-time", "saltelli")
+
+
 class _ExperimentConfig(BaseModel):
     validate_all = True
     validate_assignment = True
@@ -20,7 +32,11 @@ class _ExperimentConfig(BaseModel):
 
 class ExperimentConfig(_ExperimentConfig):
     type: Literal["evaluation", "sensitivity"]
-    algorithm: Optional[Literal["one-at-a-time"]]
+    algorithm: Optional[
+        Literal["one-at-a-time", "saltelli", "latin-hypercube", "sobol", "halton"]
+    ]
+    random_seed: Optional[NonNegativeInt] = None
+    sample_size: Optional[PositiveInt] = None
 
     @root_validator
     def command_defined(cls, experiment: Dict[str, Any]) -> Dict[str, Any]:
@@ -28,14 +44,26 @@ class ExperimentConfig(_ExperimentConfig):
         algorithm = experiment.get("algorithm")
 
         if type_ == "evaluation":
-            if algorithm != None:
-                raise ValueError("Did not expect algorithm for evaluation experiment")
+            if algorithm not in _EVALUATION_ALGORITHMS:
+                raise ValueError(
+                    f"Did not expect algorithm for evaluation experiment: {algorithm}"
+                )
         elif type_ == "sensitivity":
             if algorithm == None:
                 raise ValueError("Expected an algorithm for sensitivity experiments")
+            if algorithm not in _SENSITIVITY_ALGORITHMS:
+                raise ValueError(
+                    f"Did not expect algorithm for sensitivity experiment: {algorithm}"
+                )
         else:
             raise ValueError(f"Unexpected experiment type: {type_}")
 
+        sample_size = experiment.get("sample_size")
+        if algorithm == "saltelli" and sample_size is None:
+            raise ValueError("Expected a sample size for the saltelli algorithm")
+        if algorithm != "saltelli" and sample_size is not None:
+            raise ValueError(f"Did not expect a sample size for algorithm: {algorithm}")
+
         return experiment
 
 
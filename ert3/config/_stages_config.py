@@ -81,15 +81,31 @@ class Function(_Step):
         return _import_from(value)
 
 
+class VectorizedFunction(_Step):
+    """A function that is called once, in-process, for the whole ensemble. It
+    receives every input record as a (realizations x index) array and returns
+    such an array, or a mapping from output record names to arrays if the
+    stage has several outputs.
+    """
+
+    vectorized_function: Callable  # type: ignore
+
+    @validator("vectorized_function", pre=True)
+    def function_is_callable(cls, value) -> Callable:  # type: ignore
+        return _import_from(value)
+
+
 class Unix(_Step):
     script: List[str]
     transportable_commands: List[TransportableCommand]
 
 
 class StagesConfig(BaseModel):
-    __root__: List[Union[Function, Unix]]
+    __root__: List[Union[Function, VectorizedFunction, Unix]]
 
-    def step_from_key(self, key: str) -> Union[Function, Unix, None]:
+    def step_from_key(
+        self, key: str
+    ) -> Union[Function, VectorizedFunction, Unix, None]:
         return next((step for step in self if step.name == key), None)
 
     def __iter__(self):  # type: ignore
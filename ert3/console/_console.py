@@ -6,6 +6,7 @@ import sys
 from typing import Any, List, Union
 from pathlib import Path
 
+import numpy as np
 import pkg_resources as pkg
 import yaml
 
@@ -32,13 +33,36 @@ def _build_init_argparser(subparsers: Any) -> None:
 
 
 def _build_run_argparser(subparsers: Any) -> None:
-    run_parser = subparsers.add_parser("run", help="Run experiment")
+    run_parser = subparsers.add_parser(
+        "run",
+        help="Run experiment",
+        description="Run experiment. A sensitivity experiment with the saltelli "
+        "algorithm stores the first and total order indices of each response as "
+        "the workspace records <experiment>_<response>_first_order and "
+        "<experiment>_<response>_total_order. They have one realization per input "
+        "variable, in the order of the ensemble inputs and their indices, and the "
+        "index of the response. The responses must be numerical records.",
+    )
     run_parser.add_argument("experiment_name", help="Name of the experiment")
 
 
 def _build_export_argparser(subparsers: Any) -> None:
     export_parser = subparsers.add_parser("export", help="Export experiment")
     export_parser.add_argument("experiment_name", help="Name of the experiment")
+    export_parser.add_argument(
+        "--format",
+        dest="export_format",
+        choices=ert3.engine.EXPORT_FORMATS,
+        default="json",
+        help="Format of the exported data, written to data.<format> in the "
+        "experiment folder. The parquet format requires the pyarrow package",
+    )
+    export_parser.add_argument(
+        "--records",
+        nargs="+",
+        default=None,
+        help="Names of the records to export, all records are exported by default",
+    )
 
 
 def _build_record_argparser(subparsers: Any) -> None:
@@ -71,6 +95,9 @@ def _build_record_argparser(subparsers: Any) -> None:
     sample_parser.add_argument(
         "ensemble_size", type=int, help="Size of ensemble of variables"
     )
+    sample_parser.add_argument(
+        "--seed", type=int, default=None, help="Seed for reproducible sampling"
+    )
 
 
 def _build_status_argparser(subparsers: Any) -> None:
@@ -171,14 +198,23 @@ def _run(workspace: Path, args: Any) -> None:
 
 def _export(workspace: Path, args: Any) -> None:
     assert args.sub_cmd == "export"
-    ert3.engine.export(workspace, args.experiment_name)
+    ert3.engine.export(
+        workspace,
+        args.experiment_name,
+        export_format=args.export_format,
+        record_names=args.records,
+    )
 
 
 def _record(workspace: Path, args: Any) -> None:
     assert args.sub_cmd == "record"
     if args.sub_record_cmd == "sample":
         ert3.engine.sample_record(
-            workspace, args.parameter_group, args.record_name, args.ensemble_size
+            workspace,
+            args.parameter_group,
+            args.record_name,
+            args.ensemble_size,
+            seed=None if args.seed is None else np.random.SeedSequence(args.seed),
         )
     elif args.sub_record_cmd == "load":
         ert3.engine.load_record(workspace, args.record_name, args.record_file)
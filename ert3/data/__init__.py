@@ -1,15 +1,23 @@
 from ert3.data._record import Record
+from ert3.data._record import RecordType
 from ert3.data._record import EnsembleRecord
 from ert3.data._record import MultiEnsembleRecord
+from ert3.data._record import LazyRecord
 from ert3.data._record import RecordTransmitter
 from ert3.data._record import SharedDiskRecordTransmitter
+from ert3.data._record import EnsembleRecordTransmitter
 from ert3.data._record import InMemoryRecordTransmitter
+from ert3.data._compression import COMPRESSION_CODECS
 
 __all__ = (
     "Record",
+    "RecordType",
     "EnsembleRecord",
     "MultiEnsembleRecord",
+    "LazyRecord",
     "RecordTransmitter",
     "SharedDiskRecordTransmitter",
+    "EnsembleRecordTransmitter",
     "InMemoryRecordTransmitter",
+    "COMPRESSION_CODECS",
 )
@@ -0,0 +1,74 @@
+import zlib
+from typing import Any, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None  # type: ignore
+
+
+COMPRESSION_CODECS = ("zlib", "zstd", "lz4")
+
+# Payloads smaller than this are not worth compressing
+_MIN_COMPRESSED_SIZE = 1024
+
+_PACKAGES = {"zstd": "zstandard", "lz4": "lz4"}
+
+
+def _codec_module(codec: str) -> Any:
+    modules: Dict[str, Any] = {"zlib": zlib, "zstd": zstandard, "lz4": lz4}
+    if codec not in modules:
+        raise ValueError(
+            f"Unknown compression codec {codec}, "
+            f"expected one of: {', '.join(COMPRESSION_CODECS)}"
+        )
+    if modules[codec] is None:
+        raise ValueError(
+            f"Compression codec {codec} requires the {_PACKAGES[codec]} package"
+        )
+    return modules[codec]
+
+
+def check_codec(codec: Optional[str]) -> None:
+    """Raise a ValueError if the codec is unknown or its package is missing."""
+    if codec is not None:
+        _codec_module(codec)
+
+
+def compress(data: bytes, codec: str, level: Optional[int] = None) -> bytes:
+    module = _codec_module(codec)
+    if codec == "zlib":
+        return module.compress(data, -1 if level is None else level)
+    if codec == "zstd":
+        compressor = module.ZstdCompressor(level=3 if level is None else level)
+        return compressor.compress(data)
+    return module.frame.compress(data, compression_level=level or 0)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    module = _codec_module(codec)
+    if codec == "zlib":
+        return module.decompress(data)
+    if codec == "zstd":
+        return module.ZstdDecompressor().decompress(data)
+    return module.frame.decompress(data)
+
+
+def maybe_compress(
+    data: bytes, codec: Optional[str], level: Optional[int] = None
+) -> Optional[bytes]:
+    """Return the compressed data, or None if the data is not compressed
+    because no codec is given, the data is small, or compression does not make
+    it smaller, as for data that is already compressed.
+    """
+    if codec is None or len(data) < _MIN_COMPRESSED_SIZE:
+        return None
+    compressed = compress(data, codec, level)
+    if len(compressed) >= len(data):
+        return None
+    return compressed
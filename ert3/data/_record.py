@@ -1,4 +1,10 @@
+import contextlib
+import fcntl
+import hashlib
 import json
+import mmap
+import numbers
+import os
 import shutil
 import typing
 import uuid
@@ -7,22 +13,28 @@ from enum import Enum, auto
 from pathlib import Path
 from typing import (
     Any,
+    Iterator,
     List,
     Mapping,
     MutableMapping,
+    NamedTuple,
     Optional,
     Tuple,
     Union,
     Dict,
+    Sequence,
+    cast,
 )
 
 import aiofiles
+import numpy as np
 
 # Type hinting for wrap must be turned off until (1) is resolved.
 # (1) https://github.com/Tinche/aiofiles/issues/8
 from aiofiles.os import wrap  # type: ignore
 from pydantic import (
     BaseModel,
+    PrivateAttr,
     StrictBytes,
     StrictFloat,
     StrictInt,
@@ -31,7 +43,23 @@ from pydantic import (
     root_validator,
 )
 
-_copy = wrap(shutil.copy)
+from ert3.data._compression import check_codec, decompress, maybe_compress
+
+# The FICLONE ioctl from linux/fs.h, which makes dst a copy-on-write clone of
+# src on file systems that support it
+_FICLONE = 0x40049409
+
+
+def _reflink_or_copy(src: str, dst: str) -> None:
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        shutil.copymode(src, dst)
+    except OSError:
+        shutil.copy(src, dst)
+
+
+_copy = wrap(_reflink_or_copy)
 
 strict_number = Union[StrictInt, StrictFloat]
 record_data = Union[
@@ -66,6 +94,12 @@ def _build_record_index(
         return tuple(range(len(data)))
 
 
+def _build_record_data(row: np.ndarray, index: Optional[Tuple[Any, ...]]) -> Any:
+    if index is None:
+        return row.tolist()
+    return dict(zip(index, row.tolist()))
+
+
 class RecordType(str, Enum):
     LIST_FLOAT = "LIST_FLOAT"
     MAPPING_INT_FLOAT = "MAPPING_INT_FLOAT"
@@ -87,6 +121,21 @@ class Record(_DataElement):
             index = _build_record_index(values["data"])
         return index
 
+    @classmethod
+    def from_trusted(
+        cls,
+        data: record_data,
+        index: Optional[Tuple[Union[StrictStr, StrictInt], ...]] = None,
+    ) -> "Record":
+        """Create a record without validation, for data that ert3 has produced
+        or validated itself, e.g. loaded from a transmitter or sampled from a
+        distribution. The data must be a list or a dict of the record data
+        types, and the index, if given, must match the data.
+        """
+        if index is None:
+            index = _build_record_index(data)
+        return cls.construct(data=data, index=index)
+
     @property
     def record_type(self) -> RecordType:
         if isinstance(self.data, list):
@@ -118,10 +167,23 @@ class Record(_DataElement):
         ), f"inconsistent index {norm_record_index} vs {record['index']}"
         return record
 
+    def to_numpy(self) -> np.ndarray:
+        if self.record_type == RecordType.LIST_BYTES:
+            raise TypeError("cannot represent a LIST_BYTES record as an array")
+        if isinstance(self.data, Mapping):
+            return np.fromiter(
+                self.data.values(), dtype=np.float64, count=len(self.data)
+            )
+        return np.asarray(self.data, dtype=np.float64)
+
 
 class EnsembleRecord(_DataElement):
     records: Tuple[Record, ...]
     ensemble_size: Optional[int] = None
+    # Array-backed ensemble records keep all realizations in one contiguous
+    # (realizations x index) float64 matrix. Record based ensemble records
+    # build it lazily the first time it is requested.
+    _array: Optional[np.ndarray] = PrivateAttr(default=None)
 
     @validator("ensemble_size", pre=True, always=True)
     def ensemble_size_validator(
@@ -139,6 +201,86 @@ class EnsembleRecord(_DataElement):
         assert len(ensemble_record["records"]) == ensemble_record["ensemble_size"]
         return ensemble_record
 
+    @classmethod
+    def from_trusted(cls, records: Sequence[Record]) -> "EnsembleRecord":
+        """Create an ensemble record without validation from records that are
+        already validated, e.g. records loaded from transmitters.
+        """
+        records = tuple(records)
+        return cls.construct(records=records, ensemble_size=len(records))
+
+    @classmethod
+    def from_numpy(
+        cls,
+        data: np.ndarray,
+        index: Optional[Tuple[Union[StrictStr, StrictInt], ...]] = None,
+    ) -> "EnsembleRecord":
+        """Create an array-backed ensemble record from a (realizations x index)
+        matrix. If no index is given the realizations become LIST_FLOAT records,
+        otherwise they are mappings keyed by the index. The matrix is validated
+        once as a whole and is shared, without copying, with :meth:`to_numpy`.
+        """
+        # A view is taken so that only the record's handle becomes read-only
+        array = np.ascontiguousarray(data, dtype=np.float64).view()
+        if array.ndim != 2:
+            raise ValueError(
+                f"expected a two dimensional array of realizations, got {array.ndim}"
+            )
+        if index is not None:
+            # Integer keys, e.g. numpy integers, become Python integers, which
+            # are valid record keys
+            index = tuple(
+                int(key) if isinstance(key, numbers.Integral) else key for key in index
+            )
+            if len(index) != array.shape[1]:
+                raise ValueError(
+                    f"index of length {len(index)} does not match "
+                    f"{array.shape[1]} values per realization"
+                )
+            if len(set(index)) != len(index):
+                raise ValueError("index must be unique")
+
+        record_index = index if index is not None else tuple(range(array.shape[1]))
+        records = tuple(
+            Record.from_trusted(_build_record_data(row, index), index=record_index)
+            for row in array
+        )
+        array.setflags(write=False)
+        ensemble_record = cls.construct(records=records, ensemble_size=len(records))
+        object.__setattr__(ensemble_record, "_array", array)
+        return ensemble_record
+
+    @property
+    def record_type(self) -> RecordType:
+        if not self.records:
+            return RecordType.LIST_FLOAT
+        return self.records[0].record_type
+
+    @property
+    def index(self) -> Tuple[Union[StrictStr, StrictInt], ...]:
+        if not self.records:
+            return ()
+        index = self.records[0].index
+        assert index is not None
+        return index
+
+    def to_numpy(self) -> np.ndarray:
+        """Return the ensemble as a read-only (realizations x index) float64
+        matrix. For array-backed ensemble records no data is copied.
+        """
+        if self._array is None:
+            if self.record_type == RecordType.LIST_BYTES:
+                raise TypeError("cannot represent a LIST_BYTES record as an array")
+            if any(record.index != self.index for record in self.records):
+                raise ValueError("cannot represent records with differing indices")
+            array = np.empty((len(self.records), len(self.index)), dtype=np.float64)
+            for row, record in zip(array, self.records):
+                row[:] = record.to_numpy()
+            array.setflags(write=False)
+            object.__setattr__(self, "_array", array)
+        assert self._array is not None
+        return self._array
+
 
 class MultiEnsembleRecord(_DataElement):
     ensemble_records: Mapping[str, EnsembleRecord]
@@ -195,6 +337,12 @@ class MultiEnsembleRecord(_DataElement):
         assert self.record_names is not None
         return len(self.record_names)
 
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        return {
+            name: ensemble_record.to_numpy()
+            for name, ensemble_record in self.ensemble_records.items()
+        }
+
 
 class RecordTransmitterState(Enum):
     transmitted = auto()
@@ -230,6 +378,20 @@ class RecordTransmitter:
     async def load(self) -> Record:
         pass
 
+    @abstractmethod
+    def _load_sync(self) -> Record:
+        pass
+
+    def _load_indices_sync(
+        self, index: Sequence[Union[StrictStr, StrictInt]]
+    ) -> Record:
+        return _select_indices(self._load_sync(), index)
+
+    def load_lazy(self) -> "LazyRecord":
+        if not self.is_transmitted():
+            raise RuntimeError("cannot load untransmitted record")
+        return LazyRecord(self)
+
     @abstractmethod
     async def transmit_data(
         self,
@@ -246,36 +408,218 @@ class RecordTransmitter:
         pass
 
 
+def _select_indices(
+    record: Record, index: Sequence[Union[StrictStr, StrictInt]]
+) -> Record:
+    if record.record_type == RecordType.LIST_BYTES:
+        raise TypeError("cannot select indices of a LIST_BYTES record")
+    # The selection is returned as a mapping, since a list record cannot
+    # represent a subset of its positions
+    data: Any = record.data
+    return Record.from_trusted(cast(record_data, {key: data[key] for key in index}))
+
+
+class LazyRecord:
+    """Handle to a transmitted record that is only read once it is accessed.
+
+    The full record is read and cached on first access of :attr:`data`,
+    :attr:`index` or :attr:`record_type`. :meth:`select` reads a subset of the
+    indices, without loading and caching the full record if it has not been
+    loaded already.
+    """
+
+    def __init__(self, transmitter: "RecordTransmitter") -> None:
+        self._transmitter = transmitter
+        self._record: Optional[Record] = None
+
+    def is_loaded(self) -> bool:
+        return self._record is not None
+
+    def load(self) -> Record:
+        if self._record is None:
+            self._record = self._transmitter._load_sync()
+        return self._record
+
+    @property
+    def data(self) -> record_data:
+        return self.load().data
+
+    @property
+    def index(self) -> Optional[Tuple[Union[StrictStr, StrictInt], ...]]:
+        return self.load().index
+
+    @property
+    def record_type(self) -> RecordType:
+        return self.load().record_type
+
+    def to_numpy(self) -> np.ndarray:
+        return self.load().to_numpy()
+
+    def select(self, index: Sequence[Union[StrictStr, StrictInt]]) -> Record:
+        if self._record is not None:
+            return _select_indices(self._record, index)
+        return self._transmitter._load_indices_sync(index)
+
+
+# Numerical records are stored on shared disk in a binary format: a magic
+# string, the length of a JSON header holding the dtype and the index of
+# mappings, the header padded to an 8 byte boundary, and the raw little-endian
+# values.
+_BINARY_MAGIC = b"\x93ERT3REC"
+_BINARY_HEADER_LENGTH = 4
+
+
+def _encode_binary(record: Record) -> Optional[bytes]:
+    if record.record_type == RecordType.LIST_BYTES:
+        return None
+    data: Any = record.data
+    values = list(data.values()) if isinstance(data, Mapping) else data
+
+    # Only homogeneously typed values are stored as binary, such that the
+    # records are reproduced exactly, e.g. when dumped as JSON
+    if all(isinstance(value, float) for value in values):
+        dtype = "<f8"
+    elif all(
+        isinstance(value, int) and not isinstance(value, bool) for value in values
+    ):
+        dtype = "<i8"
+    else:
+        return None
+    try:
+        array = np.array(values, dtype=dtype)
+    except OverflowError:
+        return None
+
+    index = list(data.keys()) if isinstance(data, Mapping) else None
+    header = json.dumps({"dtype": dtype, "index": index}).encode()
+    offset = len(_BINARY_MAGIC) + _BINARY_HEADER_LENGTH + len(header)
+    header += b" " * (-offset % 8)
+    return b"".join(
+        (
+            _BINARY_MAGIC,
+            len(header).to_bytes(_BINARY_HEADER_LENGTH, "little"),
+            header,
+            array.tobytes(),
+        )
+    )
+
+
+def _decode_binary(
+    contents: Union[bytes, memoryview]
+) -> Tuple[Optional[List[Any]], np.ndarray]:
+    start = len(_BINARY_MAGIC) + _BINARY_HEADER_LENGTH
+    if contents[: len(_BINARY_MAGIC)] != _BINARY_MAGIC:
+        raise ValueError("Expected a binary record")
+    header_length = int.from_bytes(contents[len(_BINARY_MAGIC) : start], "little")
+    header = json.loads(bytes(contents[start : start + header_length]))
+    array = np.frombuffer(contents, dtype=header["dtype"], offset=start + header_length)
+    return header["index"], array
+
+
+def _binary_to_record(
+    index: Optional[List[Any]], values: np.ndarray, keys: Optional[Sequence[Any]]
+) -> Record:
+    if keys is None:
+        if index is None:
+            return Record.from_trusted(values.tolist())
+        return Record.from_trusted(dict(zip(index, values.tolist())))
+
+    # Only the selected values are read from the array, such that partial
+    # reads from a memory mapped file only touch the pages that are needed
+    if index is None:
+        positions = list(keys)
+    else:
+        key_positions = {key: position for position, key in enumerate(index)}
+        positions = [key_positions[key] for key in keys]
+    return Record.from_trusted(dict(zip(keys, values[positions].tolist())))
+
+
+def _encode(record: Record) -> Tuple[bytes, bool]:
+    binary_contents = _encode_binary(record)
+    if binary_contents is not None:
+        return binary_contents, True
+    if record.record_type != RecordType.LIST_BYTES:
+        return json.dumps(record.data).encode(), False
+    return record.data[0], False  # type: ignore
+
+
+async def _store(storage_path: Path, contents: bytes, suffix: str = "") -> Path:
+    # The payloads are stored content-addressed, such that identical
+    # payloads, e.g. constant parameters or commands shared by all
+    # realizations, are written once and shared by all transmitters.
+    storage_path.mkdir(parents=True, exist_ok=True)
+    storage_uri = storage_path / (hashlib.sha256(contents).hexdigest() + suffix)
+    if not storage_uri.exists():
+        # Written under a unique name and moved into place, so that
+        # concurrent writers of the same payload never expose a partial file
+        tmp_uri = storage_uri.with_name(f"{storage_uri.name}.{uuid.uuid4()}.tmp")
+        async with aiofiles.open(tmp_uri, mode="wb") as f:  # type: ignore
+            await f.write(contents)
+        os.replace(tmp_uri, storage_uri)
+    return storage_uri
+
+
+class _SharedDiskPayload(NamedTuple):
+    """The file a record is transmitted to and how it is stored there. The
+    payload is the length bytes at offset of the file, or the whole file if no
+    length is given, and is compressed with codec, if any.
+    """
+
+    uri: str
+    record_type: RecordType
+    binary: bool = False
+    offset: int = 0
+    length: Optional[int] = None
+    codec: Optional[str] = None
+
+
 class SharedDiskRecordTransmitter(RecordTransmitter):
     _TYPE: RecordTransmitterType = RecordTransmitterType.shared_disk
 
-    def __init__(self, name: str, storage_path: Path):
+    def __init__(
+        self,
+        name: str,
+        storage_path: Path,
+        compression: typing.Optional[str] = None,
+        compression_level: typing.Optional[int] = None,
+    ):
         super().__init__()
+        check_codec(compression)
         self._storage_path = storage_path
-        self._storage_path.mkdir(parents=True, exist_ok=True)
-        self._concrete_key = f"{name}_{uuid.uuid4()}"
-        self._uri: typing.Optional[str] = None
-        self._record_type: typing.Optional[RecordType] = None
+        self._name = name
+        self._compression = compression
+        self._compression_level = compression_level
+        self._payload: typing.Optional[_SharedDiskPayload] = None
 
-    def _set_transmitted(self, uri: Path, record_type: RecordType) -> None:
+    def _set_transmitted(self, payload: _SharedDiskPayload) -> None:
         super()._set_transmitted_state()
-        self._uri = str(uri)
-        self._record_type = record_type
+        self._payload = payload
+
+    @property
+    def _uri(self) -> typing.Optional[str]:
+        return None if self._payload is None else self._payload.uri
+
+    def _get_payload(self) -> _SharedDiskPayload:
+        if self._payload is None:
+            raise RuntimeError("cannot load untransmitted record")
+        return self._payload
 
     @property
     def transmitter_type(self) -> RecordTransmitterType:
         return self._TYPE
 
     async def _transmit(self, record: Record) -> None:
-        storage_uri = self._storage_path / self._concrete_key
-        if record.record_type != RecordType.LIST_BYTES:
-            contents = json.dumps(record.data)
-            async with aiofiles.open(storage_uri, mode="w") as f:
-                await f.write(contents)
-        else:
-            async with aiofiles.open(storage_uri, mode="wb") as f:  # type: ignore
-                await f.write(record.data[0])  # type: ignore
-        self._set_transmitted(storage_uri, record_type=record.record_type)
+        contents, binary = _encode(record)
+        compressed = maybe_compress(
+            contents, self._compression, self._compression_level
+        )
+        codec = None if compressed is None else self._compression
+        storage_uri = await _store(self._storage_path, compressed or contents)
+        self._set_transmitted(
+            _SharedDiskPayload(
+                str(storage_uri), record.record_type, binary=binary, codec=codec
+            )
+        )
 
     async def transmit_data(
         self,
@@ -308,26 +652,171 @@ class SharedDiskRecordTransmitter(RecordTransmitter):
             )
         return await self._transmit(record)
 
+    def _to_record(self, contents: bytes) -> Record:
+        # The payload was validated when it was transmitted
+        payload = self._get_payload()
+        if payload.record_type == RecordType.LIST_BYTES:
+            return Record.from_trusted([contents])
+        if payload.binary:
+            return _binary_to_record(*_decode_binary(contents), keys=None)
+        if payload.record_type == RecordType.MAPPING_INT_FLOAT:
+            return Record.from_trusted(
+                json.loads(contents, object_hook=parse_json_key_as_int)
+            )
+        return Record.from_trusted(json.loads(contents))
+
+    def _decompress(self, contents: bytes) -> bytes:
+        codec = self._get_payload().codec
+        if codec is None:
+            return contents
+        return decompress(contents, codec)
+
+    async def _read(self) -> bytes:
+        payload = self._get_payload()
+        async with aiofiles.open(payload.uri, mode="rb") as f:  # type: ignore
+            if payload.length is None:
+                return self._decompress(await f.read())
+            await f.seek(payload.offset)
+            return self._decompress(await f.read(payload.length))
+
+    def _read_sync(self) -> bytes:
+        payload = self._get_payload()
+        with open(payload.uri, mode="rb") as f:
+            if payload.length is None:
+                return self._decompress(f.read())
+            f.seek(payload.offset)
+            return self._decompress(f.read(payload.length))
+
     async def load(self) -> Record:
         if not self.is_transmitted():
             raise RuntimeError("cannot load untransmitted record")
-        if self._record_type != RecordType.LIST_BYTES:
-            async with aiofiles.open(str(self._uri)) as f:
-                contents = await f.read()
-                if self._record_type == RecordType.MAPPING_INT_FLOAT:
-                    data = json.loads(contents, object_hook=parse_json_key_as_int)
-                else:
-                    data = json.loads(contents)
-                return Record(data=data)
-        else:
-            async with aiofiles.open(str(self._uri), mode="rb") as f:  # type: ignore
-                data = await f.read()
-                return Record(data=[data])
+        return self._to_record(await self._read())
+
+    def _load_sync(self) -> Record:
+        if not self.is_transmitted():
+            raise RuntimeError("cannot load untransmitted record")
+        return self._to_record(self._read_sync())
+
+    def _load_indices_sync(
+        self, index: Sequence[Union[StrictStr, StrictInt]]
+    ) -> Record:
+        payload = self._get_payload()
+        if not payload.binary or payload.codec is not None:
+            return super()._load_indices_sync(index)
+        with self.memory_map() as mapped:
+            return _binary_to_record(*_decode_binary(mapped), keys=index)
+
+    @contextlib.contextmanager
+    def memory_map(self) -> Iterator[memoryview]:
+        """Map the transmitted payload read-only into memory, such that parts of
+        large binary records can be accessed without reading the whole file.
+        Compressed payloads are mapped as stored. Empty payloads cannot be
+        mapped.
+        """
+        if not self.is_transmitted():
+            raise RuntimeError("cannot map untransmitted record")
+        payload = self._get_payload()
+        with open(payload.uri, mode="rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                end = (
+                    None if payload.length is None else payload.offset + payload.length
+                )
+                with memoryview(mapped)[payload.offset : end] as view:
+                    yield view
 
     async def dump(self, location: Path) -> None:
         if not self.is_transmitted():
             raise RuntimeError("cannot dump untransmitted record")
-        await _copy(self._uri, str(location))
+        payload = self._get_payload()
+        if not payload.binary and payload.length is None and payload.codec is None:
+            await _copy(payload.uri, str(location))
+        elif not payload.binary:
+            async with aiofiles.open(str(location), mode="wb") as f:  # type: ignore
+                await f.write(await self._read())
+        else:
+            # Forward models expect numerical records as JSON
+            record = await self.load()
+            async with aiofiles.open(str(location), mode="w") as json_file:
+                await json_file.write(json.dumps(record.data))
+
+
+class EnsembleRecordTransmitter:
+    """Transmits all realizations of an ensemble record to a single packed file
+    on shared disk, and hands out a light-weight shared disk transmitter per
+    realization that reads its own part of the file. Identical realizations
+    share their part of the file.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        storage_path: Path,
+        compression: typing.Optional[str] = None,
+        compression_level: typing.Optional[int] = None,
+    ):
+        check_codec(compression)
+        self._storage_path = storage_path
+        self._name = name
+        self._compression = compression
+        self._compression_level = compression_level
+        self._transmitters: typing.Optional[List[SharedDiskRecordTransmitter]] = None
+
+    def is_transmitted(self) -> bool:
+        return self._transmitters is not None
+
+    async def transmit_data(self, ensemble_record: EnsembleRecord) -> None:
+        if self.is_transmitted():
+            raise RuntimeError("Ensemble record already transmitted")
+
+        payloads: List[bytes] = []
+        offsets: Dict[bytes, int] = {}
+        layout = []
+        end = 0
+        for record in ensemble_record.records:
+            contents, binary = _encode(record)
+            # Realizations are compressed one by one, such that each of them
+            # can be read on its own
+            compressed = maybe_compress(
+                contents, self._compression, self._compression_level
+            )
+            codec = None if compressed is None else self._compression
+            contents = compressed or contents
+            if contents not in offsets:
+                offsets[contents] = end
+                payloads.append(contents)
+                end += len(contents)
+            layout.append(
+                (record.record_type, binary, codec, offsets[contents], len(contents))
+            )
+        storage_uri = await _store(self._storage_path, b"".join(payloads), ".pack")
+
+        transmitters = []
+        for record_type, binary, codec, offset, length in layout:
+            transmitter = SharedDiskRecordTransmitter(
+                self._name,
+                self._storage_path,
+                compression=self._compression,
+                compression_level=self._compression_level,
+            )
+            transmitter._set_transmitted(
+                _SharedDiskPayload(
+                    str(storage_uri),
+                    record_type,
+                    binary=binary,
+                    offset=offset,
+                    length=length,
+                    codec=codec,
+                )
+            )
+            transmitters.append(transmitter)
+        self._transmitters = transmitters
+
+    @property
+    def transmitters(self) -> List[SharedDiskRecordTransmitter]:
+        """The transmitters of the realizations, in order."""
+        if self._transmitters is None:
+            raise RuntimeError("cannot get transmitters of untransmitted record")
+        return self._transmitters
 
 
 class InMemoryRecordTransmitter(RecordTransmitter):
@@ -384,9 +873,13 @@ class InMemoryRecordTransmitter(RecordTransmitter):
         self._set_transmitted(record)
 
     async def load(self) -> Record:
+        return self._load_sync()
+
+    def _load_sync(self) -> Record:
         if not self.is_transmitted():
             raise RuntimeError("cannot load untransmitted record")
-        return Record(data=self._data, index=self._index)
+        assert self._data is not None
+        return Record.from_trusted(self._data, index=self._index)
 
     async def dump(self, location: Path) -> None:
         if not self.is_transmitted():
@@ -1,5 +1,6 @@
 from ert3.engine._run import run
 from ert3.engine._export import export
+from ert3.engine._export import EXPORT_FORMATS
 from ert3.engine._record import load_record
 from ert3.engine._record import sample_record
 from ert3.engine._clean import clean
@@ -7,6 +8,7 @@ from ert3.engine._clean import clean
 __all__ = [
     "run",
     "export",
+    "EXPORT_FORMATS",
     "load_record",
     "sample_record",
     "clean",
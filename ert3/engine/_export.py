@@ -1,49 +1,169 @@
 import json
+import tempfile
 from pathlib import Path
-from typing import Set, List, Dict, Any
+from typing import (
+    Any,
+    IO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None  # type: ignore
 
 import ert3
-from ert3.data import Record
+from ert3.data import EnsembleRecord, RecordType
 
+EXPORT_FORMATS = ("json", "jsonl", "parquet")
 
-def _prepare_export(
-    workspace_root: Path,
-    experiment_name: str,
-    parameter_names: Set[str],
-    response_names: Set[str],
-) -> List[Dict[str, Dict[str, Record]]]:
-    data_mapping = [(pname, "input") for pname in parameter_names]
-    data_mapping += [(rname, "output") for rname in response_names]
+_DataMapping = List[Tuple[str, str]]
 
-    data: List[Dict[str, Dict[str, Any]]] = []
+# The number of realizations of a record converted for export at a time
+_EXPORT_BLOCK_SIZE = 1024
 
-    for record_name, data_type in data_mapping:
+
+def _realization_values(ensemble_record: EnsembleRecord) -> Iterator[Any]:
+    try:
+        array = ensemble_record.to_numpy()
+    except (TypeError, ValueError):
+        # Non-numerical or ragged records cannot be represented as a matrix
+        for record in ensemble_record.records:
+            yield record.data
+        return
+
+    # The matrix is converted to Python values a block of realizations at a
+    # time, which avoids converting each row on its own without expanding the
+    # whole ensemble at once
+    index = ensemble_record.index
+    as_list = ensemble_record.record_type == RecordType.LIST_FLOAT
+    for start in range(0, len(array), _EXPORT_BLOCK_SIZE):
+        rows = array[start : start + _EXPORT_BLOCK_SIZE].tolist()
+        if as_list:
+            yield from rows
+        else:
+            for row in rows:
+                yield dict(zip(index, row))
+
+
+def _write_fragments(
+    fragments: IO[bytes],
+    workspace_root: Path,
+    experiment_name: str,
+    data_mapping: _DataMapping,
+) -> Tuple[int, Dict[str, np.ndarray]]:
+    # Records are fetched and encoded one at a time, writing the JSON of each
+    # realization of a record to the fragments file. The offsets of the
+    # fragments of a record are returned by record name, such that the
+    # realizations can be assembled without keeping any record in memory.
+    ensemble_size = None
+    offsets = {}
+    for record_name, _ in data_mapping:
         ensemble_record = ert3.storage.get_ensemble_record(
             workspace=workspace_root,
             experiment_name=experiment_name,
             record_name=record_name,
         )
+        assert ensemble_size in (None, ensemble_record.ensemble_size)
+        ensemble_size = ensemble_record.ensemble_size
+        record_offsets = [fragments.tell()]
+        for value in _realization_values(ensemble_record):
+            fragments.write(json.dumps(value).encode())
+            record_offsets.append(fragments.tell())
+        offsets[record_name] = np.array(record_offsets, dtype=np.int64)
+    return ensemble_size or 0, offsets
 
-        if not data:
-            data = [{"input": {}, "output": {}} for _ in ensemble_record.records]
 
-        assert len(data) == ensemble_record.ensemble_size
-        for realization, record in zip(data, ensemble_record.records):
-            assert record_name not in realization[data_type]
-            realization[data_type][record_name] = record.data
+def _realizations(
+    fragments: IO[bytes],
+    ensemble_size: int,
+    offsets: Mapping[str, np.ndarray],
+    data_mapping: _DataMapping,
+) -> Iterator[str]:
+    # The realizations are assembled one at a time as JSON from the fragments,
+    # formatted as json.dumps would format them
+    for iens in range(ensemble_size):
+        realization: Dict[str, List[str]] = {"input": [], "output": []}
+        for record_name, data_type in data_mapping:
+            start, end = offsets[record_name][iens : iens + 2]
+            fragments.seek(start)
+            value = fragments.read(end - start).decode()
+            realization[data_type].append(f"{json.dumps(record_name)}: {value}")
+        yield (
+            f'{{"input": {{{", ".join(realization["input"])}}}, '
+            f'"output": {{{", ".join(realization["output"])}}}}}'
+        )
 
-    return data
 
+def _write_json(path: Path, realizations: Iterable[str]) -> None:
+    with open(path, "w") as f:
+        f.write("[")
+        for idx, realization in enumerate(realizations):
+            if idx > 0:
+                f.write(", ")
+            f.write(realization)
+        f.write("]")
 
-def export(workspace_root: Path, experiment_name: str) -> None:
-    experiment_root = (
-        Path(workspace_root) / ert3.workspace.EXPERIMENTS_BASE / experiment_name
-    )
-    ert3.workspace.assert_experiment_exists(workspace_root, experiment_name)
 
-    if not ert3.workspace.experiment_has_run(workspace_root, experiment_name):
-        raise ValueError("Cannot export experiment that has not been carried out")
+def _write_jsonl(path: Path, realizations: Iterable[str]) -> None:
+    with open(path, "w") as f:
+        for realization in realizations:
+            f.write(realization)
+            f.write("\n")
+
 
+def _write_parquet(
+    path: Path, workspace_root: Path, experiment_name: str, data_mapping: _DataMapping
+) -> None:
+    if pa is None:
+        raise ert3.exceptions.ErtError(
+            "Exporting to parquet requires the pyarrow package, "
+            "which is installed by: pip install ert[parquet]"
+        )
+    # Records are fetched and turned into columns one at a time, numerical
+    # records get one column per index, other records are stored as JSON. As
+    # every row group of a parquet file holds all columns, the columns are
+    # collected as compact arrow arrays before the file is written, rather
+    # than through a data frame, which would copy them once more.
+    columns: Dict[str, Any] = {}
+    for record_name, data_type in data_mapping:
+        ensemble_record = ert3.storage.get_ensemble_record(
+            workspace=workspace_root,
+            experiment_name=experiment_name,
+            record_name=record_name,
+        )
+        prefix = f"{data_type}.{record_name}"
+        try:
+            array = ensemble_record.to_numpy()
+        except (TypeError, ValueError):
+            columns[prefix] = pa.array(
+                (
+                    json.dumps(record.data, default=repr)
+                    for record in ensemble_record.records
+                ),
+                type=pa.string(),
+            )
+        else:
+            for column, key in enumerate(ensemble_record.index):
+                columns[f"{prefix}.{key}"] = pa.array(array[:, column])
+
+    pq.write_table(pa.table(columns), path)
+
+
+def _get_data_mapping(
+    workspace_root: Path,
+    experiment_name: str,
+    record_names: Optional[Iterable[str]],
+) -> _DataMapping:
     parameter_names = set(
         ert3.storage.get_experiment_parameters(
             workspace=workspace_root, experiment_name=experiment_name
@@ -58,8 +178,51 @@ def export(workspace_root: Path, experiment_name: str) -> None:
         - parameter_names
     )
 
-    data = _prepare_export(
-        workspace_root, experiment_name, parameter_names, response_names
+    if record_names is not None:
+        selected = set(record_names)
+        unknown = selected - parameter_names - response_names
+        if unknown:
+            raise ValueError(
+                f"Cannot export unknown records: {', '.join(sorted(unknown))}"
+            )
+        parameter_names &= selected
+        response_names &= selected
+
+    data_mapping = [(pname, "input") for pname in sorted(parameter_names)]
+    data_mapping += [(rname, "output") for rname in sorted(response_names)]
+    return data_mapping
+
+
+def export(
+    workspace_root: Path,
+    experiment_name: str,
+    export_format: str = "json",
+    record_names: Optional[Iterable[str]] = None,
+) -> None:
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    experiment_root = (
+        Path(workspace_root) / ert3.workspace.EXPERIMENTS_BASE / experiment_name
     )
-    with open(experiment_root / "data.json", "w") as f:
-        json.dump(data, f)
+    ert3.workspace.assert_experiment_exists(workspace_root, experiment_name)
+
+    if not ert3.workspace.experiment_has_run(workspace_root, experiment_name):
+        raise ValueError("Cannot export experiment that has not been carried out")
+
+    data_mapping = _get_data_mapping(workspace_root, experiment_name, record_names)
+    export_path = experiment_root / f"data.{export_format}"
+
+    if export_format == "parquet":
+        _write_parquet(export_path, workspace_root, experiment_name, data_mapping)
+        return
+
+    with tempfile.TemporaryFile() as fragments:
+        ensemble_size, offsets = _write_fragments(
+            fragments, workspace_root, experiment_name, data_mapping
+        )
+        realizations = _realizations(fragments, ensemble_size, offsets, data_mapping)
+        if export_format == "jsonl":
+            _write_jsonl(export_path, realizations)
+        else:
+            _write_json(export_path, realizations)
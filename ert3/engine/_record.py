@@ -2,6 +2,8 @@ import json
 from typing import Optional
 from pathlib import Path
 
+import numpy as np
+
 import ert3
 from ert3.engine import _utils
 
@@ -25,7 +27,7 @@ def sample_record(
     parameter_group_name: str,
     record_name: str,
     ensemble_size: int,
-    experiment_name: Optional[str] = None,
+    seed: Optional[np.random.SeedSequence] = None,
 ) -> None:
     parameters = _utils.load_parameters(workspace)
 
@@ -33,12 +35,12 @@ def sample_record(
         raise ValueError(f"No parameter group found named: {parameter_group_name}")
     distribution = parameters[parameter_group_name]
 
-    ensrecord = ert3.data.EnsembleRecord(
-        records=[distribution.sample() for _ in range(ensemble_size)]
-    )
+    if seed is None:
+        ensrecord = distribution.sample_ensemble(ensemble_size)
+    else:
+        ensrecord = distribution.sample_ensemble_seeded(ensemble_size, seed)
     ert3.storage.add_ensemble_record(
         workspace=workspace,
         record_name=record_name,
         ensemble_record=ensrecord,
-        experiment_name=experiment_name,
     )
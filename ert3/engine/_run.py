@@ -1,5 +1,8 @@
 import pathlib
-from typing import List, Dict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Dict, Optional, Set
+
+import numpy as np
 
 import ert3
 from ert3.engine import _utils
@@ -26,7 +29,6 @@ def _prepare_experiment(
 def _prepare_experiment_record(
     record_name: str,
     record_source: List[str],
-    ensemble_size: int,
     experiment_name: str,
     workspace_root: pathlib.Path,
 ) -> None:
@@ -41,20 +43,79 @@ def _prepare_experiment_record(
             record_name=record_name,
             ensemble_record=ensemble_record,
         )
-    elif record_source[0] == "stochastic":
-        ert3.engine.sample_record(
-            workspace_root,
-            record_source[1],
-            record_name,
-            ensemble_size,
-            experiment_name=experiment_name,
-        )
     else:
         raise ValueError("Unknown record source location {}".format(record_source[0]))
 
 
+def _sample_record(
+    parameters: Dict[str, ert3.stats.Distribution],
+    parameter_group_name: str,
+    ensemble_size: int,
+    seed: Optional[np.random.SeedSequence],
+    executor: Executor,
+) -> ert3.data.EnsembleRecord:
+    if parameter_group_name not in parameters:
+        raise ValueError(f"No parameter group found named: {parameter_group_name}")
+    distribution = parameters[parameter_group_name]
+
+    if seed is None:
+        return distribution.sample_ensemble(ensemble_size)
+    return distribution.sample_ensemble_seeded(ensemble_size, seed, executor=executor)
+
+
+def _sample_design(
+    algorithm: str,
+    parameters: Dict[str, ert3.stats.Distribution],
+    ensemble_size: int,
+    rng: Optional[np.random.Generator],
+) -> Dict[str, ert3.data.EnsembleRecord]:
+    if algorithm == "latin-hypercube":
+        return ert3.algorithms.latin_hypercube(parameters, ensemble_size, rng)
+    elif algorithm == "sobol":
+        return ert3.algorithms.sobol(parameters, ensemble_size, rng)
+    elif algorithm == "halton":
+        return ert3.algorithms.halton(parameters, ensemble_size, rng)
+    raise ValueError(f"Unknown design algorithm {algorithm}")
+
+
+def _prepare_design(
+    ensemble: ert3.config.EnsembleConfig,
+    experiment_config: ert3.config.ExperimentConfig,
+    workspace_root: pathlib.Path,
+    experiment_name: str,
+) -> Set[str]:
+    # This reassures mypy that the ensemble size and algorithm are defined
+    assert ensemble.size is not None
+    assert experiment_config.algorithm is not None
+
+    parameters = _utils.load_parameters(workspace_root)
+    design_parameters = {}
+    for input_record in ensemble.input:
+        record_source = input_record.source.split(".")
+        if record_source[0] == "stochastic":
+            assert len(record_source) == 2
+            design_parameters[input_record.record] = parameters[record_source[1]]
+
+    if not design_parameters:
+        return set()
+
+    rng = None
+    if experiment_config.random_seed is not None:
+        rng = np.random.default_rng(experiment_config.random_seed)
+    design = _sample_design(
+        experiment_config.algorithm, design_parameters, ensemble.size, rng
+    )
+    ert3.storage.add_ensemble_records(
+        workspace=workspace_root,
+        experiment_name=experiment_name,
+        ensemble_records=design,
+    )
+    return set(design)
+
+
 def _prepare_evaluation(
     ensemble: ert3.config.EnsembleConfig,
+    experiment_config: ert3.config.ExperimentConfig,
     workspace_root: pathlib.Path,
     experiment_name: str,
 ) -> None:
@@ -63,12 +124,48 @@ def _prepare_evaluation(
 
     _prepare_experiment(workspace_root, experiment_name, ensemble, ensemble.size)
 
-    for input_record in ensemble.input:
-        record_name = input_record.record
-        record_source = input_record.source.split(".")
+    # With a design algorithm all stochastic input records are sampled jointly
+    designed_records: Set[str] = set()
+    if experiment_config.algorithm is not None:
+        designed_records = _prepare_design(
+            ensemble, experiment_config, workspace_root, experiment_name
+        )
+
+    # Every input record is sampled from its own independent random stream
+    # derived from the experiment seed
+    random_seed = experiment_config.random_seed
+    seeds: List[Optional[np.random.SeedSequence]] = [None] * len(ensemble.input)
+    if random_seed is not None:
+        seeds = list(np.random.SeedSequence(random_seed).spawn(len(ensemble.input)))
 
-        _prepare_experiment_record(
-            record_name, record_source, ensemble.size, experiment_name, workspace_root
+    # The blocks of large seeded ensembles are sampled in parallel, the worker
+    # processes are only started once there is more than one block to sample
+    sampled_records = {}
+    parameters: Optional[Dict[str, ert3.stats.Distribution]] = None
+    with ProcessPoolExecutor() as executor:
+        for input_record, seed in zip(ensemble.input, seeds):
+            record_name = input_record.record
+            if record_name in designed_records:
+                continue
+            record_source = input_record.source.split(".")
+
+            if record_source[0] == "stochastic":
+                assert len(record_source) == 2
+                if parameters is None:
+                    parameters = _utils.load_parameters(workspace_root)
+                sampled_records[record_name] = _sample_record(
+                    parameters, record_source[1], ensemble.size, seed, executor
+                )
+            else:
+                _prepare_experiment_record(
+                    record_name, record_source, experiment_name, workspace_root
+                )
+
+    if sampled_records:
+        ert3.storage.add_ensemble_records(
+            workspace=workspace_root,
+            experiment_name=experiment_name,
+            ensemble_records=sampled_records,
         )
 
 
@@ -91,45 +188,53 @@ def _load_ensemble_parameters(
 
 def _prepare_sensitivity(
     ensemble: ert3.config.EnsembleConfig,
+    experiment_config: ert3.config.ExperimentConfig,
     workspace_root: pathlib.Path,
     experiment_name: str,
 ) -> None:
     parameter_distributions = _load_ensemble_parameters(ensemble, workspace_root)
-    input_records = ert3.algorithms.one_at_the_time(parameter_distributions)
-
-    _prepare_experiment(workspace_root, experiment_name, ensemble, len(input_records))
+    if experiment_config.algorithm == "one-at-a-time":
+        input_records = ert3.algorithms.one_at_the_time(parameter_distributions)
+    elif experiment_config.algorithm == "saltelli":
+        assert experiment_config.sample_size is not None
+        rng = None
+        if experiment_config.random_seed is not None:
+            rng = np.random.default_rng(experiment_config.random_seed)
+        input_records = ert3.algorithms.saltelli(
+            parameter_distributions, experiment_config.sample_size, rng
+        )
+    else:
+        raise ValueError(f"Unknown sensitivity algorithm {experiment_config.algorithm}")
+    assert input_records.keys() == {param.record for param in ensemble.input}
 
-    parameters: Dict[str, List[ert3.data.Record]] = {
-        param.record: [] for param in ensemble.input
-    }
-    for realization in input_records:
-        assert parameters.keys() == realization.keys()
-        for record_name in realization:
-            parameters[record_name].append(realization[record_name])
+    ensemble_size = next(iter(input_records.values())).ensemble_size
+    assert ensemble_size is not None
+    _prepare_experiment(workspace_root, experiment_name, ensemble, ensemble_size)
 
-    for record_name in parameters:
-        ensemble_record = ert3.data.EnsembleRecord(records=parameters[record_name])
-        ert3.storage.add_ensemble_record(
-            workspace=workspace_root,
-            experiment_name=experiment_name,
-            record_name=record_name,
-            ensemble_record=ensemble_record,
-        )
+    ert3.storage.add_ensemble_records(
+        workspace=workspace_root,
+        experiment_name=experiment_name,
+        ensemble_records=input_records,
+    )
 
 
 def _store_responses(
+    ensemble: ert3.config.EnsembleConfig,
     workspace_root: pathlib.Path,
     experiment_name: str,
     responses: ert3.data.MultiEnsembleRecord,
 ) -> None:
     assert responses.record_names is not None
-    for record_name in responses.record_names:
-        ert3.storage.add_ensemble_record(
-            workspace=workspace_root,
-            experiment_name=experiment_name,
-            record_name=record_name,
-            ensemble_record=responses.ensemble_records[record_name],
-        )
+    ert3.storage.add_ensemble_records(
+        workspace=workspace_root,
+        experiment_name=experiment_name,
+        ensemble_records={
+            record_name: responses.ensemble_records[record_name]
+            for record_name in responses.record_names
+        },
+        compression=ensemble.storage.compression,
+        compression_level=ensemble.storage.compression_level,
+    )
 
 
 def _load_experiment_parameters(
@@ -140,13 +245,11 @@ def _load_experiment_parameters(
         workspace=workspace_root, experiment_name=experiment_name
     )
 
-    parameters = {}
-    for parameter_name in parameter_names:
-        parameters[parameter_name] = ert3.storage.get_ensemble_record(
-            workspace=workspace_root,
-            experiment_name=experiment_name,
-            record_name=parameter_name,
-        )
+    parameters = ert3.storage.get_ensemble_records(
+        workspace=workspace_root,
+        experiment_name=experiment_name,
+        record_names=parameter_names,
+    )
 
     return ert3.data.MultiEnsembleRecord(ensemble_records=parameters)
 
@@ -156,12 +259,74 @@ def _evaluate(
     stages_config: ert3.config.StagesConfig,
     workspace_root: pathlib.Path,
     experiment_name: str,
-) -> None:
+) -> ert3.data.MultiEnsembleRecord:
     parameters = _load_experiment_parameters(workspace_root, experiment_name)
     responses = ert3.evaluator.evaluate(
         workspace_root, experiment_name, parameters, ensemble, stages_config
     )
-    _store_responses(workspace_root, experiment_name, responses)
+    _store_responses(ensemble, workspace_root, experiment_name, responses)
+    return responses
+
+
+def _check_saltelli_responses(
+    ensemble: ert3.config.EnsembleConfig, stages_config: ert3.config.StagesConfig
+) -> None:
+    # The indices can only be estimated for numerical responses, so stages
+    # with outputs that are not JSON are rejected before anything is evaluated
+    stage = stages_config.step_from_key(ensemble.forward_model.stage)
+    if stage is None or isinstance(stage, ert3.config.VectorizedFunction):
+        return
+    non_numerical = [
+        output.record for output in stage.output if output.mime != "application/json"
+    ]
+    if non_numerical:
+        raise ert3.exceptions.ErtError(
+            "The saltelli algorithm requires numerical responses, "
+            f"the responses {', '.join(non_numerical)} are not application/json"
+        )
+
+
+def _analyze_saltelli(
+    ensemble: ert3.config.EnsembleConfig,
+    workspace_root: pathlib.Path,
+    experiment_name: str,
+    responses: ert3.data.MultiEnsembleRecord,
+) -> None:
+    parameter_distributions = _load_ensemble_parameters(ensemble, workspace_root)
+    num_variables = sum(len(dist.index) for dist in parameter_distributions.values())
+
+    # The indices are stored as workspace records with one realization per
+    # input variable, in the order of the ensemble inputs and their indices,
+    # and the index of the response.
+    indices = {}
+    assert responses.record_names is not None
+    for record_name in responses.record_names:
+        response = responses.ensemble_records[record_name]
+        try:
+            values = response.to_numpy()
+        except (TypeError, ValueError) as e:
+            raise ert3.exceptions.ErtError(
+                f"Cannot estimate the saltelli indices of {record_name}: {e}"
+            ) from e
+        first_order, total_order = ert3.algorithms.saltelli_indices(
+            values, num_variables
+        )
+        index = (
+            None
+            if response.record_type == ert3.data.RecordType.LIST_FLOAT
+            else response.index
+        )
+        prefix = f"{experiment_name}_{record_name}"
+        indices[f"{prefix}_first_order"] = ert3.data.EnsembleRecord.from_numpy(
+            first_order, index=index
+        )
+        indices[f"{prefix}_total_order"] = ert3.data.EnsembleRecord.from_numpy(
+            total_order, index=index
+        )
+
+    ert3.storage.add_ensemble_records(
+        workspace=workspace_root, ensemble_records=indices
+    )
 
 
 def run(
@@ -172,11 +337,21 @@ def run(
     experiment_name: str,
 ) -> None:
 
+    if experiment_config.algorithm == "saltelli":
+        _check_saltelli_responses(ensemble, stages_config)
+
     if experiment_config.type == "evaluation":
-        _prepare_evaluation(ensemble, workspace_root, experiment_name)
+        _prepare_evaluation(
+            ensemble, experiment_config, workspace_root, experiment_name
+        )
     elif experiment_config.type == "sensitivity":
-        _prepare_sensitivity(ensemble, workspace_root, experiment_name)
+        _prepare_sensitivity(
+            ensemble, experiment_config, workspace_root, experiment_name
+        )
     else:
         raise ValueError(f"Unknown experiment type {experiment_config.type}")
 
-    _evaluate(ensemble, stages_config, workspace_root, experiment_name)
+    responses = _evaluate(ensemble, stages_config, workspace_root, experiment_name)
+
+    if experiment_config.algorithm == "saltelli":
+        _analyze_saltelli(ensemble, workspace_root, experiment_name, responses)
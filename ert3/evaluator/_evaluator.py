@@ -4,19 +4,28 @@ import pathlib
 import shutil
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Iterator, Mapping, List
 
 
 import cloudpickle
+import numpy as np
 from pydantic import FilePath
 
 import ert3
 from ert_shared.ensemble_evaluator.config import EvaluatorServerConfig
 from ert_shared.ensemble_evaluator.evaluator import EnsembleEvaluator
 from ert_shared.ensemble_evaluator.prefect_ensemble import PrefectEnsemble
-
-from ert3.config import EnsembleConfig, StagesConfig, Step
-from ert3.data import EnsembleRecord, MultiEnsembleRecord, RecordTransmitter, Record
+from ert_shared.ensemble_evaluator.process_pool_ensemble import ProcessPoolEnsemble
+
+from ert3.config import EnsembleConfig, StagesConfig, Step, VectorizedFunction
+from ert3.data import (
+    EnsembleRecord,
+    LazyRecord,
+    MultiEnsembleRecord,
+    RecordTransmitter,
+    Record,
+    RecordType,
+)
 
 _EVTYPE_SNAPSHOT_STOPPED = "Stopped"
 _EVTYPE_SNAPSHOT_FAILED = "Failed"
@@ -43,27 +52,37 @@ def _prepare_input(
     storage_config = ee_config["storage"]
     transmitters: Dict[int, Dict[str, ert3.data.RecordTransmitter]] = defaultdict(dict)
 
-    futures = []
+    # Every input record is transmitted as a whole to one packed file, out of
+    # which each realization gets its own transmitter
+    ensemble_transmitters = {}
     for input_ in step_config.input:
-        for iens, record in enumerate(inputs.ensemble_records[input_.record].records):
-            if storage_config.get("type") == "shared_disk":
-                transmitter = ert3.data.SharedDiskRecordTransmitter(
-                    name=input_.record,
-                    storage_path=pathlib.Path(storage_config["storage_path"]),
-                )
-            else:
-                raise ValueError(
-                    f"Unsupported transmitter type: {storage_config.get('type')}"
-                )
-            futures.append(transmitter.transmit_data(record.data))
-            transmitters[iens][input_.record] = transmitter
+        if storage_config.get("type") == "shared_disk":
+            ensemble_transmitters[input_.record] = ert3.data.EnsembleRecordTransmitter(
+                name=input_.record,
+                storage_path=pathlib.Path(storage_config["storage_path"]),
+                compression=storage_config.get("compression"),
+                compression_level=storage_config.get("compression_level"),
+            )
+        else:
+            raise ValueError(
+                f"Unsupported transmitter type: {storage_config.get('type')}"
+            )
+    futures = [
+        ensemble_transmitter.transmit_data(inputs.ensemble_records[record_name])
+        for record_name, ensemble_transmitter in ensemble_transmitters.items()
+    ]
     asyncio.get_event_loop().run_until_complete(asyncio.gather(*futures))
+    for record_name, ensemble_transmitter in ensemble_transmitters.items():
+        for iens, transmitter in enumerate(ensemble_transmitter.transmitters):
+            transmitters[iens][record_name] = transmitter
     if isinstance(step_config, ert3.config.Unix):
         for command in step_config.transportable_commands:
             if storage_config.get("type") == "shared_disk":
                 transmitter = ert3.data.SharedDiskRecordTransmitter(
                     name=command.name,
                     storage_path=pathlib.Path(storage_config["storage_path"]),
+                    compression=storage_config.get("compression"),
+                    compression_level=storage_config.get("compression_level"),
                 )
             else:
                 raise ValueError(
@@ -78,31 +97,61 @@ def _prepare_input(
     return dict(transmitters)
 
 
+class _OutputTransmitters(Mapping[int, Dict[str, RecordTransmitter]]):
+    """The output transmitters of every realization, which are created the
+    first time the outputs of a realization are accessed rather than up front
+    for the whole ensemble.
+    """
+
+    def __init__(
+        self,
+        record_names: List[str],
+        storage_config: Dict[str, Any],
+        ensemble_size: int,
+    ) -> None:
+        self._record_names = record_names
+        self._storage_config = storage_config
+        self._ensemble_size = ensemble_size
+        self._transmitters: Dict[int, Dict[str, RecordTransmitter]] = {}
+
+    def __getitem__(self, iens: int) -> Dict[str, RecordTransmitter]:
+        if not 0 <= iens < self._ensemble_size:
+            raise KeyError(iens)
+        if iens not in self._transmitters:
+            self._transmitters[iens] = {
+                record_name: ert3.data.SharedDiskRecordTransmitter(
+                    name=record_name,
+                    storage_path=pathlib.Path(self._storage_config["storage_path"]),
+                    compression=self._storage_config.get("compression"),
+                    compression_level=self._storage_config.get("compression_level"),
+                )
+                for record_name in self._record_names
+            }
+        return self._transmitters[iens]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._ensemble_size))
+
+    def __len__(self) -> int:
+        return self._ensemble_size
+
+
 def _prepare_output(
     ee_config: Dict[str, Any],
     step_config: Step,
     evaluation_tmp_dir: Path,
     ensemble_size: int,
-) -> Dict[int, Dict[str, RecordTransmitter]]:
+) -> Mapping[int, Dict[str, RecordTransmitter]]:
     tmp_input_folder = evaluation_tmp_dir / "output_files"
     os.makedirs(tmp_input_folder)
     storage_config = ee_config["storage"]
-    transmitters: Dict[int, Dict[str, ert3.data.RecordTransmitter]] = defaultdict(dict)
-
-    for output in step_config.output:
-        for iens in range(0, ensemble_size):
-            if storage_config.get("type") == "shared_disk":
-                transmitters[iens][
-                    output.record
-                ] = ert3.data.SharedDiskRecordTransmitter(
-                    name=output.record,
-                    storage_path=pathlib.Path(storage_config["storage_path"]),
-                )
-            else:
-                raise ValueError(
-                    f"Unsupported transmitter type: {storage_config.get('type')}"
-                )
-    return dict(transmitters)
+    if step_config.output and storage_config.get("type") != "shared_disk":
+        raise ValueError(f"Unsupported transmitter type: {storage_config.get('type')}")
+    return _OutputTransmitters(
+        [output.record for output in step_config.output],
+        storage_config,
+        ensemble_size,
+    )
 
 
 def _build_ee_config(
@@ -194,6 +243,8 @@ def _build_ee_config(
         "storage": {
             "type": "shared_disk",
             "storage_path": evaluation_tmp_dir / ".my_storage",
+            "compression": ensemble.storage.compression,
+            "compression_level": ensemble.storage.compression_level,
         },
         "dispatch_uri": dispatch_uri,
     }
@@ -211,7 +262,7 @@ def _build_ee_config(
 
 def _run(
     ensemble_evaluator: EnsembleEvaluator,
-) -> Dict[int, Dict[str, RecordTransmitter]]:
+) -> Mapping[int, Dict[str, RecordTransmitter]]:
     result = {}
     with ensemble_evaluator.run() as monitor:
         for event in monitor.track():
@@ -225,37 +276,107 @@ def _run(
     return result
 
 
+def _build_ensemble_record(records: List[Record]) -> EnsembleRecord:
+    # The records are loaded from transmitters and need no further validation
+    if not records:
+        return EnsembleRecord.from_trusted(records)
+    record_type = records[0].record_type
+    index = records[0].index
+    if record_type == RecordType.LIST_BYTES or any(
+        record.record_type != record_type or record.index != index for record in records
+    ):
+        return EnsembleRecord.from_trusted(records)
+    # Only floating point responses are array-backed, as integer responses
+    # would otherwise be returned as floats
+    if not all(
+        isinstance(value, float)
+        for record in records
+        for value in (
+            record.data.values() if isinstance(record.data, Mapping) else record.data
+        )
+    ):
+        return EnsembleRecord.from_trusted(records)
+    return EnsembleRecord.from_numpy(
+        np.stack([record.to_numpy() for record in records]),
+        index=None if record_type == RecordType.LIST_FLOAT else index,
+    )
+
+
+class _LazyEnsembleRecords(Mapping[str, EnsembleRecord]):
+    """Response ensemble records that are read from lazy handles to the records
+    of their realizations the first time they are accessed, such that
+    responses that are not used are never loaded.
+    """
+
+    def __init__(self, handles: Dict[str, List[LazyRecord]]) -> None:
+        self._handles = handles
+        self._ensemble_records: Dict[str, EnsembleRecord] = {}
+
+    def __getitem__(self, key: str) -> EnsembleRecord:
+        if key not in self._ensemble_records:
+            records = [handle.load() for handle in self._handles[key]]
+            self._ensemble_records[key] = _build_ensemble_record(records)
+        return self._ensemble_records[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._handles)
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+
 def _prepare_responses(
-    raw_responses: Dict[int, Dict[str, RecordTransmitter]]
+    raw_responses: Mapping[int, Dict[str, RecordTransmitter]]
 ) -> MultiEnsembleRecord:
-    async def _load(
-        iens: int, record_key: str, transmitter: RecordTransmitter
-    ) -> Tuple[int, str, Record]:
-        record = await transmitter.load()
-        return (iens, record_key, record)
-
-    futures = []
-    for iens in sorted(raw_responses.keys(), key=int):
-        for record, transmitter in raw_responses[iens].items():
-            futures.append(_load(iens, record, transmitter))
-    results = asyncio.get_event_loop().run_until_complete(asyncio.gather(*futures))
-
-    data_results: Dict[int, Dict[str, Record]] = defaultdict(dict)
-    for res in results:
-        data_results[res[0]][res[1]] = res[2]
-
-    responses: Dict[str, List[Record]] = {
-        response_name: [] for response_name in data_results[0]
+    realizations = sorted(raw_responses.keys(), key=int)
+    handles: Dict[str, List[LazyRecord]] = {
+        response_name: []
+        for response_name in (raw_responses[realizations[0]] if realizations else {})
     }
-    for realization in data_results.values():
-        assert responses.keys() == realization.keys()
-        for key in realization:
-            responses[key].append(realization[key])
+    for iens in realizations:
+        assert handles.keys() == raw_responses[iens].keys()
+        for response_name, transmitter in raw_responses[iens].items():
+            handles[response_name].append(transmitter.load_lazy())
+
+    # The ensemble records are validated as they are loaded, so the multi
+    # ensemble record is created without validation, which would load them all
+    return MultiEnsembleRecord.construct(
+        ensemble_records=_LazyEnsembleRecords(handles),
+        record_names=tuple(handles),
+        ensemble_size=len(realizations),
+    )
 
-    ensemble_records: Dict[str, EnsembleRecord] = {}
-    for key in responses:
-        ensemble_records[key] = EnsembleRecord(records=responses[key])
 
+def _evaluate_vectorized(
+    stage: VectorizedFunction,
+    input_records: MultiEnsembleRecord,
+    ensemble_size: int,
+) -> MultiEnsembleRecord:
+    kwargs = {
+        input_.record: input_records.ensemble_records[input_.record].to_numpy()
+        for input_ in stage.input
+    }
+    output = stage.vectorized_function(**kwargs)
+    if len(stage.output) == 1 and not isinstance(output, Mapping):
+        output = {stage.output[0].record: output}
+    if not isinstance(output, Mapping) or set(output) != {
+        out.record for out in stage.output
+    }:
+        raise ValueError(
+            f"Vectorized function {stage.name} should return an array for each "
+            f"output record: {', '.join(out.record for out in stage.output)}"
+        )
+
+    ensemble_records = {}
+    for record_name, data in output.items():
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim != 2 or data.shape[0] != ensemble_size:
+            raise ValueError(
+                f"Vectorized function {stage.name} returned an array of shape "
+                f"{data.shape} for {record_name}, expected "
+                f"({ensemble_size}, index size)"
+            )
+        ensemble_records[record_name] = EnsembleRecord.from_numpy(data)
     return MultiEnsembleRecord(ensemble_records=ensemble_records)
 
 
@@ -266,6 +387,15 @@ def evaluate(
     ensemble_config: EnsembleConfig,
     stages_config: StagesConfig,
 ) -> MultiEnsembleRecord:
+    # Vectorized functions evaluate the whole ensemble in-process at once
+    stage = stages_config.step_from_key(ensemble_config.forward_model.stage)
+    if isinstance(stage, VectorizedFunction):
+        ensemble_size = ensemble_config.size
+        if ensemble_size is None:
+            ensemble_size = input_records.ensemble_size
+        assert ensemble_size is not None
+        return _evaluate_vectorized(stage, input_records, ensemble_size)
+
     evaluation_tmp_dir = _create_evaluator_tmp_dir(workspace_root, evaluation_name)
 
     config = EvaluatorServerConfig()
@@ -276,7 +406,10 @@ def evaluate(
         input_records,
         config.dispatch_uri,
     )
-    ensemble = PrefectEnsemble(ee_config)  # type: ignore
+    if ensemble_config.forward_model.driver == "process_pool":
+        ensemble = ProcessPoolEnsemble(ee_config)  # type: ignore
+    else:
+        ensemble = PrefectEnsemble(ee_config)  # type: ignore
 
     ee = EnsembleEvaluator(ensemble=ensemble, config=config, iter_=0)
     result = _run(ee)
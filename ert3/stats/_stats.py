@@ -1,3 +1,5 @@
+from concurrent.futures import Executor
+from itertools import repeat
 from typing import Optional, Tuple, Callable
 
 import numpy as np
@@ -5,6 +7,19 @@ import scipy.stats
 
 import ert3
 
+# Number of realizations drawn from each random stream in seeded sampling.
+# It is part of the definition of the seeded samples, changing it changes
+# the samples drawn for a given seed.
+_SEEDED_BLOCK_SIZE = 4096
+
+
+def _sample_block(
+    distribution: "Distribution", block_size: int, seed: np.random.SeedSequence
+) -> np.ndarray:
+    return distribution._raw_rvs(
+        (block_size, len(distribution.index)), np.random.default_rng(seed)
+    )
+
 
 class Distribution:
     def __init__(
@@ -12,8 +27,8 @@ class Distribution:
         *,
         size: Optional[int],
         index: Optional[Tuple[int, ...]],
-        rvs: Callable[[int], np.ndarray],
-        ppf: Callable[[np.ndarray], np.ndarray]
+        rvs: Callable[[Tuple[int, ...], Optional[np.random.Generator]], np.ndarray],
+        ppf: Callable[[np.ndarray], np.ndarray],
     ) -> None:
         if size is None and index is None:
             raise ValueError("Cannot create distribution with neither size nor index")
@@ -38,20 +53,89 @@ class Distribution:
 
     def _to_record(self, x: np.ndarray) -> ert3.data.Record:
         if self._as_array:
-            return ert3.data.Record(data=x.tolist())
+            return ert3.data.Record.from_trusted(x.tolist(), index=self.index)
         else:
-            return ert3.data.Record(
-                data={idx: float(val) for idx, val in zip(self.index, x)}
+            return ert3.data.Record.from_trusted(
+                {idx: float(val) for idx, val in zip(self.index, x)}, index=self.index
             )
 
-    def sample(self) -> ert3.data.Record:
-        return self._to_record(self._raw_rvs(self._size))
+    def sample(self, rng: Optional[np.random.Generator] = None) -> ert3.data.Record:
+        return self._to_record(self._raw_rvs((self._size,), rng))
+
+    def sample_ensemble(
+        self, ensemble_size: int, rng: Optional[np.random.Generator] = None
+    ) -> ert3.data.EnsembleRecord:
+        """Draw all realizations as one (ensemble_size x size) matrix and return
+        them as an array-backed ensemble record. If no generator is given the
+        global random state is used.
+        """
+        if ensemble_size < 0:
+            raise ValueError("Cannot sample an ensemble of negative size")
+        samples = self._raw_rvs((ensemble_size, self._size), rng)
+        return ert3.data.EnsembleRecord.from_numpy(
+            samples, index=None if self._as_array else self.index
+        )
+
+    def sample_ensemble_seeded(
+        self,
+        ensemble_size: int,
+        seed: np.random.SeedSequence,
+        executor: Optional[Executor] = None,
+    ) -> ert3.data.EnsembleRecord:
+        """Reproducibly sample an ensemble from a seed. The realizations are
+        drawn in fixed size blocks, each from an independent stream derived
+        from the seed, such that the result only depends on the seed and the
+        realizations of a smaller ensemble are the first ones of a larger one.
+        The blocks are sampled in parallel if an executor is given, which gives
+        the same result as serial sampling.
+        """
+        if ensemble_size < 0:
+            raise ValueError("Cannot sample an ensemble of negative size")
+        block_sizes = [
+            min(_SEEDED_BLOCK_SIZE, ensemble_size - start)
+            for start in range(0, ensemble_size, _SEEDED_BLOCK_SIZE)
+        ]
+        # The block streams are derived explicitly instead of through
+        # seed.spawn(), which would make the result depend on earlier calls.
+        block_seeds = [
+            np.random.SeedSequence(
+                seed.entropy,
+                spawn_key=(*seed.spawn_key, block_idx),
+                pool_size=seed.pool_size,
+            )
+            for block_idx in range(len(block_sizes))
+        ]
+        if executor is None or len(block_sizes) < 2:
+            blocks = list(map(_sample_block, repeat(self), block_sizes, block_seeds))
+        else:
+            blocks = list(
+                executor.map(_sample_block, repeat(self), block_sizes, block_seeds)
+            )
+
+        samples = np.concatenate(blocks) if blocks else np.empty((0, len(self.index)))
+        return ert3.data.EnsembleRecord.from_numpy(
+            samples, index=None if self._as_array else self.index
+        )
 
     def ppf(self, x: float) -> ert3.data.Record:
         x_array = np.full(self._size, x)
         result = self._raw_ppf(x_array)
         return self._to_record(result)
 
+    def ppf_ensemble(self, x: np.ndarray) -> ert3.data.EnsembleRecord:
+        """Evaluate the percent point function on a (realizations x size)
+        matrix of quantiles and return the result as an array-backed ensemble
+        record.
+        """
+        if x.ndim != 2 or x.shape[1] != self._size:
+            raise ValueError(
+                f"Expected quantiles of shape (realizations, {self._size}), "
+                f"got {x.shape}"
+            )
+        return ert3.data.EnsembleRecord.from_numpy(
+            self._raw_ppf(x), index=None if self._as_array else self.index
+        )
+
 
 class Gaussian(Distribution):
     def __init__(
@@ -60,26 +144,32 @@ class Gaussian(Distribution):
         std: float,
         *,
         size: Optional[int] = None,
-        index: Optional[Tuple[int, ...]] = None
+        index: Optional[Tuple[int, ...]] = None,
     ) -> None:
         self._mean = mean
         self._std = std
 
-        def rvs(size: int) -> np.ndarray:
-            return np.array(
-                scipy.stats.norm.rvs(loc=self._mean, scale=self._std, size=size)
-            )
-
-        def ppf(x: np.ndarray) -> np.ndarray:
-            return np.array(scipy.stats.norm.ppf(x, loc=self._mean, scale=self._std))
-
+        # Bound methods are used rather than closures, such that the
+        # distribution can be pickled and sampled in other processes
         super().__init__(
             size=size,
             index=index,
-            rvs=rvs,
-            ppf=ppf,
+            rvs=self._rvs,
+            ppf=self._ppf,
+        )
+
+    def _rvs(
+        self, size: Tuple[int, ...], rng: Optional[np.random.Generator]
+    ) -> np.ndarray:
+        return np.array(
+            scipy.stats.norm.rvs(
+                loc=self._mean, scale=self._std, size=size, random_state=rng
+            )
         )
 
+    def _ppf(self, x: np.ndarray) -> np.ndarray:
+        return np.array(scipy.stats.norm.ppf(x, loc=self._mean, scale=self._std))
+
 
 class Uniform(Distribution):
     def __init__(
@@ -88,27 +178,29 @@ class Uniform(Distribution):
         upper_bound: float,
         *,
         size: Optional[int] = None,
-        index: Optional[Tuple[int, ...]] = None
+        index: Optional[Tuple[int, ...]] = None,
     ) -> None:
         self._lower_bound = lower_bound
         self._upper_bound = upper_bound
         self._scale = upper_bound - lower_bound
 
-        def rvs(size: int) -> np.ndarray:
-            return np.array(
-                scipy.stats.uniform.rvs(
-                    loc=self._lower_bound, scale=self._scale, size=self._size
-                )
-            )
-
-        def ppf(x: np.ndarray) -> np.ndarray:
-            return np.array(
-                scipy.stats.uniform.ppf(x, loc=self._lower_bound, scale=self._scale)
-            )
-
         super().__init__(
             size=size,
             index=index,
-            rvs=rvs,
-            ppf=ppf,
+            rvs=self._rvs,
+            ppf=self._ppf,
+        )
+
+    def _rvs(
+        self, size: Tuple[int, ...], rng: Optional[np.random.Generator]
+    ) -> np.ndarray:
+        return np.array(
+            scipy.stats.uniform.rvs(
+                loc=self._lower_bound, scale=self._scale, size=size, random_state=rng
+            )
+        )
+
+    def _ppf(self, x: np.ndarray) -> np.ndarray:
+        return np.array(
+            scipy.stats.uniform.ppf(x, loc=self._lower_bound, scale=self._scale)
         )
@@ -2,7 +2,9 @@ from ert3.storage._storage import init
 from ert3.storage._storage import init_experiment
 from ert3.storage._storage import get_experiment_names
 from ert3.storage._storage import add_ensemble_record
+from ert3.storage._storage import add_ensemble_records
 from ert3.storage._storage import get_ensemble_record
+from ert3.storage._storage import get_ensemble_records
 from ert3.storage._storage import get_ensemble_record_names
 from ert3.storage._storage import get_experiment_parameters
 from ert3.storage._storage import delete_experiment
@@ -12,7 +14,9 @@ __all__ = [
     "init_experiment",
     "get_experiment_names",
     "add_ensemble_record",
+    "add_ensemble_records",
     "get_ensemble_record",
+    "get_ensemble_records",
     "get_ensemble_record_names",
     "get_experiment_parameters",
     "delete_experiment",
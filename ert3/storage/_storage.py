@@ -1,12 +1,26 @@
 import codecs
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, cast, Set
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    cast,
+    Set,
+)
 import io
 
 import cloudpickle
+import numpy as np
 import requests
 import ert3
+from ert3.data._compression import check_codec, decompress, maybe_compress
 
 
 _STORAGE_URL = "http://localhost:8000"
@@ -15,18 +29,79 @@ _PARAMETERS = "__parameters__"
 _ENSEMBLE_RECORDS = "__ensemble_records__"
 _SPECIAL_KEYS = (_ENSEMBLE_RECORDS,)
 
+_NUMERICAL_MIME_TYPE = "application/x-numpy"
+_PICKLE_MIME_TYPE = "application/x-python-pickle"
+_RECORD_TYPE = "record_type"
+_RECORD_INDEX = "index"
+_RECORD_ENCODING = "encoding"
+_RECORD_COMPRESSION = "compression"
+_NUMERICAL_ENCODING = "numpy"
+_PICKLE_ENCODING = "pickle"
 
-def _get_experiment_by_name(experiment_name: str) -> Dict[str, Any]:
-    response = requests.get(url=f"{_STORAGE_URL}/experiments")
-    if response.status_code != 200:
-        raise ert3.exceptions.StorageError(response.text)
-    experiments = {exp["name"]: exp for exp in response.json()}
-    return experiments.get(experiment_name, None)
+# Upper bound on the number of record requests in flight at the same time
+_MAX_CONCURRENT_REQUESTS = 8
+
+
+class _StorageClient:
+    """HTTP client for ert-storage.
+
+    All requests go through one pooled, keep-alive session, which is sized
+    such that record requests can be issued concurrently. The list of
+    experiments is fetched once and cached until an experiment is created or
+    deleted through the client.
+    """
+
+    def __init__(self, url: str, session: Optional[requests.Session] = None) -> None:
+        self._url = url
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_maxsize=_MAX_CONCURRENT_REQUESTS
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self._session = session
+        self._experiments: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        return self._session.get(url=f"{self._url}{path}", **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> requests.Response:
+        return self._session.post(url=f"{self._url}{path}", **kwargs)
+
+    def put(self, path: str, **kwargs: Any) -> requests.Response:
+        return self._session.put(url=f"{self._url}{path}", **kwargs)
+
+    def patch(self, path: str, **kwargs: Any) -> requests.Response:
+        return self._session.patch(url=f"{self._url}{path}", **kwargs)
+
+    def delete(self, path: str, **kwargs: Any) -> requests.Response:
+        return self._session.delete(url=f"{self._url}{path}", **kwargs)
+
+    @property
+    def experiments(self) -> Dict[str, Dict[str, Any]]:
+        if self._experiments is None:
+            response = self.get("/experiments")
+            if response.status_code != 200:
+                raise ert3.exceptions.StorageError(response.text)
+            self._experiments = {exp["name"]: exp for exp in response.json()}
+        return self._experiments
+
+    def invalidate_experiments(self) -> None:
+        self._experiments = None
+
+
+@lru_cache(maxsize=None)
+def _get_client() -> _StorageClient:
+    return _StorageClient(_STORAGE_URL)
+
+
+def _get_experiment_by_name(experiment_name: str) -> Optional[Dict[str, Any]]:
+    return _get_client().experiments.get(experiment_name, None)
 
 
 def init(*, workspace: Path) -> None:
-    response = requests.get(url=f"{_STORAGE_URL}/experiments")
-    experiment_names = {exp["name"]: exp["ensembles"] for exp in response.json()}
+    experiment_names = _get_client().experiments.keys()
 
     for special_key in _SPECIAL_KEYS:
         if f"{workspace}.{special_key}" in experiment_names:
@@ -70,15 +145,16 @@ def _init_experiment(
     if _get_experiment_by_name(experiment_name) is not None:
         raise KeyError(f"Cannot initialize existing experiment: {experiment_name}")
 
-    exp_response = requests.post(
-        url=f"{_STORAGE_URL}/experiments", json={"name": experiment_name}
-    )
+    client = _get_client()
+    client.invalidate_experiments()
+    exp_response = client.post("/experiments", json={"name": experiment_name})
     exp_id = exp_response.json()["id"]
-    response = requests.post(
-        url=f"{_STORAGE_URL}/experiments/{exp_id}/ensembles",
+    response = client.post(
+        f"/experiments/{exp_id}/ensembles",
         json={
             "parameters": list(parameters),
             "size": ensemble_size,
+            "metadata": {},
         },
     )
     if response.status_code != 200:
@@ -86,8 +162,7 @@ def _init_experiment(
 
 
 def get_experiment_names(*, workspace: Path) -> Set[str]:
-    response = response = requests.get(url=f"{_STORAGE_URL}/experiments")
-    experiment_names = {exp["name"] for exp in response.json()}
+    experiment_names = set(_get_client().experiments.keys())
     for special_key in _SPECIAL_KEYS:
         key = f"{workspace}.{special_key}"
         if key in experiment_names:
@@ -95,22 +170,14 @@ def get_experiment_names(*, workspace: Path) -> Set[str]:
     return experiment_names
 
 
-def _add_data(
-    workspace: Path, experiment_name: str, record_name: str, data: Any
-) -> None:
-
+def _get_ensemble_id(experiment_name: str, error_message: str) -> str:
     experiment = _get_experiment_by_name(experiment_name)
     if experiment is None:
-        raise KeyError(
-            f"Cannot add {record_name} data to "
-            f"non-existing experiment: {experiment_name}"
-        )
+        raise KeyError(error_message)
+    return str(experiment["ensembles"][0])  # currently just one ens per exp
 
-    ensemble_id = experiment["ensembles"][0]  # currently just one ens per exp
-    response = requests.post(
-        url=f"{_STORAGE_URL}/ensembles/{ensemble_id}/records/{record_name}/file",
-        files={"file": (record_name, io.StringIO(data), "something")},
-    )
+
+def _check_record_response(response: requests.Response) -> None:
     if response.status_code == 409:
         raise KeyError("Record already exists")
 
@@ -118,75 +185,311 @@ def _add_data(
         raise ert3.exceptions.StorageError(response.text)
 
 
-def _get_data(workspace: Path, experiment_name: str, record_name: str) -> Any:
-    experiment = _get_experiment_by_name(experiment_name)
-    if experiment is None:
-        raise KeyError(
-            f"Cannot get {record_name} data, no experiment named: {experiment_name}"
-        )
+def _run_concurrently(
+    calls: Iterable[Callable[[], Any]], return_exceptions: bool = False
+) -> List[Any]:
+    # As with asyncio.gather, the exceptions raised by the calls are returned
+    # in place of their results if return_exceptions is set
+    pending = list(calls)
+    if len(pending) <= 1 and not return_exceptions:
+        return [call() for call in pending]
+    max_workers = max(1, min(len(pending), _MAX_CONCURRENT_REQUESTS))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(call) for call in pending]
+    if return_exceptions:
+        return [future.exception() or future.result() for future in futures]
+    return [future.result() for future in futures]
+
+
+def _add_records_metadata(
+    ensemble_id: str, metadata: Mapping[str, Dict[str, Any]]
+) -> None:
+    # The record metadata is kept in the ensemble metadata, such that the
+    # metadata of all records in an ensemble can be fetched in one request.
+    response = _get_client().patch(
+        f"/ensembles/{ensemble_id}/metadata", json=dict(metadata)
+    )
+    if response.status_code != 200:
+        raise ert3.exceptions.StorageError(response.text)
+
+
+def _get_records_metadata(ensemble_id: str) -> Dict[str, Dict[str, Any]]:
+    response = _get_client().get(f"/ensembles/{ensemble_id}/metadata")
+    if response.status_code != 200:
+        raise ert3.exceptions.StorageError(response.text)
+    return cast(Dict[str, Dict[str, Any]], response.json())
+
+
+def _add_numerical_data(
+    ensemble_id: str,
+    record_name: str,
+    ensemble_record: ert3.data.EnsembleRecord,
+    array: np.ndarray,
+) -> Dict[str, Any]:
+    stream = io.BytesIO()
+    np.save(stream, array.astype("<f8", copy=False), allow_pickle=False)
+    response = _get_client().post(
+        f"/ensembles/{ensemble_id}/records/{record_name}/matrix",
+        data=stream.getvalue(),
+        headers={"content-type": _NUMERICAL_MIME_TYPE},
+    )
+    _check_record_response(response)
+
+    record_type = ensemble_record.record_type
+    index = (
+        None
+        if record_type == ert3.data.RecordType.LIST_FLOAT
+        else ensemble_record.index
+    )
+    return {
+        _RECORD_ENCODING: _NUMERICAL_ENCODING,
+        _RECORD_TYPE: record_type.value,
+        _RECORD_INDEX: None if index is None else list(index),
+    }
+
+
+def _add_pickled_data(
+    ensemble_id: str,
+    record_name: str,
+    ensemble_record: ert3.data.EnsembleRecord,
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+) -> Dict[str, Any]:
+    # The pickle is compressed on the client, such that the storage server only
+    # sees an opaque file. The codec is kept in the record metadata.
+    content = cloudpickle.dumps(ensemble_record)
+    compressed = maybe_compress(content, compression, compression_level)
+    response = _get_client().post(
+        f"/ensembles/{ensemble_id}/records/{record_name}/file",
+        files={
+            "file": (
+                record_name,
+                io.BytesIO(compressed or content),
+                _PICKLE_MIME_TYPE,
+            )
+        },
+    )
+    _check_record_response(response)
+    return {
+        _RECORD_ENCODING: _PICKLE_ENCODING,
+        _RECORD_TYPE: ensemble_record.record_type.value,
+        _RECORD_COMPRESSION: None if compressed is None else compression,
+    }
+
 
-    ensemble_id = experiment["ensembles"][0]  # currently just one ens per exp
-    response = requests.get(
-        url=f"{_STORAGE_URL}/ensembles/{ensemble_id}/records/{record_name}"
+def _get_data(
+    ensemble_id: str,
+    experiment_name: str,
+    record_name: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> bytes:
+    response = _get_client().get(
+        f"/ensembles/{ensemble_id}/records/{record_name}", headers=headers
     )
 
     if response.status_code == 404:
         raise KeyError(f"No {record_name} data for experiment: {experiment_name}")
 
+    if response.status_code != 200:
+        raise ert3.exceptions.StorageError(response.text)
+
     return response.content
 
 
-def add_ensemble_record(
-    *,
-    workspace: Path,
+def _is_float_matrix(ensemble_record: ert3.data.EnsembleRecord) -> bool:
+    records = ensemble_record.records
+    if any(record.index != records[0].index for record in records):
+        return False
+    return all(
+        isinstance(value, float)
+        for record in records
+        for value in (
+            record.data.values() if isinstance(record.data, Mapping) else record.data
+        )
+    )
+
+
+def _add_data(
+    ensemble_id: str,
     record_name: str,
     ensemble_record: ert3.data.EnsembleRecord,
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+) -> Dict[str, Any]:
+    # Floating point ensemble records that can be represented as a
+    # (realizations x index) matrix are sent to the numerical endpoint as raw
+    # little-endian float64 data in the .npy format. The record type and index
+    # are stored as record metadata, since a plain matrix would otherwise lose
+    # information such as integer keys in a mapping. Everything else, including
+    # integer records which would be loaded as floats, is stored as a pickled
+    # file, which is optionally compressed.
+    if _is_float_matrix(ensemble_record):
+        return _add_numerical_data(
+            ensemble_id, record_name, ensemble_record, ensemble_record.to_numpy()
+        )
+    return _add_pickled_data(
+        ensemble_id, record_name, ensemble_record, compression, compression_level
+    )
+
+
+def add_ensemble_records(
+    *,
+    workspace: Path,
+    ensemble_records: Mapping[str, ert3.data.EnsembleRecord],
     experiment_name: Optional[str] = None,
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
 ) -> None:
+    check_codec(compression)
     if experiment_name is None:
         experiment_name = f"{workspace}.{_ENSEMBLE_RECORDS}"
 
-    # If a Record is serialized to JSON without associating it with a type,
-    # information is lost. For instance, serializing an int mapping
-    # {0: 1, 1: 3} to JSON, keys are made into strings in JSON. If it is not
-    # known that the Record is a int, str map, information is lost.
-    #
-    # TODO: https://github.com/equinor/ert/issues/1550 should implement better
-    # usage of ert-storage, specifically using numerical endpoints when
-    # applicable.
-    pickle_str = codecs.encode(cloudpickle.dumps(ensemble_record), "base64").decode()
-    data = json.dumps({"data": pickle_str})
-    _add_data(workspace, experiment_name, record_name, data)
+    ensemble_id = _get_ensemble_id(
+        experiment_name,
+        f"Cannot add {', '.join(ensemble_records)} data to "
+        f"non-existing experiment: {experiment_name}",
+    )
+    if not ensemble_records:
+        return
+
+    # The records are uploaded concurrently, while the metadata of all of them
+    # is added in a single request. If an upload fails, the metadata of the
+    # records that were uploaded is still added before the failure is raised,
+    # such that no stored record is left without its metadata.
+    results = _run_concurrently(
+        (
+            partial(
+                _add_data,
+                ensemble_id,
+                record_name,
+                ensemble_record,
+                compression,
+                compression_level,
+            )
+            for record_name, ensemble_record in ensemble_records.items()
+        ),
+        return_exceptions=True,
+    )
+    metadata = {
+        record_name: result
+        for record_name, result in zip(ensemble_records, results)
+        if not isinstance(result, BaseException)
+    }
+    if metadata:
+        _add_records_metadata(ensemble_id, metadata)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
 
 
-def get_ensemble_record(
+def add_ensemble_record(
     *,
     workspace: Path,
     record_name: str,
+    ensemble_record: ert3.data.EnsembleRecord,
     experiment_name: Optional[str] = None,
+) -> None:
+    add_ensemble_records(
+        workspace=workspace,
+        ensemble_records={record_name: ensemble_record},
+        experiment_name=experiment_name,
+    )
+
+
+def _load_numerical_data(
+    ensemble_id: str, experiment_name: str, record_name: str, metadata: Dict[str, Any]
 ) -> ert3.data.EnsembleRecord:
-    if experiment_name is None:
-        experiment_name = f"{workspace}.{_ENSEMBLE_RECORDS}"
-    data = json.loads(_get_data(workspace, experiment_name, record_name))["data"]
+    content = _get_data(
+        ensemble_id,
+        experiment_name,
+        record_name,
+        headers={"accept": _NUMERICAL_MIME_TYPE},
+    )
+    array = np.load(io.BytesIO(content), allow_pickle=False)
+    index = metadata[_RECORD_INDEX]
+    return ert3.data.EnsembleRecord.from_numpy(
+        array, index=None if index is None else tuple(index)
+    )
+
+
+def _load_data(
+    ensemble_id: str, experiment_name: str, record_name: str, metadata: Dict[str, Any]
+) -> ert3.data.EnsembleRecord:
+    encoding = metadata.get(_RECORD_ENCODING)
+
+    if encoding == _NUMERICAL_ENCODING:
+        return _load_numerical_data(ensemble_id, experiment_name, record_name, metadata)
+
+    content = _get_data(ensemble_id, experiment_name, record_name)
+    if encoding == _PICKLE_ENCODING:
+        codec = metadata.get(_RECORD_COMPRESSION)
+        if codec is not None:
+            content = decompress(content, codec)
+        return cast(ert3.data.EnsembleRecord, cloudpickle.loads(content))
+
+    # Records stored before the record encoding was introduced are base64
+    # encoded pickles wrapped in JSON.
+    data = json.loads(content)["data"]
     return cast(
         ert3.data.EnsembleRecord,
         cloudpickle.loads(codecs.decode(data.encode(), "base64")),
     )
 
 
+def get_ensemble_records(
+    *,
+    workspace: Path,
+    record_names: Iterable[str],
+    experiment_name: Optional[str] = None,
+) -> Dict[str, ert3.data.EnsembleRecord]:
+    if experiment_name is None:
+        experiment_name = f"{workspace}.{_ENSEMBLE_RECORDS}"
+
+    record_names = list(record_names)
+    ensemble_id = _get_ensemble_id(
+        experiment_name,
+        f"Cannot get {', '.join(record_names)} data, "
+        f"no experiment named: {experiment_name}",
+    )
+    metadata = _get_records_metadata(ensemble_id) if record_names else {}
+
+    ensemble_records = _run_concurrently(
+        partial(
+            _load_data,
+            ensemble_id,
+            experiment_name,
+            record_name,
+            metadata.get(record_name, {}),
+        )
+        for record_name in record_names
+    )
+    return dict(zip(record_names, ensemble_records))
+
+
+def get_ensemble_record(
+    *,
+    workspace: Path,
+    record_name: str,
+    experiment_name: Optional[str] = None,
+) -> ert3.data.EnsembleRecord:
+    return get_ensemble_records(
+        workspace=workspace,
+        record_names=(record_name,),
+        experiment_name=experiment_name,
+    )[record_name]
+
+
 def get_ensemble_record_names(
     *, workspace: Path, experiment_name: Optional[str] = None
 ) -> Iterable[str]:
     if experiment_name is None:
         experiment_name = f"{workspace}.{_ENSEMBLE_RECORDS}"
-    experiment = _get_experiment_by_name(experiment_name)
-    if experiment is None:
-        raise KeyError(
-            f"Cannot get record names of non-existing experiment: {experiment_name}"
-        )
+    ensemble_id = _get_ensemble_id(
+        experiment_name,
+        f"Cannot get record names of non-existing experiment: {experiment_name}",
+    )
 
-    ensemble_id = experiment["ensembles"][0]  # currently just one ens per exp
-    response = requests.get(url=f"{_STORAGE_URL}/ensembles/{ensemble_id}/records")
+    response = _get_client().get(f"/ensembles/{ensemble_id}/records")
     if response.status_code != 200:
         raise ert3.exceptions.StorageError(response.text)
     return list(response.json().keys())
@@ -195,15 +498,12 @@ def get_ensemble_record_names(
 def get_experiment_parameters(
     *, workspace: Path, experiment_name: str
 ) -> Iterable[str]:
+    ensemble_id = _get_ensemble_id(
+        experiment_name,
+        f"Cannot get parameters from non-existing experiment: {experiment_name}",
+    )
 
-    experiment = _get_experiment_by_name(experiment_name)
-    if experiment is None:
-        raise KeyError(
-            f"Cannot get parameters from non-existing experiment: {experiment_name}"
-        )
-
-    ensemble_id = experiment["ensembles"][0]  # currently just one ens per exp
-    response = requests.get(url=f"{_STORAGE_URL}/ensembles/{ensemble_id}/parameters")
+    response = _get_client().get(f"/ensembles/{ensemble_id}/parameters")
     if response.status_code != 200:
         raise ert3.exceptions.StorageError(response.text)
     return list(response.json())
@@ -216,7 +516,10 @@ def delete_experiment(*, workspace: Path, experiment_name: str) -> None:
         raise ert3.exceptions.NonExistantExperiment(
             f"Experiment does not exist: {experiment_name}"
         )
-    response = requests.delete(url=f"{_STORAGE_URL}/experiments/{experiment['id']}")
+
+    client = _get_client()
+    client.invalidate_experiments()
+    response = client.delete(f"/experiments/{experiment['id']}")
 
     if response.status_code != 200:
         raise ert3.exceptions.StorageError(response.text)
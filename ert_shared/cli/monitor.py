@@ -65,8 +65,8 @@ class Monitor:
                     self._snapshots[event.iteration] = event.snapshot
                 self._progress = event.progress
             elif isinstance(event, SnapshotUpdateEvent):
-                if event.partial_snapshot is not None:
-                    self._snapshots[event.iteration].merge_event(event.partial_snapshot)
+                # The partial snapshot has already been applied to the
+                # snapshot of the iteration, which is shared with the tracker
                 self._print_progress(event)
             if isinstance(event, EndEvent):
                 self._print_result(event.failed, event.failed_msg)
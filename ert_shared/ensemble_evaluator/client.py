@@ -4,6 +4,7 @@ import cloudevents
 import ssl
 from websockets.exceptions import ConnectionClosed, ConnectionClosedOK
 from websockets.datastructures import Headers
+from ert_shared.ensemble_evaluator.entity import serialization
 
 
 class Client:
@@ -45,15 +46,25 @@ class Client:
 
     async def get_websocket(self):
         return await websockets.connect(
-            self.url, ssl=self._ssl_context, extra_headers=self._extra_headers
+            self.url,
+            ssl=self._ssl_context,
+            extra_headers=self._extra_headers,
+            subprotocols=serialization.SUBPROTOCOLS or None,
         )
 
+    def _encode(self, msg):
+        if not isinstance(msg, cloudevents.http.CloudEvent):
+            return msg
+        if self.websocket.subprotocol == serialization.MSGPACK_SUBPROTOCOL:
+            return serialization.to_msgpack(msg)
+        return cloudevents.http.to_json(msg).decode()
+
     async def _send(self, msg):
         for retry in range(self._max_retries + 1):
             try:
                 if self.websocket is None:
                     self.websocket = await self.get_websocket()
-                await self.websocket.send(msg)
+                await self.websocket.send(self._encode(msg))
                 return
             except ConnectionClosedOK:
                 # Connection was closed no point in trying to send more messages
@@ -65,6 +76,8 @@ class Client:
                 self.websocket = None
 
     def send(self, msg):
+        """Send a message, or a cloudevent encoded in the format negotiated
+        for the connection."""
         self.loop.run_until_complete(self._send(msg))
 
     def send_event(self, ev_type, ev_source, ev_data=None):
@@ -78,4 +91,4 @@ class Client:
             },
             ev_data,
         )
-        self.send(cloudevents.http.to_json(event).decode())
+        self.send(event)
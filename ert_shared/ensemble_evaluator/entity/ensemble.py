@@ -8,8 +8,11 @@ from pathlib import Path
 
 from ert_shared.ensemble_evaluator.entity.ensemble_base import _Ensemble
 from ert_shared.ensemble_evaluator.entity.ensemble_legacy import _LegacyEnsemble
-from ert_shared.ensemble_evaluator.entity.function_step import FunctionTask
-from ert_shared.ensemble_evaluator.entity.unix_step import UnixTask
+from ert_shared.ensemble_evaluator.entity.function_step import (
+    FunctionStepRunner,
+    FunctionTask,
+)
+from ert_shared.ensemble_evaluator.entity.unix_step import UnixStepRunner, UnixTask
 from res.enkf import EnKFState
 
 logger = logging.getLogger(__name__)
@@ -381,6 +384,9 @@ class _UnixStep(_Step):
     def get_task(self, output_transmitters, ee_id, *args, **kwargs):
         return UnixTask(self, output_transmitters, ee_id, *args, **kwargs)
 
+    def get_runner(self, output_transmitters, ee_id):
+        return UnixStepRunner(self, output_transmitters, ee_id)
+
 
 class _FunctionStep(_Step):
     def __init__(
@@ -397,6 +403,9 @@ class _FunctionStep(_Step):
     def get_task(self, output_transmitters, ee_id, *args, **kwargs):
         return FunctionTask(self, output_transmitters, ee_id, *args, **kwargs)
 
+    def get_runner(self, output_transmitters, ee_id):
+        return FunctionStepRunner(self, output_transmitters, ee_id)
+
 
 class _LegacyStep(_Step):
     def __init__(
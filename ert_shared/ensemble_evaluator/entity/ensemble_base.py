@@ -33,7 +33,9 @@ class _Ensemble:
 
     async def send_cloudevent(self, url, event, token=None, cert=None, retries=1):
         client = Client(url, token, cert)
+        # Sent as JSON text, since binary messages are msgpack on connections
+        # that negotiated it
         await client._send(
-            to_json(event, data_marshaller=serialization.evaluator_marshaller)
+            to_json(event, data_marshaller=serialization.evaluator_marshaller).decode()
         )
         await client.websocket.close()
@@ -1,4 +1,5 @@
 import asyncio
+import logging
 import pickle
 from typing import Dict, Optional, TYPE_CHECKING
 import prefect
@@ -9,12 +10,15 @@ if TYPE_CHECKING:
     from ert3.data import RecordTransmitter
 
 
-class FunctionTask(prefect.Task):
-    def __init__(self, step, output_transmitters, ee_id, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+class FunctionStepRunner:
+    """Runs a function step and reports its progress to a client, without
+    depending on Prefect."""
+
+    def __init__(self, step, output_transmitters, ee_id) -> None:
         self._step = step
         self._output_transmitters = output_transmitters
         self._ee_id = ee_id
+        self._logger = logging.getLogger(__name__)
 
     def get_step(self):
         return self._step
@@ -44,7 +48,7 @@ class FunctionTask(prefect.Task):
         return transmitter_map
 
     def run_job(self, job, transmitters: Dict[str, "RecordTransmitter"], client):
-        self.logger.info(f"Running function {job.get_name()}")
+        self._logger.info(f"Running function {job.get_name()}")
         client.send_event(
             ev_type=ids.EVTYPE_FM_JOB_START,
             ev_source=job.get_source(self._ee_id),
@@ -53,7 +57,7 @@ class FunctionTask(prefect.Task):
             function = pickle.loads(job.get_command())
             output = self._attempt_execute(func=function, transmitters=transmitters)
         except Exception as e:
-            self.logger.error(str(e))
+            self._logger.error(str(e))
             client.send_event(
                 ev_type=ids.EVTYPE_FM_JOB_FAILURE,
                 ev_source=job.get_source(self._ee_id),
@@ -67,22 +71,30 @@ class FunctionTask(prefect.Task):
             )
         return output
 
+    def run_step(self, inputs: Dict[str, "RecordTransmitter"], client):
+        client.send_event(
+            ev_type=ids.EVTYPE_FM_STEP_RUNNING,
+            ev_source=self._step.get_source(self._ee_id),
+        )
+
+        output = self.run_job(
+            job=self._step.get_jobs()[0], transmitters=inputs, client=client
+        )
+
+        client.send_event(
+            ev_type=ids.EVTYPE_FM_STEP_SUCCESS,
+            ev_source=self._step.get_source(self._ee_id),
+        )
+        return output
+
+
+class FunctionTask(FunctionStepRunner, prefect.Task):
+    def __init__(self, step, output_transmitters, ee_id, *args, **kwargs) -> None:
+        FunctionStepRunner.__init__(self, step, output_transmitters, ee_id)
+        prefect.Task.__init__(self, *args, **kwargs)
+
     def run(self, inputs: Dict[str, "RecordTransmitter"]):  # type: ignore
         with Client(
             prefect.context.url, prefect.context.token, prefect.context.cert
         ) as ee_client:
-            ee_client.send_event(
-                ev_type=ids.EVTYPE_FM_STEP_RUNNING,
-                ev_source=self._step.get_source(self._ee_id),
-            )
-
-            output = self.run_job(
-                job=self._step.get_jobs()[0], transmitters=inputs, client=ee_client
-            )
-
-            ee_client.send_event(
-                ev_type=ids.EVTYPE_FM_STEP_SUCCESS,
-                ev_source=self._step.get_source(self._ee_id),
-            )
-
-        return output
+            return self.run_step(inputs, ee_client)
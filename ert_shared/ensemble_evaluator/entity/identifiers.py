@@ -34,6 +34,7 @@ MAX_MEMORY_USAGE = "max_memory_usage"
 MAX_RUNNING = "max_running"
 MAX_RUNNING_MINUTES = "max_running_minutes"
 MAX_RETRIES = "max_retries"
+METADATA = "metadata"
 MIME = "mime"
 MIN_ARG = "min_arg"
 NAME = "name"
@@ -109,3 +110,5 @@ EVGROUP_ENSEMBLE = {
     EVTYPE_ENSEMBLE_CANCELLED,
     EVTYPE_ENSEMBLE_FAILED,
 }
+
+EVTYPE_ENSEMBLE_METRICS = "com.equinor.ert.ensemble.metrics"
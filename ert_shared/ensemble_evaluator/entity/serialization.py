@@ -1,8 +1,29 @@
+import base64
 import datetime
 import json
-from typing import Any
+import pickle
+from typing import Any, Union
 
-from dateutil import parser
+import cloudevents.exceptions
+from cloudevents.http.event import CloudEvent
+
+from ert_shared.ensemble_evaluator.entity.tool import convert_iso8601_to_datetime
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # type: ignore
+
+
+# Websocket subprotocol under which dispatch events are sent as msgpack
+MSGPACK_SUBPROTOCOL = "ert.msgpack"
+
+# The subprotocols the evaluator accepts on top of plain JSON
+SUBPROTOCOLS = [MSGPACK_SUBPROTOCOL] if msgpack is not None else []
+
+# msgpack extension type for naive datetimes and dates, which have no native
+# msgpack timestamp representation
+_ISOFORMAT_EXT_TYPE = 1
 
 
 class EvaluatorEncoder(json.JSONEncoder):
@@ -26,7 +47,7 @@ def object_hook(obj):
         return obj
 
     if obj["__type__"] == "isoformat8601":
-        return parser.parse(obj["value"])
+        return convert_iso8601_to_datetime(obj["value"])
 
     return obj
 
@@ -42,3 +63,74 @@ def evaluator_unmarshaller(content: Any):
         return json.loads(content, object_hook=object_hook)
     except TypeError:
         return content
+
+
+def evaluator_from_json(msg: Union[str, bytes]) -> CloudEvent:
+    """
+    Decode a structured JSON cloudevent sent to the evaluator, equivalent to
+    from_json with the evaluator_unmarshaller and falling back to unpickling
+    binary data, but without re-encoding the data before decoding it. String
+    data that is not JSON is kept as it is.
+    """
+    raw_ce = json.loads(msg)
+    if "specversion" not in raw_ce:
+        raise cloudevents.exceptions.MissingRequiredFields(
+            "Failed to find specversion in cloudevent"
+        )
+    data = raw_ce.pop("data", None)
+    if "data_base64" in raw_ce:
+        data = base64.b64decode(raw_ce.pop("data_base64"))
+        try:
+            data = json.loads(data, object_hook=object_hook)
+        except ValueError:
+            data = pickle.loads(data)
+    elif isinstance(data, str):
+        # Data encoded by the evaluator_marshaller is a JSON string, any other
+        # string is passed through as is
+        try:
+            data = json.loads(data, object_hook=object_hook)
+        except ValueError:
+            pass
+    if data == "" or data == b"":
+        data = None
+    return CloudEvent(raw_ce, data)
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return msgpack.ExtType(_ISOFORMAT_EXT_TYPE, obj.isoformat().encode())
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def _msgpack_ext_hook(code, data):
+    if code == _ISOFORMAT_EXT_TYPE:
+        return convert_iso8601_to_datetime(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def to_msgpack(event: CloudEvent) -> bytes:
+    """
+    Encode a cloudevent as a single msgpack map of its attributes and data.
+    Timezone aware datetimes are sent as native msgpack timestamps.
+    """
+    if msgpack is None:
+        raise RuntimeError("msgpack encoding requires the msgpack package")
+    return msgpack.packb(
+        {**event._attributes, "data": event.data},
+        datetime=True,
+        default=_msgpack_default,
+    )
+
+
+def from_msgpack(msg: bytes) -> CloudEvent:
+    """
+    Decode a cloudevent encoded by to_msgpack. Binary data is unpickled, like
+    binary data in JSON encoded events.
+    """
+    if msgpack is None:
+        raise RuntimeError("msgpack decoding requires the msgpack package")
+    raw_ce = msgpack.unpackb(msg, timestamp=3, ext_hook=_msgpack_ext_hook)
+    data = raw_ce.pop("data", None)
+    if isinstance(data, bytes):
+        data = pickle.loads(data)
+    return CloudEvent(raw_ce, data)
@@ -1,19 +1,16 @@
-import copy
 import datetime
+import sys
 import typing
 from collections import defaultdict
-from typing import Dict, Optional, Any
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Any, Tuple
 
-import pyrsistent
-from dateutil.parser import parse
 from pydantic import BaseModel
 
 from ert_shared.ensemble_evaluator.entity import identifiers as ids
 from ert_shared.ensemble_evaluator.entity.tool import (
-    get_job_id,
-    get_real_id,
-    get_step_id,
-    recursive_update,
+    convert_iso8601_to_datetime,
+    parse_source,
 )
 from ert_shared.status.entity import state
 
@@ -51,67 +48,112 @@ _STEP_STATE_TO_REALIZATION_STATE = {
 }
 
 
-def convert_iso8601_to_datetime(timestamp):
-    if isinstance(timestamp, datetime.datetime):
-        return timestamp
+# Realization statuses are coded as small integers, by which the snapshot counts
+# its realizations as their statuses change. The status strings are kept in the
+# snapshot dicts, which is what clients read. Statuses other than the known
+# ones are given codes as they are first seen.
+_REAL_STATUSES: List[Optional[str]] = [None, *state.ALL_REALIZATION_STATES]
+_REAL_STATUS_CODES: Dict[Optional[str], int] = {
+    status: code for code, status in enumerate(_REAL_STATUSES)
+}
+_REAL_STATUS_FINISHED = _REAL_STATUS_CODES[state.REALIZATION_STATE_FINISHED]
+
+
+def _real_status_code(status):
+    if status not in _REAL_STATUS_CODES:
+        _REAL_STATUS_CODES[status] = len(_REAL_STATUSES)
+        _REAL_STATUSES.append(status)
+    return _REAL_STATUS_CODES[status]
+
+
+def _copy_mapping(mapping):
+    return {
+        key: _copy_mapping(value) if isinstance(value, Mapping) else value
+        for key, value in mapping.items()
+    }
+
+
+def _merge_mapping(target, update):
+    """Merge the update into the target dict in place. Nested mappings are
+    merged, unless the target has no (or an empty) value for them."""
+    for key, value in update.items():
+        if isinstance(value, Mapping):
+            if target.get(key):
+                _merge_mapping(target[key], value)
+            else:
+                target[key] = _copy_mapping(value)
+        else:
+            target[key] = value
+
+
+def _model_dict(model):
+    return model.dict(exclude_unset=True, exclude_none=True, exclude_defaults=True)
+
 
-    return parse(timestamp)
+def _not_none(**kwargs):
+    return {key: value for key, value in kwargs.items() if value is not None}
 
 
 class PartialSnapshot:
     def __init__(self, snapshot):
         """Create a PartialSnapshot. If no snapshot is provided, the object is
         a immutable POD, and any attempt at mutating it will raise an
-        UnsupportedOperationException."""
-        self._data = pyrsistent.m()
-        self._snapshot = copy.copy(snapshot) if snapshot else None
+        UnsupportedOperationException. Updates are applied to the snapshot as
+        they are made, and the partial snapshot keeps them as a diff, which is
+        only to be merged into other snapshots."""
+        self._data = {}
+        self._snapshot = snapshot
 
     def update_status(self, status):
-        self._apply_update(SnapshotDict(status=status))
+        self._apply_update({ids.STATUS: status})
+
+    def update_metadata(self, metadata):
+        self._apply_update({ids.METADATA: metadata})
 
     def update_real(
         self,
         real_id,
         real,
     ):
-        self._apply_update(SnapshotDict(reals={real_id: real}))
+        self._update_real(real_id, _model_dict(real))
+
+    def _update_real(self, real_id, real):
+        self._apply_update({ids.REALS: {real_id: real}})
 
     def _apply_update(self, update):
         if self._snapshot is None:
             raise UnsupportedOperationException(
                 f"trying to mutate {self.__class__} without providing a snapshot is not supported"
             )
-        dictionary = update.dict(
-            exclude_unset=True, exclude_none=True, exclude_defaults=True
-        )
-        self._data = recursive_update(self._data, dictionary, check_key=False)
-        self._snapshot.merge(dictionary)
+        self._snapshot.merge(update)
+        _merge_mapping(self._data, update)
 
     def update_step(self, real_id, step_id, step):
-        self._apply_update(
-            SnapshotDict(reals={real_id: Realization(steps={step_id: step})})
-        )
-        if self._snapshot.get_real(real_id).status != state.REALIZATION_STATE_FAILED:
-            if step.status in _STEP_STATE_TO_REALIZATION_STATE:
-                self.update_real(
-                    real_id,
-                    Realization(status=_STEP_STATE_TO_REALIZATION_STATE[step.status]),
+        return self._update_step(real_id, step_id, _model_dict(step))
+
+    def _update_step(self, real_id, step_id, step):
+        self._apply_update({ids.REALS: {real_id: {ids.STEPS: {step_id: step}}}})
+        status = step.get(ids.STATUS)
+        if self._snapshot.get_real_status(real_id) != state.REALIZATION_STATE_FAILED:
+            if status in _STEP_STATE_TO_REALIZATION_STATE:
+                self._update_real(
+                    real_id, {ids.STATUS: _STEP_STATE_TO_REALIZATION_STATE[status]}
                 )
             elif (
-                step.status == state.REALIZATION_STATE_FINISHED
+                status == state.REALIZATION_STATE_FINISHED
                 and self._snapshot.all_steps_finished(real_id)
             ):
-                self.update_real(
-                    real_id, Realization(status=state.REALIZATION_STATE_FINISHED)
+                self._update_real(
+                    real_id, {ids.STATUS: state.REALIZATION_STATE_FINISHED}
                 )
             elif (
-                step.status == state.STEP_STATE_SUCCESS
+                status == state.STEP_STATE_SUCCESS
                 and not self._snapshot.all_steps_finished(real_id)
             ):
                 pass
             else:
                 raise ValueError(
-                    f"unknown step status {step.status} for real: {real_id} step: {step_id}"
+                    f"unknown step status {status} for real: {real_id} step: {step_id}"
                 )
         return self
 
@@ -122,24 +164,27 @@ class PartialSnapshot:
         job_id,
         job,
     ):
+        self._update_job(real_id, step_id, job_id, _model_dict(job))
+
+    def _update_job(self, real_id, step_id, job_id, job):
         self._apply_update(
-            SnapshotDict(
-                reals={real_id: Realization(steps={step_id: Step(jobs={job_id: job})})}
-            )
+            {ids.REALS: {real_id: {ids.STEPS: {step_id: {ids.JOBS: {job_id: job}}}}}}
         )
 
     def to_dict(self):
-        return pyrsistent.thaw(self._data)
+        return _copy_mapping(self._data)
 
     def data(self):
         return self._data
 
     def from_cloudevent(self, event):
         e_type = event["type"]
-        e_source = event["source"]
+        source = parse_source(event["source"])
         status = _FM_TYPE_EVENT_TO_STATUS.get(e_type)
         timestamp = event["time"]
 
+        # The updates are built as plain dicts, which is much cheaper than
+        # building and serializing the corresponding models for every event
         if e_type in ids.EVGROUP_FM_STEP:
             start_time = None
             end_time = None
@@ -148,10 +193,10 @@ class PartialSnapshot:
             elif e_type in {ids.EVTYPE_FM_STEP_SUCCESS, ids.EVTYPE_FM_STEP_FAILURE}:
                 end_time = convert_iso8601_to_datetime(timestamp)
 
-            self.update_step(
-                get_real_id(e_source),
-                get_step_id(e_source),
-                step=Step(
+            self._update_step(
+                source.real,
+                source.step,
+                step=_not_none(
                     status=status,
                     start_time=start_time,
                     end_time=end_time,
@@ -166,11 +211,11 @@ class PartialSnapshot:
             elif e_type in {ids.EVTYPE_FM_JOB_SUCCESS, ids.EVTYPE_FM_JOB_FAILURE}:
                 end_time = convert_iso8601_to_datetime(timestamp)
 
-            self.update_job(
-                get_real_id(e_source),
-                get_step_id(e_source),
-                get_job_id(e_source),
-                job=Job(
+            self._update_job(
+                source.real,
+                source.step,
+                source.job,
+                job=_not_none(
                     status=status,
                     start_time=start_time,
                     end_time=end_time,
@@ -188,70 +233,191 @@ class PartialSnapshot:
             )
         elif e_type in ids.EVGROUP_ENSEMBLE:
             self.update_status(_ENSEMBLE_TYPE_EVENT_TO_STATUS[e_type])
+        elif e_type == ids.EVTYPE_ENSEMBLE_METRICS:
+            self.update_metadata(event.data)
         elif e_type == ids.EVTYPE_EE_SNAPSHOT_UPDATE:
-            self._data = recursive_update(self._data, event.data, check_key=False)
+            if self._snapshot is not None:
+                self._snapshot.merge(event.data)
+            _merge_mapping(self._data, event.data)
         else:
             raise ValueError("Unknown type: {}".format(e_type))
         return self
 
 
 class Snapshot:
+    """The state of an ensemble evaluation. Realizations, steps and jobs are
+    kept in flat dicts keyed by their interned ids, such that an update touches
+    only the entities it concerns. The number of unfinished steps is counted
+    per realization, to tell in constant time when all its steps have finished.
+    """
+
     def __init__(self, input_dict):
-        self._data = pyrsistent.freeze(input_dict)
+        # Status, metadata and any other top level entries
+        self._top: Dict[str, Any] = {}
+        self._reals: Dict[str, Dict[str, Any]] = {}
+        self._steps: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._jobs: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._real_steps: Dict[str, List[str]] = {}
+        self._step_jobs: Dict[Tuple[str, str], List[str]] = {}
+        self._unfinished_steps: Dict[str, int] = {}
+        self._real_status_codes: Dict[str, int] = {}
+        self._real_status_counts: List[int] = [0] * len(_REAL_STATUSES)
+        self._merge(input_dict, check_key=False)
 
     def merge_event(self, event):
-        self._data = recursive_update(self._data, event.data())
+        # Partial snapshots apply their updates to the snapshot they were
+        # created from as they are made, so they are never applied twice
+        if event._snapshot is not self:
+            self.merge(event.data())
 
     def merge(self, update):
-        self._data = recursive_update(self._data, update)
+        self._merge(update, check_key=True)
+
+    def _merge(self, update, check_key):
+        for key, value in update.items():
+            if key == ids.REALS:
+                for real_id, real in (value or {}).items():
+                    self._merge_real(real_id, real, check_key)
+            elif check_key and key not in self._top:
+                raise ValueError(f"Illegal field {key}")
+            elif isinstance(value, Mapping) and self._top.get(key):
+                _merge_mapping(self._top[key], value)
+            else:
+                self._top[key] = (
+                    _copy_mapping(value) if isinstance(value, Mapping) else value
+                )
+
+    def _merge_real(self, real_id, update, check_key):
+        real = self._reals.get(real_id)
+        if real is None:
+            if check_key:
+                raise ValueError(f"Illegal field {real_id}")
+            real_id = sys.intern(str(real_id))
+            real = self._reals[real_id] = {}
+            self._real_steps[real_id] = []
+            self._unfinished_steps[real_id] = 0
+            self._real_status_codes[real_id] = 0
+            self._real_status_counts[0] += 1
+        for key, value in update.items():
+            if key == ids.STEPS:
+                for step_id, step in (value or {}).items():
+                    self._merge_step(real_id, step_id, step, check_key)
+            elif key == ids.STATUS:
+                self._count_real_status(real_id, value)
+                real[key] = value
+            else:
+                real[key] = value
+
+    def _count_real_status(self, real_id, status):
+        code = _real_status_code(status)
+        counts = self._real_status_counts
+        if code >= len(counts):
+            counts.extend([0] * (code + 1 - len(counts)))
+        counts[self._real_status_codes[real_id]] -= 1
+        counts[code] += 1
+        self._real_status_codes[real_id] = code
+
+    def _merge_step(self, real_id, step_id, update, check_key):
+        step_key = (real_id, step_id)
+        step = self._steps.get(step_key)
+        if step is None:
+            if check_key:
+                raise ValueError(f"Illegal field {step_id}")
+            step_id = sys.intern(str(step_id))
+            step_key = (real_id, step_id)
+            step = self._steps[step_key] = {}
+            self._real_steps[real_id].append(step_id)
+            self._step_jobs[step_key] = []
+            self._unfinished_steps[real_id] += 1
+        for key, value in update.items():
+            if key == ids.JOBS:
+                for job_id, job in (value or {}).items():
+                    self._merge_job(step_key, job_id, job, check_key)
+            elif key == ids.STATUS:
+                was_finished = step.get(ids.STATUS) == state.STEP_STATE_SUCCESS
+                is_finished = value == state.STEP_STATE_SUCCESS
+                self._unfinished_steps[real_id] += was_finished - is_finished
+                step[key] = value
+            else:
+                step[key] = value
+
+    def _merge_job(self, step_key, job_id, update, check_key):
+        job_key = (*step_key, job_id)
+        job = self._jobs.get(job_key)
+        if job is None:
+            if check_key:
+                raise ValueError(f"Illegal field {job_id}")
+            job_id = sys.intern(str(job_id))
+            job_key = (*step_key, job_id)
+            job = self._jobs[job_key] = {}
+            self._step_jobs[step_key].append(job_id)
+        _merge_mapping(job, update)
+
+    def _step_dict(self, real_id, step_id):
+        step_key = (real_id, step_id)
+        step = dict(self._steps[step_key])
+        step[ids.JOBS] = {
+            job_id: _copy_mapping(self._jobs[(real_id, step_id, job_id)])
+            for job_id in self._step_jobs[step_key]
+        }
+        return step
+
+    def _real_dict(self, real_id):
+        real = dict(self._reals[real_id])
+        real[ids.STEPS] = {
+            step_id: self._step_dict(real_id, step_id)
+            for step_id in self._real_steps[real_id]
+        }
+        return real
 
     def to_dict(self):
-        return pyrsistent.thaw(self._data)
+        data = _copy_mapping(self._top)
+        data[ids.REALS] = {real_id: self._real_dict(real_id) for real_id in self._reals}
+        return data
 
     def get_status(self):
-        return self._data[ids.STATUS]
+        return self._top[ids.STATUS]
 
     def get_reals(self):
-        return SnapshotDict(**self._data).reals
+        return SnapshotDict(**self.to_dict()).reals
+
+    def get_real_status(self, real_id):
+        if real_id not in self._reals:
+            raise ValueError(f"No realization with id {real_id}")
+        return self._reals[real_id].get(ids.STATUS)
 
     def get_real(self, real_id):
-        if real_id not in self._data[ids.REALS]:
+        if real_id not in self._reals:
             raise ValueError(f"No realization with id {real_id}")
-        return Realization(**self._data[ids.REALS][real_id])
+        return Realization(**self._real_dict(real_id))
 
     def get_step(self, real_id, step_id):
-        real = self.get_real(real_id)
-        steps = real.steps
-        if step_id not in steps:
+        if real_id not in self._reals:
+            raise ValueError(f"No realization with id {real_id}")
+        if (real_id, step_id) not in self._steps:
             raise ValueError(f"No step with id {step_id} in {real_id}")
-        return steps[step_id]
+        return Step(**self._step_dict(real_id, step_id))
 
     def get_job(self, real_id, step_id, job_id):
-        step = self.get_step(real_id, step_id)
-        jobs = step.jobs
-        if job_id not in jobs:
+        self.get_step(real_id, step_id)
+        if (real_id, step_id, job_id) not in self._jobs:
             raise ValueError(f"No job with id {job_id} in {step_id}")
-        return jobs[job_id]
+        return Job(**self._jobs[(real_id, step_id, job_id)])
 
     def all_steps_finished(self, real_id):
-        real = self.get_real(real_id)
-        return all(
-            step.status == state.STEP_STATE_SUCCESS for step in real.steps.values()
-        )
+        if real_id not in self._reals:
+            raise ValueError(f"No realization with id {real_id}")
+        return self._unfinished_steps[real_id] == 0
 
     def get_successful_realizations(self):
-        return len(
-            [
-                real
-                for real in self._data[ids.REALS].values()
-                if real[ids.STATUS] == state.REALIZATION_STATE_FINISHED
-            ]
-        )
+        return self._real_status_counts[_REAL_STATUS_FINISHED]
 
     def aggregate_real_states(self) -> typing.Dict[str, int]:
         states: Dict[str, int] = defaultdict(int)
-        for real in self._data[ids.REALS].values():
-            states[real[ids.STATUS]] += 1
+        for code, count in enumerate(self._real_status_counts):
+            status = _REAL_STATUSES[code]
+            if count and status is not None:
+                states[status] += count
         return states
 
 
@@ -1,6 +1,11 @@
-import re
-from pyrsistent import freeze
 import collections
+import datetime
+import functools
+import sys
+from typing import NamedTuple, Optional, Union
+
+from dateutil import parser
+from pyrsistent import freeze
 
 
 def recursive_update(left, right, check_key=True):
@@ -18,22 +23,58 @@ def recursive_update(left, right, check_key=True):
     return left
 
 
-_regexp_pattern = r"(?<=/{token}/)[^/]+"
+class SourceIds(NamedTuple):
+    ee: Optional[str]
+    real: Optional[str]
+    step: Optional[str]
+    job: Optional[str]
+
+
+_SOURCE_TOKENS = ("real", "step", "job")
 
 
-def _match_token(token, source):
-    f_pattern = _regexp_pattern.format(token=token)
-    match = re.search(f_pattern, source)
-    return match if match is None else match.group()
+@functools.lru_cache(maxsize=4096)
+def parse_source(source: str) -> SourceIds:
+    """Split an event source like /ert/ee/<ee>/real/<real>/step/<step>/job/<job>
+    into its ids, which are None where they are missing. The ids are interned,
+    so that comparing them with the ids in a snapshot is cheap.
+    """
+    parts = source.split("/")
+    ee_id = sys.intern(parts[3]) if len(parts) > 3 and parts[3] else None
+    ids = dict.fromkeys(_SOURCE_TOKENS)
+    for token, value in zip(parts[1:], parts[2:]):
+        if token in ids and ids[token] is None and value:
+            ids[token] = sys.intern(value)
+    return SourceIds(ee_id, ids["real"], ids["step"], ids["job"])
 
 
 def get_real_id(source):
-    return _match_token("real", source)
+    return parse_source(source).real
 
 
 def get_step_id(source):
-    return _match_token("step", source)
+    return parse_source(source).step
 
 
 def get_job_id(source):
-    return _match_token("job", source)
+    return parse_source(source).job
+
+
+# datetime.fromisoformat parses what datetime.isoformat produces, which covers
+# the event timestamps, and is far cheaper than the general dateutil parser
+_fromisoformat = getattr(datetime.datetime, "fromisoformat", None)
+
+
+def convert_iso8601_to_datetime(
+    timestamp: Union[datetime.datetime, str]
+) -> datetime.datetime:
+    if isinstance(timestamp, datetime.datetime):
+        return timestamp
+    if _fromisoformat is not None:
+        try:
+            if timestamp.endswith("Z"):
+                return _fromisoformat(f"{timestamp[:-1]}+00:00")
+            return _fromisoformat(timestamp)
+        except ValueError:
+            pass
+    return parser.parse(timestamp)
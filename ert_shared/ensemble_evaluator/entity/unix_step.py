@@ -1,4 +1,5 @@
 import asyncio
+import logging
 from typing import Any, Dict, TYPE_CHECKING
 from pathlib import Path
 import stat
@@ -16,12 +17,15 @@ if TYPE_CHECKING:
 _BIN_FOLDER = "bin"
 
 
-class UnixTask(prefect.Task):
-    def __init__(self, step, output_transmitters, ee_id, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+class UnixStepRunner:
+    """Runs the jobs of a unix step in a temporary run path and reports their
+    progress to a client, without depending on Prefect."""
+
+    def __init__(self, step, output_transmitters, ee_id) -> None:
         self._step = step
         self._output_transmitters = output_transmitters
         self._ee_id = ee_id
+        self._logger = logging.getLogger(__name__)
 
     def get_step(self):
         return self._step
@@ -43,11 +47,11 @@ class UnixTask(prefect.Task):
             cwd=run_path.as_posix(),
             env=env,
         )
-        self.logger.info(cmd_exec.stderr)
-        self.logger.info(cmd_exec.stdout)
+        self._logger.info(cmd_exec.stderr)
+        self._logger.info(cmd_exec.stdout)
 
         if cmd_exec.returncode != 0:
-            self.logger.error(cmd_exec.stderr)
+            self._logger.error(cmd_exec.stderr)
             client.send_event(
                 ev_type=ids.EVTYPE_FM_JOB_FAILURE,
                 ev_source=job.get_source(self._ee_id),
@@ -59,7 +63,7 @@ class UnixTask(prefect.Task):
 
     def run_jobs(self, client: Client, run_path: Path):
         for job in self._step.get_jobs():
-            self.logger.info(f"Running command {job.get_name()}")
+            self._logger.info(f"Running command {job.get_name()}")
             client.send_event(
                 ev_type=ids.EVTYPE_FM_JOB_START,
                 ev_source=job.get_source(self._ee_id),
@@ -90,40 +94,49 @@ class UnixTask(prefect.Task):
                 st = path.stat()
                 path.chmod(st.st_mode | stat.S_IEXEC)
 
-    def run(self, inputs=None):
+    def run_step(self, inputs, client):
         with tempfile.TemporaryDirectory() as run_path:
             run_path = Path(run_path)
             self._load_and_dump_input(transmitters=inputs, runpath=run_path)
-            with Client(
-                prefect.context.url, prefect.context.token, prefect.context.cert
-            ) as ee_client:
-                ee_client.send_event(
-                    ev_type=ids.EVTYPE_FM_STEP_RUNNING,
-                    ev_source=self._step.get_source(self._ee_id),
-                )
+            client.send_event(
+                ev_type=ids.EVTYPE_FM_STEP_RUNNING,
+                ev_source=self._step.get_source(self._ee_id),
+            )
 
-                outputs = {}
-                self.run_jobs(ee_client, run_path)
-
-                futures = []
-                for output in self._step.get_outputs():
-                    if not (run_path / output.get_path()).exists():
-                        raise FileNotFoundError(
-                            f"Output file {output.get_path()} was not generated!"
-                        )
-
-                    outputs[output.get_name()] = self._output_transmitters[
-                        output.get_name()
-                    ]
-                    futures.append(
-                        outputs[output.get_name()].transmit_file(
-                            run_path / output.get_path(), output.get_mime()
-                        )
+            outputs = {}
+            self.run_jobs(client, run_path)
+
+            futures = []
+            for output in self._step.get_outputs():
+                if not (run_path / output.get_path()).exists():
+                    raise FileNotFoundError(
+                        f"Output file {output.get_path()} was not generated!"
                     )
-                asyncio.get_event_loop().run_until_complete(asyncio.gather(*futures))
 
-                ee_client.send_event(
-                    ev_type=ids.EVTYPE_FM_STEP_SUCCESS,
-                    ev_source=self._step.get_source(self._ee_id),
+                outputs[output.get_name()] = self._output_transmitters[
+                    output.get_name()
+                ]
+                futures.append(
+                    outputs[output.get_name()].transmit_file(
+                        run_path / output.get_path(), output.get_mime()
+                    )
                 )
+            asyncio.get_event_loop().run_until_complete(asyncio.gather(*futures))
+
+            client.send_event(
+                ev_type=ids.EVTYPE_FM_STEP_SUCCESS,
+                ev_source=self._step.get_source(self._ee_id),
+            )
         return outputs
+
+
+class UnixTask(UnixStepRunner, prefect.Task):
+    def __init__(self, step, output_transmitters, ee_id, *args, **kwargs) -> None:
+        UnixStepRunner.__init__(self, step, output_transmitters, ee_id)
+        prefect.Task.__init__(self, *args, **kwargs)
+
+    def run(self, inputs=None):
+        with Client(
+            prefect.context.url, prefect.context.token, prefect.context.cert
+        ) as ee_client:
+            return self.run_step(inputs, ee_client)
@@ -2,9 +2,7 @@ import asyncio
 import logging
 import threading
 from contextlib import contextmanager
-import pickle
-from typing import Set
-import cloudevents.exceptions
+from typing import Optional, Set
 from http import HTTPStatus
 
 import cloudpickle
@@ -18,6 +16,7 @@ from cloudevents.http import from_json, to_json
 from cloudevents.http.event import CloudEvent
 from ert_shared.ensemble_evaluator.dispatch import Dispatcher
 from ert_shared.ensemble_evaluator.entity import serialization
+from ert_shared.ensemble_evaluator.entity.tool import parse_source
 from ert_shared.ensemble_evaluator.entity.snapshot import (
     PartialSnapshot,
     Snapshot,
@@ -38,11 +37,34 @@ from ert_shared.status.entity.state import (
 
 logger = logging.getLogger(__name__)
 
+# Forward model events are merged into one snapshot update for this long, or
+# until this many events have been merged, before it is sent to the clients
+DEFAULT_BATCH_INTERVAL = 0.1  # seconds
+DEFAULT_MAX_BATCH_SIZE = 1000
+
+
+class _EvaluatorServerProtocol(WebSocketServerProtocol):
+    """Negotiates the dispatch subprotocols on the dispatch path only, since
+    the other paths only speak JSON."""
+
+    def select_subprotocol(self, client_subprotocols, server_subprotocols):
+        if self.path.split("/")[1] != "dispatch":
+            return None
+        return super().select_subprotocol(client_subprotocols, server_subprotocols)
+
 
 class EnsembleEvaluator:
     _dispatch = Dispatcher()
 
-    def __init__(self, ensemble, config, iter_, ee_id: str = "0"):
+    def __init__(
+        self,
+        ensemble,
+        config,
+        iter_,
+        ee_id: str = "0",
+        batch_interval: float = DEFAULT_BATCH_INTERVAL,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
         # Without information on the iteration, the events emitted from the
         # evaluator are ambiguous. In the future, an experiment authority* will
         # "own" the evaluators and can add iteration information to events they
@@ -69,6 +91,13 @@ class EnsembleEvaluator:
         self._event_index = 1
         self._result = None
 
+        self._batch_interval = batch_interval
+        self._max_batch_size = max(1, max_batch_size)
+        self._batch: Optional[PartialSnapshot] = None
+        self._batch_size = 0
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
+        self._batch_metrics = {"batches": 0, "events": 0, "max_batch_size": 0}
+
     @staticmethod
     def create_snapshot(ensemble):
         reals = {}
@@ -99,11 +128,50 @@ class EnsembleEvaluator:
 
     @_dispatch.register_event_handler(identifiers.EVGROUP_FM_ALL)
     async def _fm_handler(self, event):
-        snapshot_mutate_event = PartialSnapshot(self._snapshot).from_cloudevent(event)
-        await self._send_snapshot_update(snapshot_mutate_event)
+        await self._batch_event(event)
+
+    @_dispatch.register_event_handler(identifiers.EVTYPE_ENSEMBLE_METRICS)
+    async def _ensemble_metrics_handler(self, event):
+        await self._batch_event(event)
+
+    async def _batch_event(self, event):
+        """Merge the event into the current batch, which is sent to the
+        clients as a single snapshot update when the batch interval has passed
+        or the batch is full."""
+        if self._batch is None:
+            self._batch = PartialSnapshot(self._snapshot)
+            self._batch_timer = self._loop.call_later(
+                self._batch_interval,
+                lambda: asyncio.ensure_future(self._flush_batch(), loop=self._loop),
+            )
+        self._batch.from_cloudevent(event)
+        self._batch_size += 1
+        if self._batch_size >= self._max_batch_size:
+            await self._flush_batch()
+
+    async def _flush_batch(self):
+        if self._batch is None:
+            return
+        batch, batch_size = self._batch, self._batch_size
+        self._batch = None
+        self._batch_size = 0
+        self._batch_timer.cancel()
+        self._batch_metrics["batches"] += 1
+        self._batch_metrics["events"] += batch_size
+        self._batch_metrics["max_batch_size"] = max(
+            batch_size, self._batch_metrics["max_batch_size"]
+        )
+        logger.debug(f"Sending snapshot update merged from {batch_size} events")
+        await self._send_snapshot_update(batch)
+
+    def get_batch_metrics(self):
+        """Return the number of snapshot updates sent for batched events, the
+        number of events merged into them and the largest batch."""
+        return dict(self._batch_metrics)
 
     @_dispatch.register_event_handler(identifiers.EVTYPE_ENSEMBLE_STOPPED)
     async def _ensemble_stopped_handler(self, event):
+        await self._flush_batch()
         self._result = event.data
         if self._snapshot.get_status() != ENSEMBLE_STATE_FAILED:
             snapshot_mutate_event = PartialSnapshot(self._snapshot).from_cloudevent(
@@ -113,6 +181,7 @@ class EnsembleEvaluator:
 
     @_dispatch.register_event_handler(identifiers.EVTYPE_ENSEMBLE_STARTED)
     async def _ensemble_started_handler(self, event):
+        await self._flush_batch()
         if self._snapshot.get_status() != ENSEMBLE_STATE_FAILED:
             snapshot_mutate_event = PartialSnapshot(self._snapshot).from_cloudevent(
                 event
@@ -121,6 +190,7 @@ class EnsembleEvaluator:
 
     @_dispatch.register_event_handler(identifiers.EVTYPE_ENSEMBLE_CANCELLED)
     async def _ensemble_cancelled_handler(self, event):
+        await self._flush_batch()
         if self._snapshot.get_status() != ENSEMBLE_STATE_FAILED:
             snapshot_mutate_event = PartialSnapshot(self._snapshot).from_cloudevent(
                 event
@@ -130,6 +200,7 @@ class EnsembleEvaluator:
 
     @_dispatch.register_event_handler(identifiers.EVTYPE_ENSEMBLE_FAILED)
     async def _ensemble_failed_handler(self, event):
+        await self._flush_batch()
         if self._snapshot.get_status() not in [
             ENSEMBLE_STATE_STOPPED,
             ENSEMBLE_STATE_CANCELLED,
@@ -140,7 +211,6 @@ class EnsembleEvaluator:
             await self._send_snapshot_update(snapshot_mutate_event)
 
     async def _send_snapshot_update(self, snapshot_mutate_event):
-        self._snapshot.merge_event(snapshot_mutate_event)
         out_cloudevent = CloudEvent(
             {
                 "type": identifiers.EVTYPE_EE_SNAPSHOT_UPDATE,
@@ -225,13 +295,14 @@ class EnsembleEvaluator:
 
     async def handle_dispatch(self, websocket, path):
         async with self.count_dispatcher():
+            use_msgpack = websocket.subprotocol == serialization.MSGPACK_SUBPROTOCOL
             async for msg in websocket:
-                try:
-                    event = from_json(
-                        msg, data_unmarshaller=serialization.evaluator_unmarshaller
-                    )
-                except cloudevents.exceptions.DataUnmarshallerError:
-                    event = from_json(msg, data_unmarshaller=lambda x: pickle.loads(x))
+                # Under the msgpack subprotocol events are sent as binary
+                # messages, while messages encoded by the sender are JSON text
+                if use_msgpack and isinstance(msg, bytes):
+                    event = serialization.from_msgpack(msg)
+                else:
+                    event = serialization.evaluator_from_json(msg)
                 if self._get_ee_id(event["source"]) != self._ee_id:
                     logger.info(
                         f"Got event from evaluator {self._get_ee_id(event['source'])} with source {event['source']}, ignoring since I am {self._ee_id}"
@@ -288,6 +359,8 @@ class EnsembleEvaluator:
             process_request=self.process_request,
             max_queue=None,
             max_size=2 ** 26,
+            create_protocol=_EvaluatorServerProtocol,
+            subprotocols=serialization.SUBPROTOCOLS or None,
         ):
             await done
             logger.debug("Got done signal.")
@@ -296,6 +369,8 @@ class EnsembleEvaluator:
                 await asyncio.wait_for(self._dispatchers_connected.join(), timeout=10)
             except asyncio.TimeoutError:
                 pass
+            await self._flush_batch()
+            logger.debug(f"Snapshot update batches: {self.get_batch_metrics()}")
             message = self.terminate_message()
             if self._clients:
                 await asyncio.wait([client.send(message) for client in self._clients])
@@ -354,6 +429,7 @@ class EnsembleEvaluator:
         return self.get_successful_realizations()
 
     @staticmethod
-    def _get_ee_id(source) -> str:
-        # the ee_id will be found at /ert/ee/ee_id/...
-        return source.split("/")[3]
+    def _get_ee_id(source) -> Optional[str]:
+        # the ee_id will be found at /ert/ee/ee_id/..., sources without one
+        # give None, which never matches the id of the evaluator
+        return parse_source(source).ee
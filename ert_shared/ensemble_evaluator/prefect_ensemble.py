@@ -1,19 +1,24 @@
 import asyncio
+import atexit
 import contextlib
 import logging
 import multiprocessing
 import os
 import signal
 import threading
-from typing import Optional
+import time
+from typing import Any, Dict, Optional
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import timedelta
 from functools import partial
+from itertools import islice
 
-import prefect
 import cloudpickle
+import prefect
 import prefect.utilities.logging
 from cloudevents.http import CloudEvent, to_json
+from dask_jobqueue import LSFCluster, PBSCluster
 from dask_jobqueue.lsf import LSFJob
 from ert_shared.ensemble_evaluator.config import find_open_port, EvaluatorServerConfig
 from ert_shared.ensemble_evaluator.entity import identifiers as ids
@@ -55,107 +60,165 @@ async def _eq_submit_job(self, script_filename):
     return self._call(piped_cmd, shell=True)
 
 
-def _get_executor(name="local"):
-    if name == "local":
-        cluster_kwargs = {
-            "silence_logs": "debug",
-            "scheduler_options": {"port": find_open_port()},
-        }
-        return LocalDaskExecutor(**cluster_kwargs)
-    elif name == "lsf":
+_CLUSTER_CLASSES = {"lsf": LSFCluster, "pbs": PBSCluster}
+
+# The forkserver imports this module once, such that the evaluation processes
+# forked from it start without importing Prefect and Dask again
+_MP_CONTEXT = multiprocessing.get_context(method="forkserver")
+_MP_CONTEXT.set_forkserver_preload([__name__])
+
+# Clusters are started once per session and are shared by all batches and
+# evaluations, such that the cluster startup cost is only paid once
+_clusters: Dict[str, Any] = {}
+
+
+# The static settings of the clusters, from which their capacity is known
+# without starting them
+_CLUSTER_KWARGS: Dict[str, Dict[str, Any]] = {
+    "lsf": {
+        "queue": "mr",
+        "project": None,
+        "cores": 1,
+        "memory": "1GB",
+        "use_stdin": True,
+        "n_workers": 2,
+        "silence_logs": "debug",
+    },
+    "pbs": {
+        "n_workers": 10,
+        "queue": "normal",
+        "project": "ERT-TEST",
+        "local_directory": "$TMPDIR",
+        "cores": 4,
+        "memory": "16GB",
+        "resource_spec": "select=1:ncpus=4:mem=16GB",
+    },
+}
+
+
+def _get_cluster_kwargs(name):
+    if name not in _CLUSTER_KWARGS:
+        raise ValueError(f"Unknown executor name {name}")
+    cluster_kwargs = dict(_CLUSTER_KWARGS[name])
+    if name == "lsf":
         LSFJob._submit_job = _eq_submit_job
-        cluster_kwargs = {
-            "queue": "mr",
-            "project": None,
-            "cores": 1,
-            "memory": "1GB",
-            "use_stdin": True,
-            "n_workers": 2,
-            "silence_logs": "debug",
-            "scheduler_options": {"port": find_open_port()},
-        }
-        return DaskExecutor(
-            cluster_class="dask_jobqueue.LSFCluster",
-            cluster_kwargs=cluster_kwargs,
-            debug=True,
-        )
-    elif name == "pbs":
-        cluster_kwargs = {
-            "n_workers": 10,
-            "queue": "normal",
-            "project": "ERT-TEST",
-            "local_directory": "$TMPDIR",
-            "cores": 4,
-            "memory": "16GB",
-            "resource_spec": "select=1:ncpus=4:mem=16GB",
-        }
-        return DaskExecutor(
-            cluster_class="dask_jobqueue.PBSCluster",
-            cluster_kwargs=cluster_kwargs,
-            debug=True,
-        )
+        cluster_kwargs["scheduler_options"] = {"port": find_open_port()}
+    return cluster_kwargs
+
+
+def _close_clusters():
+    while _clusters:
+        _, cluster = _clusters.popitem()
+        cluster.close()
+
+
+atexit.register(_close_clusters)
+
+
+def _get_cluster_address(name="local"):
+    """Return the scheduler address of the session's cluster for the executor,
+    starting the cluster if needed. The local executor runs without a cluster.
+    """
+    if name not in _CLUSTER_CLASSES:
+        return None
+    if name not in _clusters:
+        _clusters[name] = _CLUSTER_CLASSES[name](**_get_cluster_kwargs(name))
+    return _clusters[name].scheduler_address
+
+
+def _get_executor_capacity(name="local"):
+    """Return the number of realizations the executor runs at once, which is
+    the number of cores locally and the number of worker threads of a cluster.
+    """
+    if name in _CLUSTER_CLASSES:
+        cluster_kwargs = _CLUSTER_KWARGS[name]
+        return cluster_kwargs["n_workers"] * cluster_kwargs["cores"]
+    return os.cpu_count() or 1
+
+
+def _get_executor(name="local", address=None):
+    if name == "local":
+        # Realizations run in parallel on their own threads, so the tasks of
+        # a local flow run on the thread of its realization, without a cluster
+        return LocalDaskExecutor(scheduler="synchronous")
+    elif name in _CLUSTER_CLASSES:
+        if address is None:
+            address = _get_cluster_address(name)
+        return DaskExecutor(address=address, debug=True)
     else:
         raise ValueError(f"Unknown executor name {name}")
 
 
+def create_realizations(config):
+    """Build the realizations of an ensemble from its config."""
+    real_builders = []
+    for iens in range(0, config[ids.REALIZATIONS]):
+        real_builder = create_realization_builder().active(True).set_iens(iens)
+        for step in config[ids.STEPS]:
+            step_id = uuid.uuid4()
+            step_source = f"/ert/ee/{{ee_id}}/real/{iens}/step/{step_id}"
+            step_builder = (
+                create_step_builder()
+                .set_id(step_id)
+                .set_name(step[ids.NAME])
+                .set_source(step_source)
+                .set_type(step[ids.TYPE])
+            )
+
+            for io in step.get(ids.INPUTS, []):
+                input_builder = (
+                    create_file_io_builder()
+                    .set_name(io[ids.RECORD])
+                    .set_path(io[ids.LOCATION])
+                    .set_mime(io[ids.MIME])
+                )
+
+                if io.get(ids.IS_EXECUTABLE):
+                    input_builder.set_executable()
+
+                step_builder.add_input(input_builder)
+            for io in step.get(ids.OUTPUTS, []):
+                step_builder.add_output(
+                    create_file_io_builder()
+                    .set_name(io[ids.RECORD])
+                    .set_path(io[ids.LOCATION])
+                    .set_mime(io[ids.MIME])
+                )
+
+            for job in step[ids.JOBS]:
+                job_builder = (
+                    create_job_builder()
+                    .set_id(str(uuid.uuid4()))
+                    .set_name(job[ids.NAME])
+                    .set_executable(job[ids.EXECUTABLE])
+                    .set_args(job.get(ids.ARGS))
+                    .set_step_source(step_source)
+                )
+                step_builder.add_job(job_builder)
+            real_builder.add_step(step_builder)
+        real_builders.append(real_builder)
+    return [builder.build() for builder in real_builders]
+
+
+# Throughput metrics of the evaluation, reported in the snapshot metadata
+_INITIAL_METRICS = {
+    "realizations_finished": 0,
+    "realizations_running": 0,
+    "elapsed_time": 0.0,
+    "throughput": 0.0,
+}
+
+
 class PrefectEnsemble(_Ensemble):
     def __init__(self, config):
         self.config = config
         self._ee_config = None
-        self._reals = self._get_reals()
+        self._reals = create_realizations(config)
         self._eval_proc = None
         self._ee_id: Optional[str] = None
         self._iens_to_task = {}
-        super().__init__(self._reals, metadata={"iter": 0})
-
-    def _get_reals(self):
-        real_builders = []
-        for iens in range(0, self.config[ids.REALIZATIONS]):
-            real_builder = create_realization_builder().active(True).set_iens(iens)
-            for step in self.config[ids.STEPS]:
-                step_id = uuid.uuid4()
-                step_source = f"/ert/ee/{{ee_id}}/real/{iens}/step/{step_id}"
-                step_builder = (
-                    create_step_builder()
-                    .set_id(step_id)
-                    .set_name(step[ids.NAME])
-                    .set_source(step_source)
-                    .set_type(step[ids.TYPE])
-                )
-
-                for io in step.get(ids.INPUTS, []):
-                    input_builder = (
-                        create_file_io_builder()
-                        .set_name(io[ids.RECORD])
-                        .set_path(io[ids.LOCATION])
-                        .set_mime(io[ids.MIME])
-                    )
-
-                    if io.get(ids.IS_EXECUTABLE):
-                        input_builder.set_executable()
-
-                    step_builder.add_input(input_builder)
-                for io in step.get(ids.OUTPUTS, []):
-                    step_builder.add_output(
-                        create_file_io_builder()
-                        .set_name(io[ids.RECORD])
-                        .set_path(io[ids.LOCATION])
-                        .set_mime(io[ids.MIME])
-                    )
-
-                for job in step[ids.JOBS]:
-                    job_builder = (
-                        create_job_builder()
-                        .set_id(str(uuid.uuid4()))
-                        .set_name(job[ids.NAME])
-                        .set_executable(job[ids.EXECUTABLE])
-                        .set_args(job.get(ids.ARGS))
-                        .set_step_source(step_source)
-                    )
-                    step_builder.add_job(job_builder)
-                real_builder.add_step(step_builder)
-            real_builders.append(real_builder)
-        return [builder.build() for builder in real_builders]
+        self._cluster_address: Optional[str] = None
+        super().__init__(self._reals, metadata={"iter": 0, **_INITIAL_METRICS})
 
     @staticmethod
     def _on_task_failure(task, state):
@@ -214,8 +277,10 @@ class PrefectEnsemble(_Ensemble):
     def evaluate(self, config: EvaluatorServerConfig, ee_id: str):
         self._ee_id = ee_id
         self._ee_config = config
-        mp_ctx = multiprocessing.get_context(method="forkserver")
-        self._eval_proc = mp_ctx.Process(
+        # The cluster is owned by this process, such that it outlives the
+        # evaluation process and can be reused by later evaluations
+        self._cluster_address = _get_cluster_address(self.config[ids.EXECUTOR])
+        self._eval_proc = _MP_CONTEXT.Process(
             target=self._evaluate,
             args=(config, ee_id),
         )
@@ -262,19 +327,79 @@ class PrefectEnsemble(_Ensemble):
                 )
                 c.send(to_json(event).decode())
 
+    def _run_realization(self, ee_id, iens, context, worker_state):
+        # The Prefect context is thread local and executors keep state for the
+        # flow they run, so each worker thread enters the context and keeps an
+        # executor of its own, which is reused for the realizations it runs
+        if not hasattr(worker_state, "executor"):
+            worker_state.executor = _get_executor(
+                self.config[ids.EXECUTOR], self._cluster_address
+            )
+            # Local tasks run on this thread, and the steps expect it to have
+            # an event loop
+            asyncio.set_event_loop(asyncio.new_event_loop())
+        with prefect.context(**context):
+            flow = self.get_flow(ee_id, [iens])
+            return flow.run(executor=worker_state.executor)
+
+    def _send_metrics(self, client, start_time, finished, running):
+        elapsed_time = time.monotonic() - start_time
+        event = CloudEvent(
+            {
+                "type": ids.EVTYPE_ENSEMBLE_METRICS,
+                "source": f"/ert/ee/{self._ee_id}",
+                "datacontenttype": "application/json",
+            },
+            {
+                "realizations_finished": finished,
+                "realizations_running": running,
+                "elapsed_time": elapsed_time,
+                "throughput": finished / elapsed_time if elapsed_time > 0 else 0.0,
+            },
+        )
+        client.send(to_json(event).decode())
+
     def run_flow(self, ee_id):
-        real_per_batch = self.config[ids.MAX_RUNNING]
-        real_range = range(self.config[ids.REALIZATIONS])
-        i = 0
+        """Run the realizations from a work queue, keeping as many of them in
+        flight as both max_running and the capacity of the executor allow, and
+        starting the next one as soon as any finishes. Throughput metrics are
+        reported after every finished realization.
+        """
+        realizations = self.config[ids.REALIZATIONS]
+        max_running = max(
+            1,
+            min(
+                self.config[ids.MAX_RUNNING],
+                realizations,
+                _get_executor_capacity(self.config[ids.EXECUTOR]),
+            ),
+        )
+        context = {key: prefect_context.get(key) for key in ("url", "token", "cert")}
+        worker_state = threading.local()
         state_map = {}
-        while i < self.config[ids.REALIZATIONS]:
-            realization_range = real_range[i : i + real_per_batch]
-            flow = self.get_flow(ee_id, realization_range)
-            with prefect_log_level_context(level="WARNING"):
-                state = flow.run(executor=_get_executor(self.config[ids.EXECUTOR]))
-            for iens in realization_range:
-                state_map[iens] = state
-            i = i + real_per_batch
+        start_time = time.monotonic()
+        run_realization = partial(
+            self._run_realization, ee_id, context=context, worker_state=worker_state
+        )
+        pending = iter(range(realizations))
+        with prefect_log_level_context(level="WARNING"), Client(
+            context["url"], context["token"], context["cert"]
+        ) as client:
+            with ThreadPoolExecutor(max_workers=max_running) as pool:
+                in_flight = {
+                    pool.submit(run_realization, iens): iens
+                    for iens in islice(pending, max_running)
+                }
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        state_map[in_flight.pop(future)] = future.result()
+                        iens = next(pending, None)
+                        if iens is not None:
+                            in_flight[pool.submit(run_realization, iens)] = iens
+                        self._send_metrics(
+                            client, start_time, len(state_map), len(in_flight)
+                        )
         for iens, task in self._iens_to_task.items():
             for output_name, transmitter in state_map[iens].result[task].result.items():
                 self.config["outputs"][iens][output_name] = transmitter
@@ -0,0 +1,308 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Optional
+
+import cloudpickle
+from cloudevents.http import CloudEvent, to_json
+
+from ert_shared.ensemble_evaluator.client import Client
+from ert_shared.ensemble_evaluator.config import EvaluatorServerConfig
+from ert_shared.ensemble_evaluator.entity import identifiers as ids
+from ert_shared.ensemble_evaluator.entity.ensemble import _Ensemble
+from ert_shared.ensemble_evaluator.prefect_ensemble import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RETRY_DELAY,
+    _INITIAL_METRICS,
+    create_realizations,
+)
+
+logger = logging.getLogger(__name__)
+
+# The queue of events to the evaluator, set in each worker process
+_event_queue = None
+
+
+class _QueueClient:
+    """Client stand-in that puts the events on a queue as JSON, from which the
+    ensemble process sends them to the evaluator over a single connection.
+    """
+
+    def __init__(self, queue):
+        self._queue = queue
+
+    def send(self, msg):
+        self._queue.put(msg)
+
+    def send_event(self, ev_type, ev_source, ev_data=None):
+        if ev_data is None:
+            ev_data = {}
+        event = CloudEvent(
+            {
+                "type": ev_type,
+                "source": ev_source,
+                "datacontenttype": "application/json",
+            },
+            ev_data,
+        )
+        self.send(to_json(event).decode())
+
+
+def _initialize_worker(queue):
+    global _event_queue
+    _event_queue = queue
+
+
+def _forward_events(queue, url, token, cert):
+    with Client(url, token, cert) as client:
+        for msg in iter(queue.get, None):
+            client.send(msg)
+
+
+def _run_realization(ee_id, real, inputs, outputs, max_retries, retry_delay):
+    client = _QueueClient(_event_queue)
+    transmitter_map = dict(inputs)
+    results = {}
+    for step in real.get_steps_sorted_topologically():
+        step_inputs = {
+            inp.get_name(): transmitter_map[inp.get_name()] for inp in step.get_inputs()
+        }
+        runner = step.get_runner(outputs, ee_id)
+        for attempt in range(max_retries + 1):
+            try:
+                result = runner.run_step(step_inputs, client)
+                break
+            except Exception as e:
+                if attempt == max_retries:
+                    client.send_event(
+                        ev_type=ids.EVTYPE_FM_STEP_FAILURE,
+                        ev_source=step.get_source(ee_id),
+                        ev_data={ids.ERROR_MSG: str(e)},
+                    )
+                    raise
+                time.sleep(retry_delay)
+        transmitter_map.update(result)
+        results.update(result)
+    return results
+
+
+class ProcessPoolEnsemble(_Ensemble):
+    """Ensemble that runs the steps of each realization directly in a pool of
+    local worker processes, without building Prefect flows or starting a Dask
+    cluster.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._ee_config: Optional[EvaluatorServerConfig] = None
+        self._ee_id: Optional[str] = None
+        self._futures: Dict[Future, int] = {}
+        # The lock guards the futures, which the evaluation thread adds and
+        # removes while a cancelling thread cancels them, and the choice of
+        # final event, such that only one of stopped and cancelled is sent
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._stopped = False
+        super().__init__(
+            create_realizations(config), metadata={"iter": 0, **_INITIAL_METRICS}
+        )
+
+    def evaluate(self, config: EvaluatorServerConfig, ee_id: str):
+        self._ee_id = ee_id
+        self._ee_config = config
+        # The realizations run in worker processes, which a daemon evaluation
+        # process is not allowed to start, so the evaluation runs in a thread
+        threading.Thread(
+            target=self._evaluate, args=(config, ee_id), daemon=True
+        ).start()
+
+    def _send_event(self, ee_config, event):
+        with Client(ee_config.dispatch_uri, ee_config.token, ee_config.cert) as c:
+            c.send(to_json(event).decode())
+
+    def _evaluate(self, ee_config: EvaluatorServerConfig, ee_id):
+        try:
+            self._send_event(
+                ee_config,
+                CloudEvent(
+                    {
+                        "type": ids.EVTYPE_ENSEMBLE_STARTED,
+                        "source": f"/ert/ee/{self._ee_id}",
+                    },
+                ),
+            )
+            self.run_flow(ee_id, ee_config)
+            with self._lock:
+                if self._cancelled.is_set():
+                    return
+                self._stopped = True
+            self._send_event(
+                ee_config,
+                CloudEvent(
+                    {
+                        "type": ids.EVTYPE_ENSEMBLE_STOPPED,
+                        "source": f"/ert/ee/{self._ee_id}",
+                        "datacontenttype": "application/octet-stream",
+                    },
+                    cloudpickle.dumps(self.config[ids.OUTPUTS]),
+                ),
+            )
+        except Exception:
+            if self._cancelled.is_set():
+                return
+            logger.exception(
+                "An exception occurred while starting the ensemble evaluation",
+                exc_info=True,
+            )
+            self._send_event(
+                ee_config,
+                CloudEvent(
+                    {
+                        "type": ids.EVTYPE_ENSEMBLE_FAILED,
+                        "source": f"/ert/ee/{self._ee_id}",
+                    },
+                ),
+            )
+
+    def _send_metrics(self, client, start_time, finished, running):
+        elapsed_time = time.monotonic() - start_time
+        event = CloudEvent(
+            {
+                "type": ids.EVTYPE_ENSEMBLE_METRICS,
+                "source": f"/ert/ee/{self._ee_id}",
+                "datacontenttype": "application/json",
+            },
+            {
+                "realizations_finished": finished,
+                "realizations_running": running,
+                "elapsed_time": elapsed_time,
+                "throughput": finished / elapsed_time if elapsed_time > 0 else 0.0,
+            },
+        )
+        client.send(to_json(event).decode())
+
+    def run_flow(self, ee_id, ee_config: EvaluatorServerConfig):
+        realizations = self.config[ids.REALIZATIONS]
+        max_running = max(
+            1, min(self.config[ids.MAX_RUNNING], realizations, os.cpu_count() or 1)
+        )
+        max_retries = self.config.get(ids.MAX_RETRIES, DEFAULT_MAX_RETRIES)
+        retry_delay = self.config.get("retry_delay", DEFAULT_RETRY_DELAY)
+
+        mp_ctx = multiprocessing.get_context(method="forkserver")
+        event_queue = mp_ctx.Queue()
+        forwarder = threading.Thread(
+            target=_forward_events,
+            args=(
+                event_queue,
+                ee_config.dispatch_uri,
+                ee_config.token,
+                ee_config.cert,
+            ),
+            daemon=True,
+        )
+        forwarder.start()
+        client = _QueueClient(event_queue)
+        errors = []
+        start_time = time.monotonic()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max_running,
+                mp_context=mp_ctx,
+                initializer=_initialize_worker,
+                initargs=(event_queue,),
+            ) as pool:
+
+                def submit(iens):
+                    with self._lock:
+                        if self._cancelled.is_set():
+                            return
+                        future = pool.submit(
+                            _run_realization,
+                            ee_id,
+                            self._reals[iens],
+                            self.config[ids.INPUTS][iens],
+                            self.config[ids.OUTPUTS][iens],
+                            max_retries,
+                            retry_delay,
+                        )
+                        self._futures[future] = iens
+
+                # Realizations are submitted as workers free up, such that the
+                # ones in flight are the ones running
+                pending = iter(range(realizations))
+                in_flight = self._futures
+                try:
+                    for iens in islice(pending, max_running):
+                        submit(iens)
+                    finished = 0
+                    while in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            with self._lock:
+                                iens = in_flight.pop(future)
+                            finished += 1
+                            try:
+                                outputs = future.result()
+                            except Exception as e:
+                                logger.error(f"Realization {iens} failed: {e}")
+                                errors.append(e)
+                            else:
+                                self.config[ids.OUTPUTS][iens].update(outputs)
+                            next_iens = next(pending, None)
+                            if next_iens is not None:
+                                submit(next_iens)
+                            self._send_metrics(
+                                client, start_time, finished, len(in_flight)
+                            )
+                except BaseException:
+                    with self._lock:
+                        for future in in_flight:
+                            future.cancel()
+                    raise
+        finally:
+            # All events are forwarded before the ensemble reports that it
+            # stopped, since the evaluator stops listening after that
+            event_queue.put(None)
+            forwarder.join()
+        if errors:
+            raise errors[0]
+
+    def is_cancellable(self):
+        return True
+
+    def cancel(self):
+        threading.Thread(target=self._cancel).start()
+
+    def _cancel(self):
+        # Realizations that are running finish, the others are not started.
+        # An ensemble that already stopped has nothing left to cancel.
+        with self._lock:
+            if self._stopped:
+                return
+            self._cancelled.set()
+            for future in self._futures:
+                future.cancel()
+        event = CloudEvent(
+            {
+                "type": ids.EVTYPE_ENSEMBLE_CANCELLED,
+                "source": f"/ert/ee/{self._ee_id}",
+                "datacontenttype": "application/json",
+            },
+        )
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(
+            self.send_cloudevent(
+                self._ee_config.dispatch_uri,
+                event,
+                token=self._ee_config.token,
+                cert=self._ee_config.cert,
+            )
+        )
+        loop.close()
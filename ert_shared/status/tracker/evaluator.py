@@ -163,7 +163,6 @@ class EvaluatorTracker:
         partial: PartialSnapshot = PartialSnapshot(self._iter_snapshot[iter_])
         for event in batch:
             partial.from_cloudevent(event)
-        self._iter_snapshot[iter_].merge_event(partial)
         update_event = SnapshotUpdateEvent(
             phase_name=self._model.getPhaseName(),
             current_phase=self._model.currentPhase(),
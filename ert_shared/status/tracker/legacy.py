@@ -199,9 +199,6 @@ class LegacyTracker:
         for iter_ in self._iter_queue:
             partial = self._create_partial_snapshot(None, ({}, -1), iter_)
 
-            if partial is not None:
-                self._set_iter_snapshot(iter_, partial._snapshot)
-
             yield SnapshotUpdateEvent(
                 phase_name=self._model.getPhaseName(),
                 current_phase=self._model.currentPhase(),
@@ -243,7 +240,8 @@ class LegacyTracker:
         destroyed or had not been created yet. Both run_context and
         detailed_progress needs to be aligned with the stars if job status etc
         is to be produced. If queue_snapshot is set, this means the the differ
-        will not be used to calculate changes."""
+        will not be used to calculate changes. The changes are applied to the
+        snapshot of the iteration as the partial is created."""
         queue = self._iter_queue.get(iter_, None)
         if queue is None:
             logger.debug(f"no queue for {iter_}, no partial returned")
@@ -316,8 +314,6 @@ class LegacyTracker:
             else _THE_EMPTY_DETAILED_PROGRESS
         )
         partial = self._create_partial_snapshot(run_context, detailed_progress, iter_)
-        if partial is not None:
-            self._set_iter_snapshot(iter_, partial._snapshot)
 
         return SnapshotUpdateEvent(
             phase_name=self._model.getPhaseName(),
@@ -59,7 +59,7 @@ setup(
         "PyQt5",
         "pyyaml",
         "qtpy",
-        "scipy",
+        "scipy >= 1.7",
         "semeio",
         "sqlalchemy",
         "typing-extensions; python_version < '3.8'",
@@ -74,6 +74,16 @@ setup(
         "storage": [
             "ert-storage==0.1.6",
         ],
+        "compression": [
+            "lz4",
+            "zstandard",
+        ],
+        "msgpack": [
+            "msgpack",
+        ],
+        "parquet": [
+            "pyarrow",
+        ],
     },
     zip_safe=False,
     tests_require=["pytest", "mock"],
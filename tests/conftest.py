@@ -26,3 +26,21 @@ def env_save():
         raise EnvironmentError(
             "Your environment has changed after that test, please reset"
         )
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmarks",
+        action="store_true",
+        default=False,
+        help="Run the benchmarks, which are skipped by default",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmarks"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="Benchmarks only run with --benchmarks")
+    for item in items:
+        if item.get_closest_marker("benchmark") is not None:
+            item.add_marker(skip_benchmark)
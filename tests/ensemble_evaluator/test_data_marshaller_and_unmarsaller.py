@@ -1,4 +1,7 @@
 import datetime
+import pickle
+
+import pytest
 
 from cloudevents.http import from_json, to_json
 from cloudevents.http.event import CloudEvent
@@ -26,3 +29,53 @@ def test_data_marshaller_and_unmarshaller():
 
     assert isinstance(ce_from_json.data["start_time"], datetime.datetime)
     assert out_cloudevent == ce_from_json
+
+
+@pytest.mark.parametrize(
+    "data, data_marshaller",
+    [
+        ({"start_time": datetime.datetime.now()}, serialization.evaluator_marshaller),
+        ({"stdout": "stdout", "stderr": "stderr"}, None),
+        (pickle.dumps({"output": [1, 2, 3]}), None),
+        (None, None),
+    ],
+)
+def test_evaluator_from_json(data, data_marshaller):
+    event = CloudEvent({"type": "type", "source": "/ert/ee/0"}, data)
+    msg = to_json(event, data_marshaller=data_marshaller)
+
+    if isinstance(data, bytes):
+        expected = from_json(msg, data_unmarshaller=pickle.loads)
+    else:
+        expected = from_json(
+            msg, data_unmarshaller=serialization.evaluator_unmarshaller
+        )
+    assert serialization.evaluator_from_json(msg) == expected
+
+
+@pytest.mark.parametrize("data", ["not json", "{unbalanced", "[1, 2"])
+def test_evaluator_from_json_passes_through_string_data(data):
+    event = CloudEvent({"type": "type", "source": "/ert/ee/0"}, data)
+    assert serialization.evaluator_from_json(to_json(event)).data == data
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"start_time": datetime.datetime.now()},
+        {"start_time": datetime.datetime.now(datetime.timezone.utc)},
+        {"stdout": "stdout", "stderr": "stderr", "current_memory_usage": 1000},
+        None,
+    ],
+)
+def test_msgpack_round_trip(data):
+    pytest.importorskip("msgpack")
+    event = CloudEvent({"type": "type", "source": "/ert/ee/0"}, data)
+    assert serialization.from_msgpack(serialization.to_msgpack(event)) == event
+
+
+def test_msgpack_unpickles_binary_data():
+    pytest.importorskip("msgpack")
+    data = {"output": [1, 2, 3]}
+    event = CloudEvent({"type": "type", "source": "/ert/ee/0"}, pickle.dumps(data))
+    assert serialization.from_msgpack(serialization.to_msgpack(event)).data == data
@@ -0,0 +1,71 @@
+import pytest
+from cloudevents.http import to_json
+from cloudevents.http.event import CloudEvent
+
+import ert_shared.ensemble_evaluator.entity.identifiers as identifiers
+from ert_shared.ensemble_evaluator.entity import serialization
+from ert_shared.ensemble_evaluator.evaluator import EnsembleEvaluator
+from ert_shared.status.entity.state import JOB_STATE_FINISHED
+from tests.ensemble_evaluator.test_ensemble_evaluator import (  # noqa: F401
+    ee_config,
+    ensemble,
+)
+
+
+pytestmark = pytest.mark.benchmark
+
+
+class _Websocket:
+    """Stand-in for a dispatch connection that yields the given messages."""
+
+    def __init__(self, messages, subprotocol):
+        self.subprotocol = subprotocol
+        self._messages = messages
+
+    async def __aiter__(self):
+        for msg in self._messages:
+            yield msg
+
+
+def _job_events(ee_id, rounds):
+    return [
+        CloudEvent(
+            {
+                "type": ev_type,
+                "source": f"/ert/ee/{ee_id}/real/{real}/step/0/job/{job}",
+                "datacontenttype": "application/json",
+            },
+            {"stdout": "stdout", "stderr": "stderr", "current_memory_usage": 1000},
+        )
+        for _ in range(rounds)
+        for real in ("0", "1")
+        for job in ("0", "1")
+        for ev_type in (
+            identifiers.EVTYPE_FM_JOB_START,
+            identifiers.EVTYPE_FM_JOB_RUNNING,
+            identifiers.EVTYPE_FM_JOB_SUCCESS,
+        )
+    ]
+
+
+@pytest.mark.parametrize("subprotocol", [None, serialization.MSGPACK_SUBPROTOCOL])
+def test_benchmark_handle_dispatch(benchmark, ensemble, ee_config, subprotocol):
+    if subprotocol is not None:
+        pytest.importorskip("msgpack")
+        encode = serialization.to_msgpack
+    else:
+        encode = lambda event: to_json(event).decode()  # noqa: E731
+
+    evaluator = EnsembleEvaluator(ensemble, ee_config, 0, ee_id="ee-0")
+    messages = [encode(event) for event in _job_events("ee-0", 1000)]
+    benchmark.extra_info["events"] = len(messages)
+
+    def dispatch():
+        evaluator._loop.run_until_complete(
+            evaluator.handle_dispatch(_Websocket(messages, subprotocol), "/dispatch")
+        )
+        evaluator._loop.run_until_complete(evaluator._flush_batch())
+
+    benchmark(dispatch)
+    assert evaluator._snapshot.get_job("1", "0", "1").status == JOB_STATE_FINISHED
+    evaluator._loop.close()
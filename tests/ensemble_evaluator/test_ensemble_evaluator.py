@@ -26,6 +26,8 @@ from ert_shared.ensemble_evaluator.entity.ensemble import (
     create_legacy_job_builder,
 )
 import ert_shared.ensemble_evaluator.entity.identifiers as identifiers
+from ert_shared.ensemble_evaluator import client as ee_client
+from ert_shared.ensemble_evaluator.entity import serialization
 from ert_shared.ensemble_evaluator.entity.snapshot import Snapshot
 
 
@@ -35,8 +37,8 @@ def ee_config(unused_tcp_port):
 
 
 @pytest.fixture
-def evaluator(ee_config):
-    ensemble = (
+def ensemble():
+    return (
         create_ensemble_builder()
         .add_realization(
             real=create_realization_builder()
@@ -64,6 +66,10 @@ def evaluator(ee_config):
         .set_ensemble_size(2)
         .build()
     )
+
+
+@pytest.fixture
+def evaluator(ensemble, ee_config):
     ee = EnsembleEvaluator(
         ensemble,
         ee_config,
@@ -218,3 +224,121 @@ def test_monitor_stop(evaluator):
             snapshot = Snapshot(event.data)
             break
     assert snapshot.get_status() == ENSEMBLE_STATE_STARTED
+
+
+def test_dispatch_events_are_batched(ensemble, ee_config):
+    evaluator = EnsembleEvaluator(
+        ensemble, ee_config, 0, ee_id="ee-0", batch_interval=60, max_batch_size=3
+    )
+    with evaluator.run() as monitor:
+        events = monitor.track()
+        snapshot_event = next(events)
+        assert snapshot_event["type"] == identifiers.EVTYPE_EE_SNAPSHOT
+
+        with Client(
+            ee_config.host,
+            ee_config.port,
+            "/dispatch",
+            cert=ee_config.cert,
+            token=ee_config.token,
+        ) as dispatch:
+            for real, job in (("0", "0"), ("1", "0"), ("1", "1")):
+                send_dispatch_event(
+                    dispatch,
+                    identifiers.EVTYPE_FM_JOB_RUNNING,
+                    f"/ert/ee/{evaluator._ee_id}/real/{real}/step/0/job/{job}",
+                    f"event_{real}_{job}",
+                    {"current_memory_usage": 1000},
+                )
+
+            # The three events are sent to the monitor as a single update
+            update_event = next(events)
+            assert update_event["type"] == identifiers.EVTYPE_EE_SNAPSHOT_UPDATE
+            snapshot = Snapshot(update_event.data)
+            assert snapshot.get_job("0", "0", "0").status == JOB_STATE_RUNNING
+            assert snapshot.get_job("1", "0", "0").status == JOB_STATE_RUNNING
+            assert snapshot.get_job("1", "0", "1").status == JOB_STATE_RUNNING
+            assert evaluator.get_batch_metrics() == {
+                "batches": 1,
+                "events": 3,
+                "max_batch_size": 3,
+            }
+
+            monitor.signal_cancel()
+            assert next(events)["type"] == identifiers.EVTYPE_EE_TERMINATED
+            for _ in events:
+                assert False, "got unexpected event from monitor"
+    evaluator.stop()
+
+
+def test_msgpack_is_negotiated_on_dispatch_only(evaluator, ee_config):
+    pytest.importorskip("msgpack")
+
+    async def negotiated_subprotocol(path):
+        ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        ssl_context.load_verify_locations(cadata=ee_config.cert)
+        async with websockets.connect(
+            f"wss://{ee_config.host}:{ee_config.port}{path}",
+            ssl=ssl_context,
+            extra_headers=Headers(token=ee_config.token),
+            subprotocols=[serialization.MSGPACK_SUBPROTOCOL],
+        ) as websocket:
+            return websocket.subprotocol
+
+    with evaluator.run() as monitor:
+        events = monitor.track()
+        assert next(events)["type"] == identifiers.EVTYPE_EE_SNAPSHOT
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(negotiated_subprotocol("/client")) is None
+            assert (
+                loop.run_until_complete(negotiated_subprotocol("/dispatch"))
+                == serialization.MSGPACK_SUBPROTOCOL
+            )
+        finally:
+            loop.close()
+        monitor.signal_cancel()
+        assert next(events)["type"] == identifiers.EVTYPE_EE_TERMINATED
+        for _ in events:
+            assert False, "got unexpected event from monitor"
+
+
+@pytest.mark.timeout(60)
+def test_msgpack_dispatch_accepts_json_messages(ensemble, ee_config):
+    pytest.importorskip("msgpack")
+    evaluator = EnsembleEvaluator(
+        ensemble, ee_config, 0, ee_id="ee-0", batch_interval=60, max_batch_size=2
+    )
+    with evaluator.run() as monitor:
+        events = monitor.track()
+        assert next(events)["type"] == identifiers.EVTYPE_EE_SNAPSHOT
+
+        with ee_client.Client(
+            ee_config.dispatch_uri, ee_config.token, ee_config.cert
+        ) as dispatch:
+            events_to_send = [
+                CloudEvent(
+                    {
+                        "type": identifiers.EVTYPE_FM_JOB_RUNNING,
+                        "source": f"/ert/ee/ee-0/real/0/step/0/job/{job}",
+                    },
+                    {"current_memory_usage": 1000},
+                )
+                for job in ("0", "1")
+            ]
+            # Events are sent as msgpack, already encoded messages as JSON
+            dispatch.send(events_to_send[0])
+            assert dispatch.websocket.subprotocol == serialization.MSGPACK_SUBPROTOCOL
+            dispatch.send(to_json(events_to_send[1]).decode())
+
+            update_event = next(events)
+            assert update_event["type"] == identifiers.EVTYPE_EE_SNAPSHOT_UPDATE
+            snapshot = Snapshot(update_event.data)
+            assert snapshot.get_job("0", "0", "0").status == JOB_STATE_RUNNING
+            assert snapshot.get_job("0", "0", "1").status == JOB_STATE_RUNNING
+
+            monitor.signal_cancel()
+            assert next(events)["type"] == identifiers.EVTYPE_EE_TERMINATED
+            for _ in events:
+                assert False, "got unexpected event from monitor"
+    evaluator.stop()
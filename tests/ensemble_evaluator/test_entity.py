@@ -1,4 +1,5 @@
 from datetime import datetime
+import dateutil.parser
 import ert_shared.status.entity.state as state
 from ert_shared.ensemble_evaluator.entity import identifiers as ids
 from cloudevents.http.event import CloudEvent
@@ -7,6 +8,7 @@ from ert_shared.ensemble_evaluator.entity import command, tool
 from ert_shared.ensemble_evaluator.entity.snapshot import (
     PartialSnapshot,
     Job,
+    Snapshot,
     SnapshotBuilder,
 )
 
@@ -121,6 +123,45 @@ def test_source_get_ids(source_string, expected_ids):
     assert tool.get_job_id(source_string) == expected_ids["job"]
 
 
+@pytest.mark.parametrize(
+    "source_string, expected",
+    [
+        ("/ert/ee/0/real/1111/step/0/job/2", ("0", "1111", "0", "2")),
+        ("/ert/ee/ee-1/step/0", ("ee-1", None, "0", None)),
+        ("/ert/ee/", (None, None, None, None)),
+        ("/ert", (None, None, None, None)),
+    ],
+)
+def test_parse_source(source_string, expected):
+    source = tool.parse_source(source_string)
+    assert source == expected
+    assert source.ee == expected[0]
+    assert source.job == expected[3]
+
+
+def test_parse_source_interns_ids():
+    real_id = "".join(["11", "11"])
+    source = tool.parse_source(f"/ert/ee/0/real/{real_id}/step/0")
+    assert source.real is tool.parse_source("/ert/ee/1/real/1111").real
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        "2021-01-01T12:30:00.123456+00:00",
+        "2021-01-01T12:30:00+02:00",
+        "2021-01-01T12:30:00.123456",
+        "2021-01-01T12:30:00Z",
+        "2021-01-01",
+        "Jan 1 2021 12:30",
+    ],
+)
+def test_convert_iso8601_to_datetime(timestamp):
+    assert tool.convert_iso8601_to_datetime(timestamp) == dateutil.parser.parse(
+        timestamp
+    )
+
+
 def test_commands_to_and_from_dict():
     pause_command = command.create_command_pause()
     terminate_command = command.create_command_terminate()
@@ -186,3 +227,178 @@ def test_multiple_cloud_events_trigger_non_communicated_change():
         )
     )
     assert partial.to_dict()["reals"]["0"]["status"] == state.REALIZATION_STATE_FINISHED
+
+
+def test_update_partial_from_metrics_cloudevent():
+    snapshot = (
+        SnapshotBuilder()
+        .add_step(step_id="0", status="Unknown")
+        .add_metadata("iter", 0)
+        .add_metadata("realizations_finished", 0)
+        .add_metadata("throughput", 0.0)
+        .build(["0"], status="Unknown")
+    )
+    partial = PartialSnapshot(snapshot)
+    partial.from_cloudevent(
+        CloudEvent(
+            {
+                "id": "0",
+                "type": ids.EVTYPE_ENSEMBLE_METRICS,
+                "source": "/ert/ee/0",
+            },
+            {"realizations_finished": 1, "throughput": 0.5},
+        )
+    )
+    assert partial.to_dict()["metadata"] == {
+        "realizations_finished": 1,
+        "throughput": 0.5,
+    }
+    snapshot.merge_event(partial)
+    assert snapshot.to_dict()["metadata"] == {
+        "iter": 0,
+        "realizations_finished": 1,
+        "throughput": 0.5,
+    }
+
+
+def test_realization_finishes_when_all_steps_finish():
+    snapshot = (
+        SnapshotBuilder()
+        .add_step(step_id="0", status="Unknown")
+        .add_step(step_id="1", status="Unknown")
+        .build(["0"], status="Unknown")
+    )
+    for step_id in ("0", "1"):
+        assert not snapshot.all_steps_finished("0")
+        partial = PartialSnapshot(snapshot).from_cloudevent(
+            CloudEvent(
+                {
+                    "id": "0",
+                    "type": ids.EVTYPE_FM_STEP_SUCCESS,
+                    "source": f"/real/0/step/{step_id}",
+                }
+            )
+        )
+        snapshot.merge_event(partial)
+    assert snapshot.all_steps_finished("0")
+    assert snapshot.get_real("0").status == state.REALIZATION_STATE_FINISHED
+    assert snapshot.get_successful_realizations() == 1
+
+    # A step that is rerun is no longer finished
+    partial = PartialSnapshot(snapshot).from_cloudevent(
+        CloudEvent(
+            {
+                "id": "0",
+                "type": ids.EVTYPE_FM_STEP_RUNNING,
+                "source": "/real/0/step/1",
+            }
+        )
+    )
+    assert not snapshot.all_steps_finished("0")
+    assert partial.to_dict()["reals"]["0"]["status"] == state.REALIZATION_STATE_PENDING
+
+
+def test_snapshot_counts_realization_states():
+    snapshot = (
+        SnapshotBuilder()
+        .add_step(step_id="0", status="Unknown")
+        .build(["0", "1", "2"], status=state.REALIZATION_STATE_WAITING)
+    )
+    assert snapshot.aggregate_real_states() == {state.REALIZATION_STATE_WAITING: 3}
+    assert snapshot.get_successful_realizations() == 0
+
+    snapshot.merge(
+        {
+            "reals": {
+                "0": {"status": state.REALIZATION_STATE_FINISHED},
+                "1": {"status": state.REALIZATION_STATE_FAILED},
+                "2": {"status": "Not a known state"},
+            }
+        }
+    )
+    assert snapshot.aggregate_real_states() == {
+        state.REALIZATION_STATE_FINISHED: 1,
+        state.REALIZATION_STATE_FAILED: 1,
+        "Not a known state": 1,
+    }
+    assert snapshot.get_successful_realizations() == 1
+
+    snapshot.merge({"reals": {"2": {"status": state.REALIZATION_STATE_FINISHED}}})
+    assert snapshot.aggregate_real_states() == {
+        state.REALIZATION_STATE_FINISHED: 2,
+        state.REALIZATION_STATE_FAILED: 1,
+    }
+    assert snapshot.get_successful_realizations() == 2
+
+
+def test_snapshot_to_dict_round_trip(snapshot):
+    data = snapshot.to_dict()
+    assert Snapshot(data).to_dict() == data
+    assert set(data["reals"]) == {"0", "1", "3", "4", "5", "9"}
+    assert set(data["reals"]["0"]["steps"]["0"]["jobs"]) == {"0", "1", "2", "3"}
+
+    # The dict is a copy, which does not change the snapshot when modified
+    data["reals"]["0"]["steps"]["0"]["jobs"]["0"]["data"]["memory"] = 1000
+    assert snapshot.get_job(real_id="0", step_id="0", job_id="0").data == {}
+
+
+def test_snapshot_merge_unknown_ids(snapshot):
+    with pytest.raises(ValueError, match="Illegal field 2"):
+        snapshot.merge({"reals": {"2": {"status": "Running"}}})
+    with pytest.raises(ValueError, match="Illegal field 4"):
+        snapshot.merge({"reals": {"0": {"steps": {"0": {"jobs": {"4": {}}}}}}})
+
+
+def test_partial_snapshot_is_applied_once(monkeypatch):
+    def build():
+        return (
+            SnapshotBuilder()
+            .add_step(step_id="0", status="Unknown")
+            .add_job(step_id="0", job_id="0", name="job0", status="Unknown", data={})
+            .build(["0"], status="Unknown")
+        )
+
+    snapshot = build()
+    merged_updates = []
+    merge = snapshot.merge
+    monkeypatch.setattr(
+        snapshot, "merge", lambda update: merged_updates.append(update) or merge(update)
+    )
+
+    partial = PartialSnapshot(snapshot).from_cloudevent(
+        CloudEvent(
+            {
+                "id": "0",
+                "type": ids.EVTYPE_FM_JOB_RUNNING,
+                "source": "/real/0/step/0/job/0",
+            },
+            {"current_memory_usage": 1000},
+        )
+    )
+    # The update is applied to the snapshot as it is made, and merging the
+    # partial into the snapshot it was created from does not apply it again
+    assert len(merged_updates) == 1
+    assert snapshot.get_job("0", "0", "0").status == state.JOB_STATE_RUNNING
+    snapshot.merge_event(partial)
+    assert len(merged_updates) == 1
+
+    # The partial is a diff, which updates any other snapshot to the same state
+    assert partial.to_dict() == {
+        "reals": {
+            "0": {
+                "steps": {
+                    "0": {
+                        "jobs": {
+                            "0": {
+                                "status": state.JOB_STATE_RUNNING,
+                                "data": {"current_memory_usage": 1000},
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+    other = build()
+    other.merge_event(partial)
+    assert other.to_dict() == snapshot.to_dict()
@@ -11,6 +11,7 @@ import os
 import os.path
 import sys
 import threading
+import time
 from collections import defaultdict
 from datetime import timedelta
 from functools import partial
@@ -838,3 +839,84 @@ def test_run_prefect_ensemble_exception(unused_tcp_port, coefficients):
                 ]:
                     mon.signal_done()
         assert evaluator._snapshot.get_status() == "Failed"
+
+
+def test_cluster_is_started_once(monkeypatch):
+    from ert_shared.ensemble_evaluator import prefect_ensemble
+
+    started = []
+
+    class _Cluster:
+        def __init__(self, **kwargs):
+            started.append(kwargs)
+            self.scheduler_address = f"tcp://localhost:{len(started)}"
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(prefect_ensemble, "_CLUSTER_CLASSES", {"pbs": _Cluster})
+    monkeypatch.setattr(prefect_ensemble, "_clusters", {})
+
+    assert prefect_ensemble._get_cluster_address("local") is None
+    address = prefect_ensemble._get_cluster_address("pbs")
+    assert prefect_ensemble._get_cluster_address("pbs") == address
+    assert len(started) == 1
+
+    executor = prefect_ensemble._get_executor("pbs", address)
+    assert executor.address == address
+    assert len(started) == 1
+
+
+def test_executor_capacity_has_no_side_effects(monkeypatch):
+    from ert_shared.ensemble_evaluator import prefect_ensemble
+
+    def _find_open_port():
+        raise AssertionError("The capacity must not reserve a port")
+
+    submit_job = prefect_ensemble.LSFJob._submit_job
+    monkeypatch.setattr(prefect_ensemble, "find_open_port", _find_open_port)
+    monkeypatch.setattr(prefect_ensemble.os, "cpu_count", lambda: 3)
+
+    assert prefect_ensemble._get_executor_capacity("lsf") == 2
+    assert prefect_ensemble._get_executor_capacity("pbs") == 40
+    assert prefect_ensemble._get_executor_capacity("local") == 3
+    assert prefect_ensemble.LSFJob._submit_job is submit_job
+    prefect_ensemble._get_executor("local")
+
+
+def test_run_flow_keeps_executor_capacity_in_flight(monkeypatch, function_config):
+    from ert_shared.ensemble_evaluator import prefect_ensemble
+
+    monkeypatch.setattr(prefect_ensemble.os, "cpu_count", lambda: 3)
+    config = dict(function_config, realizations=20, max_running=10000)
+    config[ids.EXECUTOR] = "local"
+    ensemble = PrefectEnsemble(config)
+
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def run_realization(ee_id, iens, context, worker_state):
+        with lock:
+            running.append(iens)
+            max_running.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(iens)
+
+    metrics = []
+    monkeypatch.setattr(ensemble, "_run_realization", run_realization)
+    monkeypatch.setattr(
+        ensemble,
+        "_send_metrics",
+        lambda client, start_time, finished, running: metrics.append(
+            (finished, running)
+        ),
+    )
+    with prefect.context(url="ws://localhost:0", token=None, cert=None):
+        ensemble.run_flow(None)
+
+    assert max(max_running) == 3
+    assert [finished for finished, _ in metrics] == list(range(1, 21))
+    # The realizations in flight are reported as running
+    assert [running for _, running in metrics] == [3] * 17 + [2, 1, 0]
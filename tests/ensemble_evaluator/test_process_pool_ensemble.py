@@ -0,0 +1,193 @@
+import asyncio
+import os
+from pathlib import Path
+
+import cloudpickle
+import pytest
+
+from ert_shared.ensemble_evaluator.config import EvaluatorServerConfig
+from ert_shared.ensemble_evaluator.entity import identifiers as ids
+from ert_shared.ensemble_evaluator.evaluator import EnsembleEvaluator
+from ert_shared.ensemble_evaluator.prefect_ensemble import PrefectEnsemble
+from ert_shared.ensemble_evaluator.process_pool_ensemble import ProcessPoolEnsemble
+from tests.ensemble_evaluator.test_prefect_ensemble import (  # noqa: F401
+    coefficient_transmitters,
+    coefficients,
+    function_config,
+    output_transmitters,
+    parse_config,
+    script_transmitters,
+)
+from tests.utils import SOURCE_DIR, tmp
+
+
+def _sum_coefficients(coeffs):
+    return [coeffs["a"] + coeffs["b"] + coeffs["c"]]
+
+
+def _fail(coeffs):
+    raise RuntimeError("This is an expected ERROR")
+
+
+def _function_that_fails_once(coeffs):
+    run_path = Path("ran_once")
+    if not run_path.exists():
+        run_path.touch()
+        raise RuntimeError("This is an expected ERROR")
+    run_path.unlink()
+    return []
+
+
+def _function_ensemble_config(config, func, coefficients, port, executor):
+    coeffs_trans = coefficient_transmitters(
+        coefficients, config.get(ids.STORAGE)["storage_path"]
+    )
+    service_config = EvaluatorServerConfig(port)
+    config["realizations"] = len(coefficients)
+    config["max_running"] = len(coefficients)
+    config["executor"] = executor
+    config["steps"][0]["jobs"][0]["executable"] = cloudpickle.dumps(func)
+    config["inputs"] = {iens: coeffs_trans[iens] for iens in range(len(coefficients))}
+    config["outputs"] = output_transmitters(config)
+    config["dispatch_uri"] = service_config.dispatch_uri
+    return config, service_config
+
+
+def _evaluate(ensemble, service_config):
+    evaluator = EnsembleEvaluator(ensemble, service_config, 0, ee_id="1")
+    result = None
+    error_event_reals = []
+    with evaluator.run() as mon:
+        for event in mon.track():
+            if event.data is not None and "This is an expected ERROR" in str(
+                event.data
+            ):
+                error_event_reals.append(event.data["reals"])
+            if event.data is not None and event.data.get("status") in [
+                "Failed",
+                "Stopped",
+            ]:
+                if event.data.get("status") == "Stopped":
+                    result = mon.get_result()
+                mon.signal_done()
+    return evaluator, result, error_event_reals
+
+
+@pytest.mark.timeout(60)
+def test_run_process_pool_ensemble(unused_tcp_port, coefficients):
+    test_path = Path(SOURCE_DIR) / "test-data/local/prefect_test_case"
+    with tmp(test_path):
+        config = parse_config("config.yml")
+        config.update(
+            {
+                "config_path": os.getcwd(),
+                "realizations": 2,
+                "executor": "process_pool",
+            }
+        )
+        inputs = {}
+        coeffs_trans = coefficient_transmitters(
+            coefficients, config.get(ids.STORAGE)["storage_path"]
+        )
+        script_trans = script_transmitters(config)
+        for iens in range(2):
+            inputs[iens] = {**coeffs_trans[iens], **script_trans[iens]}
+        config.update(
+            {
+                "inputs": inputs,
+                "outputs": output_transmitters(config),
+            }
+        )
+
+        service_config = EvaluatorServerConfig(unused_tcp_port)
+        config["dispatch_uri"] = service_config.dispatch_uri
+        evaluator, _, _ = _evaluate(ProcessPoolEnsemble(config), service_config)
+
+        assert evaluator._snapshot.get_status() == "Stopped"
+        successful_realizations = evaluator._snapshot.get_successful_realizations()
+        assert successful_realizations == config["realizations"]
+
+
+@pytest.mark.timeout(60)
+def test_run_process_pool_ensemble_function(
+    unused_tcp_port, coefficients, tmpdir, function_config
+):
+    with tmpdir.as_cwd():
+        config, service_config = _function_ensemble_config(
+            function_config,
+            _sum_coefficients,
+            coefficients,
+            unused_tcp_port,
+            "process_pool",
+        )
+        evaluator, result, _ = _evaluate(ProcessPoolEnsemble(config), service_config)
+
+        assert evaluator._snapshot.get_status() == "Stopped"
+        assert evaluator._snapshot.get_successful_realizations() == len(coefficients)
+        for iens, coeffs in enumerate(coefficients):
+            record = asyncio.get_event_loop().run_until_complete(
+                result[iens]["function_output"].load()
+            )
+            assert record.data == _sum_coefficients(coeffs)
+
+
+@pytest.mark.timeout(60)
+def test_process_pool_ensemble_retries(
+    unused_tcp_port, coefficients, tmpdir, function_config
+):
+    with tmpdir.as_cwd():
+        config, service_config = _function_ensemble_config(
+            function_config,
+            _function_that_fails_once,
+            coefficients[:1],
+            unused_tcp_port,
+            "process_pool",
+        )
+        config["max_retries"] = 2
+        config["retry_delay"] = 0
+        evaluator, _, error_event_reals = _evaluate(
+            ProcessPoolEnsemble(config), service_config
+        )
+
+        assert evaluator._snapshot.get_status() == "Stopped"
+        assert evaluator._snapshot.get_successful_realizations() == 1
+        assert len(error_event_reals) == 1
+
+
+@pytest.mark.timeout(60)
+def test_process_pool_ensemble_failure(
+    unused_tcp_port, coefficients, tmpdir, function_config
+):
+    with tmpdir.as_cwd():
+        config, service_config = _function_ensemble_config(
+            function_config, _fail, coefficients, unused_tcp_port, "process_pool"
+        )
+        evaluator, result, _ = _evaluate(ProcessPoolEnsemble(config), service_config)
+
+        assert evaluator._snapshot.get_status() == "Failed"
+        assert result is None
+
+
+@pytest.mark.timeout(300)
+@pytest.mark.parametrize(
+    "ensemble_class, executor",
+    [(PrefectEnsemble, "local"), (ProcessPoolEnsemble, "process_pool")],
+)
+def test_benchmark_function_ensemble(
+    benchmark, tmpdir, function_config, ensemble_class, executor
+):
+    coefficients = [{"a": a, "b": 2 * a, "c": 3 * a} for a in range(20)]
+    rounds = []
+
+    def evaluate():
+        # Every round evaluates in a fresh directory, on a fresh server port
+        rounds.append(len(rounds))
+        with tmpdir.mkdir(f"round_{len(rounds)}").as_cwd():
+            config, service_config = _function_ensemble_config(
+                function_config, _sum_coefficients, coefficients, None, executor
+            )
+            return _evaluate(ensemble_class(config), service_config)
+
+    benchmark.extra_info["realizations"] = len(coefficients)
+    evaluator, _, _ = benchmark.pedantic(evaluate, rounds=3)
+    assert evaluator._snapshot.get_status() == "Stopped"
@@ -0,0 +1,81 @@
+import dateutil.parser
+import pytest
+from cloudevents.http.event import CloudEvent
+
+from ert_shared.ensemble_evaluator.entity import identifiers as ids
+from ert_shared.ensemble_evaluator.entity import snapshot as snapshot_module
+from ert_shared.ensemble_evaluator.entity.snapshot import (
+    PartialSnapshot,
+    SnapshotBuilder,
+)
+
+
+pytestmark = pytest.mark.benchmark
+
+
+def _build_snapshot(realizations, jobs):
+    builder = SnapshotBuilder().add_step(step_id="0", status="Unknown")
+    for job_id in range(jobs):
+        builder.add_job(
+            step_id="0",
+            job_id=str(job_id),
+            name=f"job_{job_id}",
+            data={},
+            status="Unknown",
+        )
+    return builder.build([str(iens) for iens in range(realizations)], "Unknown")
+
+
+def _job_events(realizations, jobs):
+    return [
+        CloudEvent(
+            {
+                "type": ev_type,
+                "source": f"/ert/ee/0/real/{iens}/step/0/job/{job_id}",
+                "time": "2021-01-01T00:00:00+00:00",
+            },
+            {ids.STDOUT: "stdout", ids.STDERR: "stderr"},
+        )
+        for iens in range(realizations)
+        for job_id in range(jobs)
+        for ev_type in (ids.EVTYPE_FM_JOB_START, ids.EVTYPE_FM_JOB_SUCCESS)
+    ]
+
+
+@pytest.mark.parametrize("realizations, jobs", [(100, 50), (1000, 10)])
+def test_benchmark_snapshot_updates(benchmark, realizations, jobs):
+    events = _job_events(realizations, jobs)
+    benchmark.extra_info["events"] = len(events)
+
+    def setup():
+        return (_build_snapshot(realizations, jobs),), {}
+
+    def update(snapshot):
+        for event in events:
+            partial = PartialSnapshot(snapshot).from_cloudevent(event)
+            snapshot.merge_event(partial)
+        return snapshot
+
+    snapshot = benchmark.pedantic(update, setup=setup, rounds=3)
+    assert snapshot.get_job("0", "0", "0").status == "Finished"
+
+
+@pytest.mark.parametrize("parser", ["dateutil", "isoformat"])
+def test_benchmark_event_timestamps(benchmark, monkeypatch, parser):
+    # The dateutil case measures the cost per event of the previous parsing
+    if parser == "dateutil":
+        monkeypatch.setattr(
+            snapshot_module, "convert_iso8601_to_datetime", dateutil.parser.parse
+        )
+    snapshot = _build_snapshot(100, 10)
+    events = _job_events(100, 10)
+    benchmark.extra_info["events"] = len(events)
+
+    def update():
+        partial = PartialSnapshot(snapshot)
+        for event in events:
+            partial.from_cloudevent(event)
+        return partial
+
+    partial = benchmark(update)
+    assert partial.data()["reals"]["0"]["steps"]["0"]["jobs"]["0"]["end_time"]
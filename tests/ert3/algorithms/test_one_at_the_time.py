@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 import ert3
@@ -10,9 +11,21 @@ CNORM_INV = 2.57582930
 CUNI_INV = 0.005
 
 
+def _one_at_the_time(parameters):
+    # Split the design into one dict of records per evaluation
+    design = ert3.algorithms.one_at_the_time(parameters)
+    ensemble_size = next(iter(design.values())).ensemble_size
+    for ensemble_record in design.values():
+        assert ensemble_record.ensemble_size == ensemble_size
+    return [
+        {name: design[name].records[eidx] for name in design}
+        for eidx in range(ensemble_size)
+    ]
+
+
 def test_no_parameters():
     with pytest.raises(ValueError):
-        ert3.algorithms.one_at_the_time([])
+        _one_at_the_time([])
 
 
 @pytest.mark.parametrize(
@@ -24,7 +37,7 @@ def test_no_parameters():
 )
 def test_single_parameter(distribution, a, b, sens_low, sens_high):
     single_dist = distribution(a, b, size=1)
-    evaluations = ert3.algorithms.one_at_the_time({"single": single_dist})
+    evaluations = _one_at_the_time({"single": single_dist})
 
     assert 2 == len(evaluations)
     for idx, parameter_value in enumerate([sens_low, sens_high]):
@@ -38,7 +51,7 @@ def test_single_parameter(distribution, a, b, sens_low, sens_high):
 def test_parameter_array():
     size = 10
     gauss_array = ert3.stats.Gaussian(0, 1, size=size)
-    evaluations = ert3.algorithms.one_at_the_time({"array": gauss_array})
+    evaluations = _one_at_the_time({"array": gauss_array})
 
     assert 2 * size == len(evaluations)
     for eidx, evali in enumerate(evaluations):
@@ -53,7 +66,7 @@ def test_parameter_array():
 def test_parameter_index():
     index = ["a" * i + str(i) for i in range(5)]
     gauss_index = ert3.stats.Gaussian(0, 1, index=index)
-    evaluations = ert3.algorithms.one_at_the_time({"indexed_gauss": gauss_index})
+    evaluations = _one_at_the_time({"indexed_gauss": gauss_index})
 
     assert 2 * len(index) == len(evaluations)
     for eidx, evali in enumerate(evaluations):
@@ -77,7 +90,7 @@ def test_multi_parameter_singletons():
         "a": ert3.stats.Gaussian(0, 1, size=1),
         "b": ert3.stats.Gaussian(0, 1, size=1),
     }
-    evaluations = ert3.algorithms.one_at_the_time(records)
+    evaluations = _one_at_the_time(records)
 
     assert len(expected_evaluations) == len(evaluations)
     for expected, result in zip(expected_evaluations, evaluations):
@@ -104,7 +117,7 @@ def test_multi_parameter_doubles():
         "a": ert3.stats.Gaussian(0, 1, size=2),
         "b": ert3.stats.Gaussian(0, 1, size=2),
     }
-    evaluations = ert3.algorithms.one_at_the_time(records)
+    evaluations = _one_at_the_time(records)
 
     assert len(expected_evaluations) == len(evaluations)
     for expected, result in zip(expected_evaluations, evaluations):
@@ -131,7 +144,7 @@ def test_uni_and_norm():
         "a": ert3.stats.Gaussian(0, 1, size=2),
         "b": ert3.stats.Uniform(0, 1, size=2),
     }
-    evaluations = ert3.algorithms.one_at_the_time(records)
+    evaluations = _one_at_the_time(records)
 
     assert len(expected_evaluations) == len(evaluations)
     for expected, result in zip(expected_evaluations, evaluations):
@@ -152,7 +165,7 @@ def test_multi_parameter_groups():
     index = ["a" * i + str(i) for i in range(5)]
     records["indexed"] = ert3.stats.Gaussian(0, 1, index=index)
 
-    evaluations = ert3.algorithms.one_at_the_time(records)
+    evaluations = _one_at_the_time(records)
 
     assert 2 * (size + len(index)) == len(evaluations)
     for eidx, evali in enumerate(evaluations):
@@ -174,3 +187,64 @@ def test_multi_parameter_groups():
                 else 0
             )
             assert expected_value == pytest.approx(evali["indexed"].data[key])
+
+
+def test_design_matrix():
+    size = 3
+    records = {
+        "a": ert3.stats.Gaussian(0, 1, size=size),
+        "b": ert3.stats.Uniform(0, 1, index=("x", "y")),
+    }
+    design = ert3.algorithms.one_at_the_time(records)
+
+    expected_a = np.zeros((10, size))
+    expected_a[[0, 2, 4], [0, 1, 2]] = -CNORM_INV
+    expected_a[[1, 3, 5], [0, 1, 2]] = CNORM_INV
+    assert design["a"].to_numpy() == pytest.approx(expected_a)
+
+    expected_b = np.full((10, 2), 0.5)
+    expected_b[[6, 8], [0, 1]] = CUNI_INV
+    expected_b[[7, 9], [0, 1]] = 1 - CUNI_INV
+    assert design["b"].to_numpy() == pytest.approx(expected_b)
+    assert design["b"].index == ("x", "y")
+
+
+def test_saltelli_design():
+    sample_size = 8
+    records = {
+        "a": ert3.stats.Uniform(0, 1, size=2),
+        "b": ert3.stats.Uniform(0, 1, index=("x",)),
+    }
+    design = ert3.algorithms.saltelli(records, sample_size)
+
+    values = np.hstack([design["a"].to_numpy(), design["b"].to_numpy()])
+    assert values.shape == (sample_size * 5, 3)
+
+    a_block = values[:sample_size]
+    b_block = values[sample_size : 2 * sample_size]
+    for var in range(3):
+        ab_block = values[(2 + var) * sample_size : (3 + var) * sample_size]
+        for col in range(3):
+            expected = b_block if col == var else a_block
+            assert (ab_block[:, col] == expected[:, col]).all()
+
+
+def test_saltelli_indices():
+    # y = x_0 + 2 x_1 with independent uniform variables, evaluated for two
+    # response indices where the second only depends on x_0
+    records = {"x": ert3.stats.Uniform(0, 1, size=2)}
+    design = ert3.algorithms.saltelli(records, 2 ** 12, np.random.default_rng(3))
+    x = design["x"].to_numpy()
+    responses = np.stack([x[:, 0] + 2 * x[:, 1], x[:, 0]], axis=1)
+
+    first_order, total_order = ert3.algorithms.saltelli_indices(responses, 2)
+    assert first_order.shape == total_order.shape == (2, 2)
+    assert first_order[:, 0] == pytest.approx([0.2, 0.8], abs=0.05)
+    assert total_order[:, 0] == pytest.approx([0.2, 0.8], abs=0.05)
+    assert first_order[:, 1] == pytest.approx([1, 0], abs=0.05)
+    assert total_order[:, 1] == pytest.approx([1, 0], abs=0.05)
+
+
+def test_saltelli_indices_invalid_shape():
+    with pytest.raises(ValueError, match="Expected responses of shape"):
+        ert3.algorithms.saltelli_indices(np.zeros((7, 2)), 2)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import ert3
+
+
+SAMPLERS = (
+    ert3.algorithms.latin_hypercube,
+    ert3.algorithms.sobol,
+    ert3.algorithms.halton,
+)
+
+
+@pytest.mark.parametrize("sampler", SAMPLERS)
+def test_no_parameters(sampler):
+    with pytest.raises(ValueError, match="Cannot sample a design of no variables"):
+        sampler({}, 10)
+
+
+@pytest.mark.parametrize("sampler", SAMPLERS)
+def test_no_realizations(sampler):
+    parameters = {"a": ert3.stats.Uniform(0, 1, size=2)}
+    with pytest.raises(ValueError, match="Cannot sample a design with no realiz"):
+        sampler(parameters, 0)
+
+
+@pytest.mark.parametrize("sampler", SAMPLERS)
+def test_design_shape_and_bounds(sampler):
+    index = ("x", "y", "z")
+    parameters = {
+        "uniform": ert3.stats.Uniform(2, 5, size=4),
+        "gauss": ert3.stats.Gaussian(0, 1, index=index),
+    }
+    ensemble_size = 64
+    design = sampler(parameters, ensemble_size)
+
+    assert sorted(design) == ["gauss", "uniform"]
+
+    uniform = design["uniform"].to_numpy()
+    assert uniform.shape == (ensemble_size, 4)
+    assert (uniform >= 2).all() and (uniform <= 5).all()
+    assert design["uniform"].records[0].data == uniform[0].tolist()
+
+    gauss = design["gauss"]
+    assert gauss.to_numpy().shape == (ensemble_size, len(index))
+    assert np.isfinite(gauss.to_numpy()).all()
+    for record in gauss.records:
+        assert sorted(record.index) == sorted(index)
+
+
+def test_latin_hypercube_stratification():
+    ensemble_size = 20
+    parameters = {"a": ert3.stats.Uniform(0, 1, size=3)}
+    design = ert3.algorithms.latin_hypercube(parameters, ensemble_size)
+
+    # Each variable has exactly one realization in each of the equally
+    # probable strata
+    strata = np.floor(design["a"].to_numpy() * ensemble_size)
+    for column in strata.T:
+        assert sorted(column) == list(range(ensemble_size))
+
+
+@pytest.mark.parametrize("sampler", SAMPLERS)
+def test_seeded_design(sampler):
+    parameters = {"a": ert3.stats.Gaussian(0, 1, size=3)}
+
+    first = sampler(parameters, 16, np.random.default_rng(7))
+    second = sampler(parameters, 16, np.random.default_rng(7))
+    other = sampler(parameters, 16, np.random.default_rng(8))
+
+    assert first == second
+    assert first != other
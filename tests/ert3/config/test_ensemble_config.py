@@ -20,7 +20,7 @@ def test_entry_point():
     assert config.forward_model.stage == "evaluate_polynomial"
 
 
-@pytest.mark.parametrize("driver", ["local", "pbs"])
+@pytest.mark.parametrize("driver", ["local", "pbs", "process_pool"])
 def test_config(driver):
     config_dict = deepcopy(_config_dict)
     config_dict["forward_model"]["driver"] = driver
@@ -74,3 +74,26 @@ def test_input(input_config, expected_source, expected_record):
 def test_invalid_input(input_config, expected_error):
     with pytest.raises(pydantic.error_wrappers.ValidationError, match=expected_error):
         _ensemble_config.Input(**input_config)
+
+
+def test_storage_default():
+    config = _ensemble_config.load_ensemble_config(_config_dict)
+    assert config.storage.compression is None
+    assert config.storage.compression_level is None
+
+
+@pytest.mark.parametrize("compression", ["zlib", "zstd", "lz4"])
+def test_storage_compression(compression):
+    config_dict = deepcopy(_config_dict)
+    config_dict["storage"] = {"compression": compression, "compression_level": 3}
+    config = _ensemble_config.EnsembleConfig(**config_dict)
+    assert config.storage.compression == compression
+    assert config.storage.compression_level == 3
+
+
+def test_storage_invalid_compression():
+    with pytest.raises(
+        pydantic.error_wrappers.ValidationError,
+        match="unexpected value; permitted: 'zlib', 'zstd', 'lz4'",
+    ):
+        _ensemble_config.Storage(compression="gzip")
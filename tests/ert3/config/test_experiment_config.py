@@ -48,6 +48,61 @@ def test_unkown_sensitivity_algorithm():
     raw_config = {"type": "sensitivity", "algorithm": "unknown_algorithm"}
     with pytest.raises(
         ert3.exceptions.ConfigValidationError,
-        match=r"unexpected value; permitted: 'one-at-a-time' \(",
+        match=r"unexpected value; permitted: 'one-at-a-time', 'saltelli', ",
+    ):
+        ert3.config.load_experiment_config(raw_config)
+
+
+def test_random_seed():
+    raw_config = {"type": "evaluation"}
+    assert ert3.config.load_experiment_config(raw_config).random_seed is None
+
+    raw_config = {"type": "evaluation", "random_seed": 42}
+    assert ert3.config.load_experiment_config(raw_config).random_seed == 42
+
+    raw_config = {"type": "evaluation", "random_seed": -1}
+    with pytest.raises(
+        ert3.exceptions.ConfigValidationError,
+        match="ensure this value is greater than or equal to 0",
+    ):
+        ert3.config.load_experiment_config(raw_config)
+
+
+@pytest.mark.parametrize("algorithm", ["latin-hypercube", "sobol", "halton"])
+def test_valid_evaluation_design(algorithm):
+    raw_config = {"type": "evaluation", "algorithm": algorithm}
+    experiment_config = ert3.config.load_experiment_config(raw_config)
+    assert experiment_config.type == "evaluation"
+    assert experiment_config.algorithm == algorithm
+
+
+def test_sensitivity_and_design_algorithm():
+    raw_config = {"type": "sensitivity", "algorithm": "sobol"}
+    with pytest.raises(
+        ert3.exceptions.ConfigValidationError,
+        match="Did not expect algorithm for sensitivity experiment: sobol",
+    ):
+        ert3.config.load_experiment_config(raw_config)
+
+
+def test_saltelli_sample_size():
+    raw_config = {"type": "sensitivity", "algorithm": "saltelli", "sample_size": 64}
+    assert ert3.config.load_experiment_config(raw_config).sample_size == 64
+
+    raw_config = {"type": "sensitivity", "algorithm": "saltelli"}
+    with pytest.raises(
+        ert3.exceptions.ConfigValidationError,
+        match="Expected a sample size for the saltelli algorithm",
+    ):
+        ert3.config.load_experiment_config(raw_config)
+
+    raw_config = {
+        "type": "sensitivity",
+        "algorithm": "one-at-a-time",
+        "sample_size": 64,
+    }
+    with pytest.raises(
+        ert3.exceptions.ConfigValidationError,
+        match="Did not expect a sample size for algorithm: one-at-a-time",
     ):
         ert3.config.load_experiment_config(raw_config)
@@ -54,7 +54,7 @@ def test_entry_point(base_unix_stage_config):
     "config, expected_error",
     (
         [{"not_a_key": "value"}, "1 validation error"],
-        [[{"not_a_key": "value"}], "11 validation errors"],
+        [[{"not_a_key": "value"}], "16 validation errors"],
     ),
 )
 def test_entry_point_not_valid(config, expected_error):
@@ -103,6 +103,24 @@ def test_step_non_existing_transportable_cmd(base_unix_stage_config):
         ert3.config.load_stages_config(config)
 
 
+def test_single_vectorized_function_step_valid(base_function_stage_config):
+    config = base_function_stage_config
+    config[0]["vectorized_function"] = config[0].pop("function")
+    config = ert3.config.load_stages_config(config)
+    assert isinstance(config[0], ert3.config.VectorizedFunction)
+    assert config[0].vectorized_function.__name__ == "sum"
+
+
+def test_step_function_and_vectorized_function_error(base_function_stage_config):
+    config = base_function_stage_config
+    config[0].update({"vectorized_function": "builtins:sum"})
+    with pytest.raises(
+        ert3.exceptions.ConfigValidationError,
+        match=r"extra fields not permitted",
+    ):
+        ert3.config.load_stages_config(config)
+
+
 def test_step_function_definition_error(base_function_stage_config):
     config = base_function_stage_config
     config[0]["function"] = "builtinssum"
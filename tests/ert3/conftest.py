@@ -41,6 +41,16 @@ def polynomial(coefficients):
     )
 """
 
+POLY_VECTORIZED_FUNCTION = """
+import numpy as np
+
+
+def polynomial(coefficients):
+    a, b, c = (column[:, np.newaxis] for column in coefficients.T)
+    x = np.arange(10)
+    return a * x ** 2 + b * x + c
+"""
+
 
 @pytest.fixture()
 def workspace(tmpdir, ert_storage):
@@ -118,6 +128,25 @@ def function_stages_config():
     yield ert3.config.load_stages_config(config_list)
 
 
+@pytest.fixture()
+def vectorized_stages_config(tmpdir):
+    config_list = [
+        {
+            "name": "evaluate_polynomial",
+            "input": [{"record": "coefficients", "location": "coeffs"}],
+            "output": [{"record": "polynomial_output", "location": "output"}],
+            "vectorized_function": "vectorized_steps.functions:polynomial",
+        }
+    ]
+    func_dir = pathlib.Path(tmpdir) / "vectorized_steps"
+    func_dir.mkdir()
+    (func_dir / "__init__.py").write_text("")
+    (func_dir / "functions.py").write_text(POLY_VECTORIZED_FUNCTION)
+    sys.path.append(str(tmpdir))
+
+    yield ert3.config.load_stages_config(config_list)
+
+
 def load_experiment_config(workspace, ensemble_config, stages_config):
     config = {}
     config["ensemble"] = ensemble_config
@@ -260,9 +289,7 @@ def ert_storage(ert_storage_client, monkeypatch):
 
     ert_storage_client.raise_on_client_error = False
 
-    # Fix baseurl prefix
-    monkeypatch.setattr(_storage, "_STORAGE_URL", "")
-
-    # Fix requests library
-    for func in "get", "post", "put", "delete":
-        monkeypatch.setattr(_storage.requests, func, getattr(ert_storage_client, func))
+    # Route all storage requests through the test client, this also gives
+    # every test a fresh experiment cache
+    client = _storage._StorageClient("", session=ert_storage_client)
+    monkeypatch.setattr(_storage, "_get_client", lambda: client)
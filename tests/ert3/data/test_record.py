@@ -1,3 +1,4 @@
+import numpy as np
 import pydantic
 import pytest
 import typing
@@ -167,3 +168,124 @@ def test_inconsistent_multi_ensemble_record(
             ensemble_size=ensemble_size,
             record_names=record_names,
         )
+
+
+@pytest.mark.parametrize(
+    ("data", "index"),
+    (
+        ([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], None),
+        ([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]], ("a", "b")),
+        ([[0.5, 1.5]], (2, 7)),
+    ),
+)
+def test_array_backed_ensemble_record(data, index):
+    array = np.array(data, dtype=np.float64)
+    ensrecord = ert3.data.EnsembleRecord.from_numpy(array, index=index)
+
+    assert ensrecord.ensemble_size == array.shape[0]
+    assert np.shares_memory(ensrecord.to_numpy(), array)
+    assert not ensrecord.to_numpy().flags.writeable
+    assert array.flags.writeable
+
+    expected_index = tuple(range(array.shape[1])) if index is None else index
+    assert ensrecord.index == expected_index
+    for row, record in zip(array, ensrecord.records):
+        assert record.index is ensrecord.index
+        if index is None:
+            assert record.data == row.tolist()
+        else:
+            assert record.data == dict(zip(index, row.tolist()))
+        assert np.array_equal(record.to_numpy(), row)
+
+
+@pytest.mark.parametrize(
+    ("data", "index", "record_type"),
+    (
+        ([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], None, ert3.data.RecordType.LIST_FLOAT),
+        ([[1.0, 2.0]], ("a", "b"), ert3.data.RecordType.MAPPING_STR_FLOAT),
+        ([[0.5, 1.5]], (2, 7), ert3.data.RecordType.MAPPING_INT_FLOAT),
+    ),
+)
+def test_array_backed_ensemble_record_equals_records(data, index, record_type):
+    ensrecord = ert3.data.EnsembleRecord.from_numpy(np.array(data), index=index)
+    expected = ert3.data.EnsembleRecord(
+        records=[
+            {"data": row if index is None else dict(zip(index, row))} for row in data
+        ]
+    )
+    assert ensrecord == expected
+    assert ensrecord.record_type == record_type
+    assert ensrecord.to_numpy().tolist() == data
+
+
+def test_array_backed_ensemble_record_numpy_integer_index():
+    index = np.arange(2, 5)
+    ensrecord = ert3.data.EnsembleRecord.from_numpy(np.zeros((2, 3)), index=index)
+    assert ensrecord.record_type == ert3.data.RecordType.MAPPING_INT_FLOAT
+    assert ensrecord.index == (2, 3, 4)
+    assert all(type(key) is int for key in ensrecord.index)
+    assert ensrecord.records[0] == ert3.data.Record(data={2: 0.0, 3: 0.0, 4: 0.0})
+
+
+@pytest.mark.parametrize(
+    ("data", "index"),
+    (
+        (np.zeros(3), None),  # <- Not a matrix
+        (np.zeros((2, 3)), ("a", "b")),  # <- Too short index
+        (np.zeros((2, 2)), ("a", "a")),  # <- Duplicated index
+    ),
+)
+def test_invalid_array_backed_ensemble_record(data, index):
+    with pytest.raises(ValueError):
+        ert3.data.EnsembleRecord.from_numpy(data, index=index)
+
+
+def test_ensemble_record_to_numpy():
+    ensrecord = ert3.data.EnsembleRecord(
+        records=[{"data": {"a": i + 0.5, "b": i + 1.1}} for i in range(3)]
+    )
+    array = ensrecord.to_numpy()
+
+    assert array.shape == (3, 2)
+    assert array is ensrecord.to_numpy()
+    for row, record in zip(array, ensrecord.records):
+        assert row.tolist() == list(record.data.values())
+
+    multi_ensemblerecord = ert3.data.MultiEnsembleRecord(
+        ensemble_records={"ens": ensrecord}
+    )
+    assert multi_ensemblerecord.to_numpy()["ens"] is array
+
+
+@pytest.mark.parametrize(
+    "raw_ensrec",
+    (
+        [{"data": [b"\x00"]}, {"data": [b"\x01"]}],  # <- Not numerical
+        [{"data": [1.0, 2.0]}, {"data": [1.0]}],  # <- Differing indices
+    ),
+)
+def test_ensemble_record_to_numpy_invalid(raw_ensrec):
+    ensrecord = ert3.data.EnsembleRecord(records=raw_ensrec)
+    with pytest.raises((TypeError, ValueError)):
+        ensrecord.to_numpy()
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        [1, 2, 3],
+        [1.0, 10.0, 42, 999.0],
+        [],
+        {"a": 0, "b": 1, "c": 2},
+        {0: 10, 100: 0},
+        [b"\x00\x01\x02"],
+    ),
+)
+def test_trusted_record(data):
+    record = ert3.data.Record.from_trusted(data)
+    assert record == ert3.data.Record(data=data)
+    assert record.record_type == ert3.data.Record(data=data).record_type
+
+    ensrecord = ert3.data.EnsembleRecord.from_trusted([record, record])
+    assert ensrecord == ert3.data.EnsembleRecord(records=[record, record])
+    assert ensrecord.ensemble_size == 2
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import ert3
+
+
+pytestmark = pytest.mark.benchmark
+
+
+_RECORD_SIZES = (10, 1000, 100000)
+_ENSEMBLE_SIZES = (10, 1000)
+_ENSEMBLE_RECORD_SIZE = 100
+
+
+def _data(size, mapping):
+    values = np.random.default_rng(size).normal(size=size).tolist()
+    if mapping:
+        return {f"key_{idx}": value for idx, value in enumerate(values)}
+    return values
+
+
+@pytest.mark.parametrize("size", _RECORD_SIZES)
+@pytest.mark.parametrize("mapping", (False, True))
+def test_benchmark_record(benchmark, size, mapping):
+    data = _data(size, mapping)
+    benchmark.extra_info["size"] = size
+    record = benchmark(ert3.data.Record, data=data)
+    assert len(record.index) == size
+
+
+@pytest.mark.parametrize("size", _RECORD_SIZES)
+@pytest.mark.parametrize("mapping", (False, True))
+def test_benchmark_trusted_record(benchmark, size, mapping):
+    data = _data(size, mapping)
+    benchmark.extra_info["size"] = size
+    record = benchmark(ert3.data.Record.from_trusted, data)
+    assert len(record.index) == size
+
+
+@pytest.mark.parametrize("ensemble_size", _ENSEMBLE_SIZES)
+def test_benchmark_ensemble_record(benchmark, ensemble_size):
+    records = [
+        ert3.data.Record(data=_data(_ENSEMBLE_RECORD_SIZE, False))
+        for _ in range(ensemble_size)
+    ]
+    benchmark.extra_info["realizations"] = ensemble_size
+    ensemble_record = benchmark(ert3.data.EnsembleRecord, records=records)
+    assert ensemble_record.ensemble_size == ensemble_size
+
+
+@pytest.mark.parametrize("ensemble_size", _ENSEMBLE_SIZES)
+def test_benchmark_trusted_ensemble_record(benchmark, ensemble_size):
+    records = [
+        ert3.data.Record(data=_data(_ENSEMBLE_RECORD_SIZE, False))
+        for _ in range(ensemble_size)
+    ]
+    benchmark.extra_info["realizations"] = ensemble_size
+    ensemble_record = benchmark(ert3.data.EnsembleRecord.from_trusted, records)
+    assert ensemble_record.ensemble_size == ensemble_size
+
+
+@pytest.mark.parametrize("ensemble_size", _ENSEMBLE_SIZES)
+def test_benchmark_array_backed_ensemble_record(benchmark, ensemble_size):
+    array = np.random.default_rng(ensemble_size).normal(
+        size=(ensemble_size, _ENSEMBLE_RECORD_SIZE)
+    )
+    benchmark.extra_info["realizations"] = ensemble_size
+    ensemble_record = benchmark(ert3.data.EnsembleRecord.from_numpy, array)
+    assert ensemble_record.ensemble_size == ensemble_size
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import pathlib
+import random
+
+import pytest
+
+from ert3.data import Record, SharedDiskRecordTransmitter
+
+
+pytestmark = pytest.mark.benchmark
+
+
+_PAYLOAD_SIZE = 16 * 1024 * 1024
+_CODECS = (None, "zlib", "zstd", "lz4")
+
+
+def _payload(compressible):
+    if compressible:
+        line = b"   1   1   1  0.25000000E+00  0.10000000E+04  0.20000000E+00\n"
+        return (line * (_PAYLOAD_SIZE // len(line) + 1))[:_PAYLOAD_SIZE]
+    rng = random.Random(0)
+    return rng.getrandbits(8 * _PAYLOAD_SIZE).to_bytes(_PAYLOAD_SIZE, "little")
+
+
+def _check_codec(codec):
+    package = {"zstd": "zstandard", "lz4": "lz4"}.get(codec)
+    if package is not None:
+        pytest.importorskip(package)
+
+
+@pytest.mark.parametrize("codec", _CODECS)
+@pytest.mark.parametrize("compressible", (True, False))
+def test_benchmark_transmit(benchmark, tmpdir, codec, compressible):
+    _check_codec(codec)
+    record = Record(data=[_payload(compressible)])
+    benchmark.extra_info["bytes"] = _PAYLOAD_SIZE
+    transmitters = []
+
+    def setup():
+        # Every round writes to an empty storage, such that the payload is not
+        # deduplicated against the previous round
+        storage_path = pathlib.Path(tmpdir) / f"storage_{len(transmitters)}"
+        transmitter = SharedDiskRecordTransmitter(
+            name="record", storage_path=storage_path, compression=codec
+        )
+        transmitters.append(transmitter)
+        return (transmitter._transmit(record),), {}
+
+    benchmark.pedantic(
+        asyncio.get_event_loop().run_until_complete, setup=setup, rounds=5
+    )
+    benchmark.extra_info["stored_bytes"] = os.path.getsize(transmitters[0]._uri)
+
+
+@pytest.mark.parametrize("codec", _CODECS)
+@pytest.mark.parametrize("compressible", (True, False))
+def test_benchmark_load(benchmark, tmpdir, codec, compressible):
+    _check_codec(codec)
+    payload = _payload(compressible)
+    benchmark.extra_info["bytes"] = _PAYLOAD_SIZE
+    transmitter = SharedDiskRecordTransmitter(
+        name="record", storage_path=pathlib.Path(tmpdir), compression=codec
+    )
+    asyncio.get_event_loop().run_until_complete(transmitter.transmit_data([payload]))
+
+    record = benchmark.pedantic(
+        lambda: asyncio.get_event_loop().run_until_complete(transmitter.load()),
+        rounds=5,
+    )
+    assert record.data == [payload]
@@ -1,13 +1,18 @@
 import contextlib
 import json
+import os
 import pathlib
 import pickle
+import random
+import stat
 import tempfile
 from typing import Callable, ContextManager
 
 import cloudpickle
 import pytest
 from ert3.data import (
+    EnsembleRecord,
+    EnsembleRecordTransmitter,
     InMemoryRecordTransmitter,
     SharedDiskRecordTransmitter,
     RecordTransmitter,
@@ -198,3 +203,253 @@ async def test_dump_untransmitted_record(
         transmitter = record_transmitter_factory(name="some_name")
         with pytest.raises(RuntimeError, match="cannot dump untransmitted record"):
             await transmitter.dump("some.file")
+
+
+@pytest.mark.asyncio
+@simple_records
+@factory_params
+async def test_simple_record_transmit_and_load_lazy(
+    record_transmitter_factory_context: ContextManager[
+        Callable[[str], RecordTransmitter]
+    ],
+    data_in,
+    expected_data,
+    application_type,
+):
+    with record_transmitter_factory_context() as record_transmitter_factory:
+        transmitter = record_transmitter_factory(name="some_name")
+        with pytest.raises(RuntimeError, match="cannot load untransmitted record"):
+            transmitter.load_lazy()
+        await transmitter.transmit_data(data_in)
+
+        lazy_record = transmitter.load_lazy()
+        assert not lazy_record.is_loaded()
+        assert lazy_record.data == expected_data
+        assert lazy_record.is_loaded()
+        assert lazy_record.load() == await transmitter.load()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("data_in", "selection", "expected_data"),
+    (
+        ([1.0, 2.0, 3.0, 4.0], [3, 1], {3: 4.0, 1: 2.0}),
+        ({"a": 0, "b": 1, "c": 2}, ["c"], {"c": 2}),
+        ({0: 10, 100: 0}, [100], {100: 0}),
+    ),
+)
+@factory_params
+async def test_lazy_record_select(
+    record_transmitter_factory_context: ContextManager[
+        Callable[[str], RecordTransmitter]
+    ],
+    data_in,
+    selection,
+    expected_data,
+):
+    with record_transmitter_factory_context() as record_transmitter_factory:
+        transmitter = record_transmitter_factory(name="some_name")
+        await transmitter.transmit_data(data_in)
+
+        lazy_record = transmitter.load_lazy()
+        assert lazy_record.select(selection).data == expected_data
+        assert not lazy_record.is_loaded()
+
+        lazy_record.load()
+        assert lazy_record.select(selection).data == expected_data
+
+
+@pytest.mark.asyncio
+async def test_shared_disk_memory_map():
+    with shared_disk_factory_context() as shared_disk_factory:
+        transmitter = shared_disk_factory(name="some_name")
+        with pytest.raises(RuntimeError, match="cannot map untransmitted record"):
+            with transmitter.memory_map():
+                pass
+
+        payload = bytes(range(256)) * 16
+        await transmitter.transmit_data([payload])
+        with transmitter.memory_map() as mapped:
+            assert len(mapped) == len(payload)
+            assert mapped[1024:1030] == payload[1024:1030]
+
+
+@pytest.mark.asyncio
+async def test_shared_disk_deduplication():
+    with shared_disk_factory_context() as shared_disk_factory, tmp():
+        transmitters = [shared_disk_factory(name=f"name_{idx}") for idx in range(5)]
+        for transmitter in transmitters:
+            await transmitter.transmit_data([1.0, 2.0, 3.0])
+        other = shared_disk_factory(name="other")
+        await other.transmit_data([1.0, 2.0, 4.0])
+
+        storage_path = transmitters[0]._storage_path
+        assert len(list(storage_path.iterdir())) == 2
+        assert len({transmitter._uri for transmitter in transmitters}) == 1
+        assert other._uri != transmitters[0]._uri
+
+        for idx, transmitter in enumerate(transmitters):
+            await transmitter.dump(f"record_{idx}.json")
+            with open(f"record_{idx}.json") as f:
+                assert json.load(f) == [1.0, 2.0, 3.0]
+        assert (await other.load()).data == [1.0, 2.0, 4.0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reflink", [True, False])
+async def test_shared_disk_dump_keeps_file_mode(monkeypatch, reflink):
+    if not reflink:
+        monkeypatch.setattr(
+            "ert3.data._record.fcntl.ioctl",
+            lambda *args: (_ for _ in ()).throw(OSError("no reflink")),
+        )
+    with shared_disk_factory_context() as shared_disk_factory, tmp():
+        transmitter = shared_disk_factory(name="some_name")
+        await transmitter.transmit_data([b"#!/bin/sh\necho hello\n"])
+        os.chmod(transmitter._uri, 0o755)
+
+        await transmitter.dump("command")
+        assert stat.S_IMODE(os.stat("command").st_mode) == 0o755
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("data_in", "binary"),
+    (
+        ([1.0, 2.5, 3.0], True),
+        ([1, 2, 3], True),
+        ({"a": 0.5, "b": 1.5}, True),
+        ({0: 10, 100: 0}, True),
+        ([1.0, 10.0, 42, 999.0], False),
+        ([2 ** 70], False),
+    ),
+)
+async def test_shared_disk_binary_format(data_in, binary):
+    with shared_disk_factory_context() as shared_disk_factory, tmp():
+        transmitter = shared_disk_factory(name="some_name")
+        await transmitter.transmit_data(data_in)
+
+        with open(transmitter._uri, "rb") as f:
+            contents = f.read()
+        assert (contents != json.dumps(data_in).encode()) == binary
+
+        assert (await transmitter.load()).data == data_in
+        keys = list(data_in.keys())[-1:] if isinstance(data_in, dict) else [0]
+        assert transmitter.load_lazy().select(keys).data == {
+            key: data_in[key] for key in keys
+        }
+
+        await transmitter.dump("record.json")
+        with open("record.json") as f:
+            assert f.read() == json.dumps(data_in)
+
+
+@pytest.mark.asyncio
+async def test_ensemble_record_transmitter():
+    data = [
+        [1.0, 2.0, 3.0],
+        {"a": 1, "b": 2},
+        [1.0, 2.0, 3.0],
+        [b"\x00\x01\x02"],
+        [1.0, 10.0, 42, 999.0],
+    ]
+    ensemble_record = EnsembleRecord(records=[{"data": d} for d in data])
+
+    with shared_disk_factory_context() as shared_disk_factory, tmp():
+        storage_path = shared_disk_factory(name="some_name")._storage_path
+        ensemble_transmitter = EnsembleRecordTransmitter(
+            name="some_name", storage_path=storage_path
+        )
+        with pytest.raises(RuntimeError, match="cannot get transmitters of untr"):
+            ensemble_transmitter.transmitters
+        await ensemble_transmitter.transmit_data(ensemble_record)
+        with pytest.raises(RuntimeError, match="already transmitted"):
+            await ensemble_transmitter.transmit_data(ensemble_record)
+
+        # All realizations share one packed file
+        assert len(list(storage_path.iterdir())) == 1
+        transmitters = ensemble_transmitter.transmitters
+        assert len(transmitters) == len(data)
+        assert transmitters[0]._payload.offset == transmitters[2]._payload.offset
+
+        for idx, (transmitter, expected) in enumerate(zip(transmitters, data)):
+            transmitter = pickle.loads(pickle.dumps(transmitter))
+            assert (await transmitter.load()).data == expected
+            assert transmitter.load_lazy().data == expected
+
+            await transmitter.dump(f"record_{idx}")
+            with open(f"record_{idx}", "rb") as f:
+                contents = f.read()
+            if isinstance(expected, list) and isinstance(expected[0], bytes):
+                assert contents == expected[0]
+            else:
+                assert contents == json.dumps(expected).encode()
+
+        assert transmitters[1].load_lazy().select(["b"]).data == {"b": 2}
+
+
+def _codec_params():
+    params = [pytest.param("zlib")]
+    for codec, package in (("zstd", "zstandard"), ("lz4", "lz4")):
+        try:
+            __import__(package)
+        except ImportError:
+            marks = pytest.mark.skip(reason=f"{package} is not installed")
+        else:
+            marks = ()
+        params.append(pytest.param(codec, marks=marks))
+    return params
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("codec", _codec_params())
+@pytest.mark.parametrize(
+    ("data_in", "compressed"),
+    (
+        ([b"\x00\x01" * 4096], True),
+        ([random.Random(0).getrandbits(8 * 4096).to_bytes(4096, "little")], False),
+        ([b"\x00" * 100], False),
+        ([float(idx % 10) for idx in range(1000)], True),
+        ({idx: idx % 3 for idx in range(500)}, True),
+        ([1.0, 10.0, 42, 999.0] * 100, True),
+    ),
+)
+async def test_shared_disk_compression(codec, data_in, compressed):
+    with shared_disk_factory_context() as shared_disk_factory, tmp():
+        storage_path = shared_disk_factory(name="some_name")._storage_path
+        transmitter = SharedDiskRecordTransmitter(
+            name="some_name",
+            storage_path=storage_path,
+            compression=codec,
+            compression_level=1,
+        )
+        await transmitter.transmit_data(data_in)
+        assert (transmitter._payload.codec == codec) == compressed
+
+        transmitter = pickle.loads(pickle.dumps(transmitter))
+        assert (await transmitter.load()).data == data_in
+
+        await transmitter.dump("record")
+        with open("record", "rb") as f:
+            contents = f.read()
+        if isinstance(data_in[0], bytes):
+            assert contents == data_in[0]
+        else:
+            assert contents == json.dumps(data_in).encode()
+            assert transmitter.load_lazy().select([1]).data == {1: data_in[1]}
+
+        ensemble_transmitter = EnsembleRecordTransmitter(
+            name="some_name", storage_path=storage_path, compression=codec
+        )
+        await ensemble_transmitter.transmit_data(
+            EnsembleRecord(records=[{"data": data_in}, {"data": data_in}])
+        )
+        for transmitter in ensemble_transmitter.transmitters:
+            assert (await transmitter.load()).data == data_in
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError, match="Unknown compression codec gzip"):
+        SharedDiskRecordTransmitter(
+            name="some_name", storage_path=pathlib.Path(), compression="gzip"
+        )
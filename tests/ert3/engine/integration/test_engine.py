@@ -146,6 +146,71 @@ def test_export_polynomial_evaluation(
     assert_export(workspace, "evaluation", ensemble, stages_config)
 
 
+@pytest.mark.requires_ert_storage
+def test_export_jsonl_record_subset(
+    workspace,
+    ensemble,
+    stages_config,
+    evaluation_experiment_config,
+    gaussian_parameters_file,
+):
+    experiment_root = workspace / ert3.workspace.EXPERIMENTS_BASE / "evaluation"
+    experiment_root.ensure(dir=True)
+    ert3.engine.run(
+        ensemble, stages_config, evaluation_experiment_config, workspace, "evaluation"
+    )
+    ert3.engine.export(workspace, "evaluation")
+    ert3.engine.export(
+        workspace, "evaluation", export_format="jsonl", record_names=["coefficients"]
+    )
+
+    with open(experiment_root / "data.json") as f:
+        export_data = json.load(f)
+    with open(experiment_root / "data.jsonl") as f:
+        jsonl_data = [json.loads(line) for line in f]
+
+    assert len(jsonl_data) == len(export_data)
+    for realization, jsonl_realization in zip(export_data, jsonl_data):
+        assert jsonl_realization == {
+            "input": {"coefficients": realization["input"]["coefficients"]},
+            "output": {},
+        }
+
+    with pytest.raises(ValueError, match="Cannot export unknown records: unknown"):
+        ert3.engine.export(workspace, "evaluation", record_names=["unknown"])
+
+
+@pytest.mark.requires_ert_storage
+def test_export_parquet(
+    workspace,
+    ensemble,
+    stages_config,
+    evaluation_experiment_config,
+    gaussian_parameters_file,
+):
+    pq = pytest.importorskip("pyarrow.parquet")
+    experiment_root = workspace / ert3.workspace.EXPERIMENTS_BASE / "evaluation"
+    experiment_root.ensure(dir=True)
+    ert3.engine.run(
+        ensemble, stages_config, evaluation_experiment_config, workspace, "evaluation"
+    )
+    ert3.engine.export(workspace, "evaluation")
+    ert3.engine.export(workspace, "evaluation", export_format="parquet")
+
+    with open(experiment_root / "data.json") as f:
+        export_data = json.load(f)
+    table = pq.read_table(str(experiment_root / "data.parquet")).to_pydict()
+
+    assert len(table["input.coefficients.a"]) == len(export_data)
+    for iens, realization in enumerate(export_data):
+        for data_type, records in realization.items():
+            for record_name, data in records.items():
+                keys = data if isinstance(data, dict) else range(len(data))
+                for key in keys:
+                    column = table[f"{data_type}.{record_name}.{key}"]
+                    assert column[iens] == data[key]
+
+
 @pytest.mark.requires_ert_storage
 def test_export_uniform_polynomial_evaluation(
     workspace,
@@ -386,3 +451,36 @@ def test_sensitivity_run_and_export(
     assert_sensitivity_oat_export(
         workspace, "sensitivity", sensitivity_ensemble, stages_config
     )
+
+
+def test_saltelli_non_numerical_responses(sensitivity_ensemble):
+    stages_config = ert3.config.load_stages_config(
+        [
+            {
+                "name": "evaluate_polynomial",
+                "input": [{"record": "coefficients", "location": "coefficients"}],
+                "output": [
+                    {
+                        "record": "polynomial_output",
+                        "location": "output",
+                        "mime": "application/octet-stream",
+                    }
+                ],
+                "function": "math:fsum",
+            }
+        ]
+    )
+    experiment_config = ert3.config.load_experiment_config(
+        {"type": "sensitivity", "algorithm": "saltelli", "sample_size": 8}
+    )
+    with pytest.raises(
+        ert3.exceptions.ErtError,
+        match="requires numerical responses.*polynomial_output",
+    ):
+        ert3.engine.run(
+            sensitivity_ensemble,
+            stages_config,
+            experiment_config,
+            pathlib.Path(),
+            "sensitivity",
+        )
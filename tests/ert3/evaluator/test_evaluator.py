@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 import ert3
 
@@ -29,11 +31,13 @@ def get_inputs(coeffs):
 
 @pytest.mark.requires_ert_storage
 @pytest.mark.parametrize("coeffs, expected", TEST_PARAMETRIZATION)
+@pytest.mark.parametrize("driver", ["local", "process_pool"])
 def test_evaluator_script(
-    workspace, stages_config, base_ensemble_dict, coeffs, expected
+    workspace, stages_config, base_ensemble_dict, coeffs, expected, driver
 ):
     input_records = get_inputs(coeffs)
     base_ensemble_dict["size"] = len(coeffs)
+    base_ensemble_dict["forward_model"]["driver"] = driver
     ensemble = ert3.config.load_ensemble_config(base_ensemble_dict)
 
     evaluation_responses = ert3.evaluator.evaluate(
@@ -56,11 +60,13 @@ def test_evaluator_script(
 
 @pytest.mark.requires_ert_storage
 @pytest.mark.parametrize("coeffs, expected", TEST_PARAMETRIZATION)
+@pytest.mark.parametrize("driver", ["local", "process_pool"])
 def test_evaluator_function(
-    workspace, function_stages_config, base_ensemble_dict, coeffs, expected
+    workspace, function_stages_config, base_ensemble_dict, coeffs, expected, driver
 ):
     input_records = get_inputs(coeffs)
     base_ensemble_dict.update({"size": len(coeffs)})
+    base_ensemble_dict["forward_model"]["driver"] = driver
     ensemble = ert3.config.load_ensemble_config(base_ensemble_dict)
 
     evaluation_responses = ert3.evaluator.evaluate(
@@ -79,3 +85,75 @@ def test_evaluator_function(
         }
     )
     assert expected == evaluation_responses
+
+
+@pytest.mark.parametrize("coeffs, expected", TEST_PARAMETRIZATION)
+def test_evaluator_vectorized_function(
+    tmpdir, vectorized_stages_config, base_ensemble_dict, coeffs, expected
+):
+    input_records = get_inputs(coeffs)
+    base_ensemble_dict.update({"size": len(coeffs)})
+    ensemble = ert3.config.load_ensemble_config(base_ensemble_dict)
+
+    evaluation_responses = ert3.evaluator.evaluate(
+        tmpdir,
+        "test_evaluation",
+        input_records,
+        ensemble,
+        vectorized_stages_config,
+    )
+
+    expected = ert3.data.MultiEnsembleRecord(
+        ensemble_records={
+            "polynomial_output": ert3.data.EnsembleRecord(
+                records=[ert3.data.Record(data=poly_out) for poly_out in expected],
+            )
+        }
+    )
+    assert expected == evaluation_responses
+
+
+def test_evaluator_vectorized_function_wrong_shape(
+    tmpdir, vectorized_stages_config, base_ensemble_dict
+):
+    input_records = get_inputs([(1, 2, 3), (4, 5, 6)])
+    base_ensemble_dict.update({"size": 3})
+    ensemble = ert3.config.load_ensemble_config(base_ensemble_dict)
+
+    with pytest.raises(ValueError, match=r"returned an array of shape \(2, 10\)"):
+        ert3.evaluator.evaluate(
+            tmpdir, "test_evaluation", input_records, ensemble, vectorized_stages_config
+        )
+
+
+def test_prepare_responses_loads_on_access():
+    from ert3.evaluator._evaluator import _prepare_responses
+
+    loaded = []
+
+    class Transmitter(ert3.data.InMemoryRecordTransmitter):
+        def _load_sync(self):
+            loaded.append(self._name)
+            return super()._load_sync()
+
+    raw_responses = {}
+    for iens in range(3):
+        raw_responses[iens] = {}
+        for name in ("a", "b"):
+            transmitter = Transmitter(name)
+            asyncio.get_event_loop().run_until_complete(
+                transmitter.transmit_data([float(iens), 1.0])
+            )
+            raw_responses[iens][name] = transmitter
+
+    responses = _prepare_responses(raw_responses)
+    assert responses.record_names == ("a", "b")
+    assert responses.ensemble_size == 3
+    assert loaded == []
+
+    assert responses.ensemble_records["b"].to_numpy().tolist() == [
+        [0.0, 1.0],
+        [1.0, 1.0],
+        [2.0, 1.0],
+    ]
+    assert loaded == ["b"] * 3
@@ -183,3 +183,80 @@ def test_uniform_ppf(lower, upper, q, size, index):
     assert sorted(dist.index) == sorted(ppf_result.index)
     for idx in dist.index:
         assert ppf_result.data[idx] == pytest.approx(expected_value)
+
+
+@pytest.mark.parametrize(
+    ("dist", "mean", "std"),
+    (
+        (ert3.stats.Gaussian(2, 3, index=("a", "b", "c")), 2, 3),
+        (ert3.stats.Uniform(0, 12, size=4), 6, 12 / np.sqrt(12)),
+    ),
+)
+def test_sample_ensemble(dist, mean, std):
+    ensemble_size = 20000
+    ensemble_record = dist.sample_ensemble(ensemble_size)
+
+    assert ensemble_record.ensemble_size == ensemble_size
+    for record in ensemble_record.records:
+        assert record.index == dist.index
+
+    samples = ensemble_record.to_numpy()
+    assert samples.shape == (ensemble_size, len(dist.index))
+    assert samples.mean(axis=0) == approx([mean] * len(dist.index))
+    assert samples.std(axis=0) == approx([std] * len(dist.index))
+
+
+@pytest.mark.parametrize(
+    "dist",
+    (ert3.stats.Gaussian(0, 1, size=5), ert3.stats.Uniform(0, 1, index=("x", "y"))),
+)
+def test_sample_ensemble_seeded(dist):
+    first = dist.sample_ensemble(10, rng=np.random.default_rng(42))
+    second = dist.sample_ensemble(10, rng=np.random.default_rng(42))
+    other = dist.sample_ensemble(10, rng=np.random.default_rng(43))
+
+    assert first == second
+    assert first != other
+
+    sample = dist.sample(rng=np.random.default_rng(42))
+    assert sample == first.records[0]
+
+
+@pytest.mark.parametrize(
+    "dist",
+    (ert3.stats.Gaussian(0, 1, size=5), ert3.stats.Uniform(0, 1, index=("x", "y"))),
+)
+def test_sample_ensemble_seeded_blocks(dist, monkeypatch):
+    from ert3.stats import _stats
+
+    monkeypatch.setattr(_stats, "_SEEDED_BLOCK_SIZE", 7)
+    seed = np.random.SeedSequence(12345)
+
+    serial = dist.sample_ensemble_seeded(50, seed)
+    assert serial.ensemble_size == 50
+    assert serial == dist.sample_ensemble_seeded(50, seed)
+    assert serial != dist.sample_ensemble_seeded(50, np.random.SeedSequence(54321))
+
+    # The blocks are drawn from their own streams, so a smaller ensemble is the
+    # start of a larger one
+    smaller = dist.sample_ensemble_seeded(10, seed)
+    assert np.array_equal(serial.to_numpy()[:10], smaller.to_numpy())
+
+
+@pytest.mark.parametrize(
+    "dist",
+    (ert3.stats.Gaussian(0, 1, size=5), ert3.stats.Uniform(0, 1, index=("x", "y"))),
+)
+def test_sample_ensemble_seeded_parallel(dist, monkeypatch):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from ert3.stats import _stats
+
+    monkeypatch.setattr(_stats, "_SEEDED_BLOCK_SIZE", 7)
+    seed = np.random.SeedSequence(12345)
+
+    serial = dist.sample_ensemble_seeded(50, seed)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = dist.sample_ensemble_seeded(50, seed, executor=executor)
+    assert np.array_equal(serial.to_numpy(), parallel.to_numpy())
+    assert serial == parallel
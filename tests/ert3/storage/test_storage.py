@@ -1,6 +1,8 @@
 import collections
 from ert3 import workspace
 
+import numpy as np
+
 import ert3
 
 import pytest
@@ -113,6 +115,105 @@ def test_add_and_get_ensemble_record(tmpdir, raw_ensrec, ert_storage):
     )
 
     assert ensrecord == retrieved_ensrecord
+    assert np.array_equal(ensrecord.to_numpy(), retrieved_ensrecord.to_numpy())
+
+
+@pytest.mark.requires_ert_storage
+@pytest.mark.parametrize(
+    "raw_ensrec",
+    (
+        [{"data": [b"\x00" * i]} for i in range(3)],  # <- Not numerical
+        [{"data": [0.5] * i} for i in range(4)],  # <- Differing indices
+    ),
+)
+def test_add_and_get_non_matrix_ensemble_record(tmpdir, raw_ensrec, ert_storage):
+    ert3.storage.init(workspace=tmpdir)
+
+    ensrecord = ert3.data.EnsembleRecord(records=raw_ensrec)
+    ert3.storage.add_ensemble_record(
+        workspace=tmpdir, record_name="my_ensemble_record", ensemble_record=ensrecord
+    )
+    retrieved_ensrecord = ert3.storage.get_ensemble_record(
+        workspace=tmpdir, record_name="my_ensemble_record"
+    )
+
+    assert ensrecord == retrieved_ensrecord
+
+
+@pytest.mark.requires_ert_storage
+@pytest.mark.parametrize(
+    "raw_ensrec",
+    (
+        [{"data": [i, i + 1, i + 2]} for i in range(3)],
+        [{"data": {"a": i, "b": i + 1}} for i in range(3)],
+        [{"data": [2 ** 60 + i, 0.5]} for i in range(2)],
+    ),
+)
+def test_add_and_get_integer_ensemble_record(tmpdir, raw_ensrec, ert_storage):
+    ert3.storage.init(workspace=tmpdir)
+
+    ensrecord = ert3.data.EnsembleRecord(records=raw_ensrec)
+    ert3.storage.add_ensemble_record(
+        workspace=tmpdir, record_name="my_ensemble_record", ensemble_record=ensrecord
+    )
+    retrieved_ensrecord = ert3.storage.get_ensemble_record(
+        workspace=tmpdir, record_name="my_ensemble_record"
+    )
+
+    assert ensrecord == retrieved_ensrecord
+    for record, retrieved_record in zip(ensrecord.records, retrieved_ensrecord.records):
+        data = record.data.values() if isinstance(record.data, dict) else record.data
+        retrieved_data = (
+            retrieved_record.data.values()
+            if isinstance(retrieved_record.data, dict)
+            else retrieved_record.data
+        )
+        assert [type(value) for value in data] == [
+            type(value) for value in retrieved_data
+        ]
+
+
+@pytest.mark.requires_ert_storage
+def test_add_and_get_array_ensemble_record(tmpdir, ert_storage):
+    ert3.storage.init(workspace=tmpdir)
+
+    array = np.random.default_rng(12).normal(size=(20, 7))
+    ensrecord = ert3.data.EnsembleRecord.from_numpy(array, index=tuple("abcdefg"))
+    ert3.storage.add_ensemble_record(
+        workspace=tmpdir, record_name="my_ensemble_record", ensemble_record=ensrecord
+    )
+    retrieved_ensrecord = ert3.storage.get_ensemble_record(
+        workspace=tmpdir, record_name="my_ensemble_record"
+    )
+
+    assert retrieved_ensrecord.index == tuple("abcdefg")
+    assert np.array_equal(array, retrieved_ensrecord.to_numpy())
+    assert ensrecord == retrieved_ensrecord
+
+
+@pytest.mark.requires_ert_storage
+def test_add_existing_ensemble_record(tmpdir, ert_storage):
+    ert3.storage.init(workspace=tmpdir)
+
+    ensrecord = ert3.data.EnsembleRecord.from_numpy(np.ones((2, 3)))
+    ert3.storage.add_ensemble_record(
+        workspace=tmpdir, record_name="my_ensemble_record", ensemble_record=ensrecord
+    )
+    with pytest.raises(KeyError, match="Record already exists"):
+        ert3.storage.add_ensemble_record(
+            workspace=tmpdir,
+            record_name="my_ensemble_record",
+            ensemble_record=ensrecord,
+        )
+
+
+@pytest.mark.requires_ert_storage
+def test_get_non_existing_ensemble_record(tmpdir, ert_storage):
+    ert3.storage.init(workspace=tmpdir)
+    with pytest.raises(KeyError, match="No my_ensemble_record data"):
+        ert3.storage.get_ensemble_record(
+            workspace=tmpdir, record_name="my_ensemble_record"
+        )
 
 
 @pytest.mark.requires_ert_storage
@@ -214,3 +315,176 @@ def test_delete_experiment(tmpdir, ert_storage):
     ert3.storage.delete_experiment(workspace=tmpdir, experiment_name="test")
 
     assert "test" not in ert3.storage.get_experiment_names(workspace=tmpdir)
+
+
+@pytest.mark.requires_ert_storage
+def test_get_ensemble_records_request_count(tmpdir, ert_storage, monkeypatch):
+    from ert3.storage import _storage
+
+    ert3.storage.init(workspace=tmpdir)
+    ert3.storage.init_experiment(
+        workspace=tmpdir,
+        experiment_name="test",
+        parameters=[],
+        ensemble_size=5,
+    )
+    record_names = [f"record_{idx}" for idx in range(10)]
+    for record_name in record_names:
+        ert3.storage.add_ensemble_record(
+            workspace=tmpdir,
+            experiment_name="test",
+            record_name=record_name,
+            ensemble_record=ert3.data.EnsembleRecord.from_numpy(np.ones((5, 3))),
+        )
+
+    requested_urls = []
+    session = _storage._get_client()._session
+    session_get = session.get
+
+    def _counting_get(url, **kwargs):
+        requested_urls.append(url)
+        return session_get(url, **kwargs)
+
+    monkeypatch.setattr(session, "get", _counting_get)
+    ensemble_records = ert3.storage.get_ensemble_records(
+        workspace=tmpdir, experiment_name="test", record_names=record_names
+    )
+
+    assert sorted(ensemble_records.keys()) == record_names
+    # One metadata lookup plus one data request per record, the experiment
+    # lookup is cached
+    assert len(requested_urls) == len(record_names) + 1
+    assert "/experiments" not in requested_urls
+
+
+@pytest.mark.requires_ert_storage
+def test_experiment_cache_invalidation(tmpdir, ert_storage):
+    ert3.storage.init(workspace=tmpdir)
+    assert ert3.storage.get_experiment_names(workspace=tmpdir) == set()
+
+    ert3.storage.init_experiment(
+        workspace=tmpdir,
+        experiment_name="test",
+        parameters=[],
+        ensemble_size=5,
+    )
+    assert ert3.storage.get_experiment_names(workspace=tmpdir) == {"test"}
+
+    ert3.storage.delete_experiment(workspace=tmpdir, experiment_name="test")
+    assert ert3.storage.get_experiment_names(workspace=tmpdir) == set()
+
+
+@pytest.mark.requires_ert_storage
+def test_add_ensemble_records(tmpdir, ert_storage):
+    ert3.storage.init(workspace=tmpdir)
+    ert3.storage.init_experiment(
+        workspace=tmpdir,
+        experiment_name="test",
+        parameters=[],
+        ensemble_size=5,
+    )
+    ensemble_records = {
+        "numerical": ert3.data.EnsembleRecord.from_numpy(np.arange(15.0).reshape(5, 3)),
+        "blob": ert3.data.EnsembleRecord(
+            records=[ert3.data.Record(data=[1.0] * idx) for idx in range(1, 6)]
+        ),
+    }
+    for idx in range(10):
+        ensemble_records[f"record_{idx}"] = ert3.data.EnsembleRecord.from_numpy(
+            np.full((5, 2), float(idx))
+        )
+
+    ert3.storage.add_ensemble_records(
+        workspace=tmpdir, experiment_name="test", ensemble_records=ensemble_records
+    )
+
+    fetched_records = ert3.storage.get_ensemble_records(
+        workspace=tmpdir, experiment_name="test", record_names=ensemble_records
+    )
+    assert fetched_records == ensemble_records
+
+    with pytest.raises(KeyError):
+        ert3.storage.add_ensemble_records(
+            workspace=tmpdir,
+            experiment_name="test",
+            ensemble_records={"numerical": ensemble_records["numerical"]},
+        )
+
+
+@pytest.mark.requires_ert_storage
+def test_add_ensemble_records_failed_upload(tmpdir, ert_storage, monkeypatch):
+    from ert3.storage import _storage
+
+    ert3.storage.init(workspace=tmpdir)
+    ert3.storage.init_experiment(
+        workspace=tmpdir,
+        experiment_name="test",
+        parameters=[],
+        ensemble_size=5,
+    )
+    ensemble_records = {
+        f"record_{idx}": ert3.data.EnsembleRecord.from_numpy(
+            np.full((5, 2), float(idx))
+        )
+        for idx in range(4)
+    }
+
+    add_data = _storage._add_data
+
+    def _failing_add_data(ensemble_id, record_name, *args):
+        if record_name == "record_2":
+            raise ert3.exceptions.StorageError("Upload failed")
+        return add_data(ensemble_id, record_name, *args)
+
+    monkeypatch.setattr(_storage, "_add_data", _failing_add_data)
+    with pytest.raises(ert3.exceptions.StorageError, match="Upload failed"):
+        ert3.storage.add_ensemble_records(
+            workspace=tmpdir, experiment_name="test", ensemble_records=ensemble_records
+        )
+
+    # The records that were uploaded are stored along with their metadata
+    uploaded = {
+        record_name: ensemble_record
+        for record_name, ensemble_record in ensemble_records.items()
+        if record_name != "record_2"
+    }
+    fetched_records = ert3.storage.get_ensemble_records(
+        workspace=tmpdir, experiment_name="test", record_names=uploaded
+    )
+    assert fetched_records == uploaded
+    with pytest.raises(KeyError):
+        ert3.storage.get_ensemble_record(
+            workspace=tmpdir, experiment_name="test", record_name="record_2"
+        )
+
+
+@pytest.mark.requires_ert_storage
+@pytest.mark.parametrize(
+    "raw_ensrec",
+    (
+        [{"data": [b"\x00" * 4096 * i]} for i in range(3)],
+        [{"data": [0.5] * 1000 * i} for i in range(4)],
+    ),
+)
+def test_add_and_get_compressed_ensemble_records(tmpdir, raw_ensrec, ert_storage):
+    ert3.storage.init(workspace=tmpdir)
+
+    ensrecord = ert3.data.EnsembleRecord(records=raw_ensrec)
+    ert3.storage.add_ensemble_records(
+        workspace=tmpdir,
+        ensemble_records={"my_ensemble_record": ensrecord},
+        compression="zlib",
+        compression_level=1,
+    )
+    retrieved_ensrecord = ert3.storage.get_ensemble_record(
+        workspace=tmpdir, record_name="my_ensemble_record"
+    )
+
+    assert ensrecord == retrieved_ensrecord
+
+    with pytest.raises(ValueError, match="Unknown compression codec gzip"):
+        ert3.storage.add_ensemble_records(
+            workspace=tmpdir,
+            ensemble_records={"other_record": ensrecord},
+            compression="gzip",
+        )
@@ -0,0 +1,65 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import ert3
+
+
+pytestmark = pytest.mark.benchmark
+
+
+_RECORD_SIZE = 100
+_ENSEMBLE_SIZES = (100, 1000, 10000)
+
+
+def _ensemble_record(ensemble_size):
+    array = np.random.default_rng(ensemble_size).normal(
+        size=(ensemble_size, _RECORD_SIZE)
+    )
+    return ert3.data.EnsembleRecord.from_numpy(array)
+
+
+def _record_info(benchmark, ensemble_record):
+    benchmark.extra_info["realizations"] = ensemble_record.ensemble_size
+    benchmark.extra_info["bytes"] = ensemble_record.to_numpy().nbytes
+
+
+@pytest.mark.requires_ert_storage
+@pytest.mark.parametrize("ensemble_size", _ENSEMBLE_SIZES)
+def test_benchmark_upload_ensemble_record(
+    benchmark, tmpdir, ert_storage, ensemble_size
+):
+    ert3.storage.init(workspace=tmpdir)
+    ensemble_record = _ensemble_record(ensemble_size)
+    _record_info(benchmark, ensemble_record)
+    record_names = (f"record_{idx}" for idx in itertools.count())
+
+    def setup():
+        return (), {
+            "workspace": tmpdir,
+            "record_name": next(record_names),
+            "ensemble_record": ensemble_record,
+        }
+
+    benchmark.pedantic(ert3.storage.add_ensemble_record, setup=setup, rounds=5)
+
+
+@pytest.mark.requires_ert_storage
+@pytest.mark.parametrize("ensemble_size", _ENSEMBLE_SIZES)
+def test_benchmark_download_ensemble_record(
+    benchmark, tmpdir, ert_storage, ensemble_size
+):
+    ert3.storage.init(workspace=tmpdir)
+    ensemble_record = _ensemble_record(ensemble_size)
+    _record_info(benchmark, ensemble_record)
+    ert3.storage.add_ensemble_record(
+        workspace=tmpdir, record_name="record", ensemble_record=ensemble_record
+    )
+
+    fetched_record = benchmark.pedantic(
+        ert3.storage.get_ensemble_record,
+        kwargs={"workspace": tmpdir, "record_name": "record"},
+        rounds=5,
+    )
+    assert np.array_equal(ensemble_record.to_numpy(), fetched_record.to_numpy())